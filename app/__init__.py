@@ -1,18 +1,21 @@
 import re
 
+import click
 from flask import Flask, request, redirect, session
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
 
-import dmapiclient
 from dmutils import init_app
-from dmutils.user import User
 
 from govuk_frontend_jinja.flask_ext import init_govuk_frontend
 
 from config import configs  # type: ignore
 
-data_api_client = dmapiclient.DataAPIClient()
+from . import s3_buckets, user_loader
+from .api_client import DataAPIClient, data_api_responses_are_stale
+from .uploads import UploadRequest
+
+data_api_client = DataAPIClient()
 login_manager = LoginManager()
 csrf = CSRFProtect()
 
@@ -25,6 +28,7 @@ def create_app(config_name):
     application = Flask(__name__,
                         static_folder='static/',
                         static_url_path=configs[config_name].STATIC_URL_PATH)
+    application.request_class = UploadRequest
 
     # Allow using GOV.UK Frontend Nunjucks templates
     init_govuk_frontend(application)
@@ -37,7 +41,11 @@ def create_app(config_name):
     )
 
     from .metrics import metrics as metrics_blueprint, gds_metrics
-    from .main import main as main_blueprint
+    from .main import (
+        main as main_blueprint, build_content_snapshot, configure_content, log_content_summary, preload_content,
+        start_content_watcher,
+    )
+    from .main.helpers import communications, signed_urls, summaries
     from .status import status as status_blueprint
     from dmutils.external import external as external_blueprint
 
@@ -54,6 +62,29 @@ def create_app(config_name):
 
     gds_metrics.init_app(application)
     csrf.init_app(application)
+    s3_buckets.init_app(application)
+    summaries.init_app(application)
+    communications.init_app(application)
+    signed_urls.init_app(application)
+    data_api_client.init_supplier_cache(application)
+    user_loader.init_app(application, data_api_client)
+
+    configure_content(application.config['DM_EXPIRED_FRAMEWORK_CONTENT_LIMIT'])
+    if application.config['DM_EAGER_CONTENT_LOADING']:
+        preload_content()
+    log_content_summary(application.logger)
+
+    if application.config['DM_CONTENT_RELOAD_INTERVAL']:
+        # started on the first request rather than here so that it runs in each worker, not a preloading parent
+        application.before_first_request(
+            lambda: start_content_watcher(application.config['DM_CONTENT_RELOAD_INTERVAL'])
+        )
+
+    @application.cli.command('build-content-snapshot')
+    def build_content_snapshot_command():
+        """Precompile the frameworks content so workers don't have to parse it when they start."""
+        checksum = build_content_snapshot()
+        click.echo("Wrote content snapshot {}".format(checksum))
 
     @application.before_request
     def remove_trailing_slash():
@@ -67,13 +98,14 @@ def create_app(config_name):
 
     application.add_template_filter(question_references)
     application.add_template_filter(parse_document_upload_time)
+    application.add_template_global(data_api_responses_are_stale)
 
     return application
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.load_user(data_api_client, user_id)
+    return user_loader.load_user(data_api_client, user_id)
 
 
 def config_attrs(config):
@@ -0,0 +1,273 @@
+import logging
+import re
+from copy import deepcopy
+from functools import partial
+from typing import Optional
+from urllib.parse import urlparse
+
+from flask import g, has_app_context, has_request_context
+from flask_login import current_user
+
+import dmapiclient
+from dmapiclient import APIError, HTTPError
+
+from .caching import LRUCache, SingleFlight, TTLCache
+from .circuit_breaker import OPEN, CircuitBreaker
+from .connection_pools import ConnectionPools, init_app as init_connection_pools
+from .metrics import (
+    DATA_API_CIRCUIT_BREAKER_OPEN,
+    DATA_API_CIRCUIT_BREAKER_REJECTIONS,
+    DATA_API_COALESCED_REQUESTS,
+    DATA_API_STALE_RESPONSES,
+    FRAMEWORK_CACHE_LOOKUPS,
+    SUPPLIER_CACHE_LOOKUPS,
+)
+from .supplier_cache import SupplierCache, cached_supplier_id, written_supplier_ids
+
+logger = logging.getLogger(__name__)
+
+# read only endpoints (as returned by _endpoint) whose last good response is used if the API is unavailable
+FALLBACK_ENDPOINTS = re.compile(r'^/(frameworks|frameworks/[^/]+|suppliers/:id|suppliers/:id/frameworks|users)$')
+
+
+def _endpoint(url: str) -> str:
+    """The path of ``url``, with any ids in it replaced, to label metrics with"""
+    return re.sub(r'/\d+(?=/|$)', '/:id', urlparse(url).path)
+
+
+def _is_unavailable(error: APIError) -> bool:
+    # timeouts and connection errors have a status code of 503
+    return bool(error.status_code >= 500)
+
+
+def data_api_responses_are_stale() -> bool:
+    """Whether any of the Data API responses used in this request were cached ones, as the API wasn't available"""
+    return bool(has_app_context() and g.get('data_api_responses_are_stale', False))
+
+
+def _on_circuit_breaker_change(state: str) -> None:
+    DATA_API_CIRCUIT_BREAKER_OPEN.set(state == OPEN)
+    logger.warning("Data API circuit breaker is now {state}", extra={'state': state})
+
+
+class DataAPIClient(dmapiclient.DataAPIClient):
+    """A DataAPIClient which only makes each distinct GET request once per request (or app context).
+
+    Responses are remembered in ``flask.g``, and callers get their own copy of them so they're free to modify it. Any
+    other request made through the client forgets every response remembered so far - the API's resources are too
+    interlinked (e.g. completing a draft service changes the supplier's framework interest) to know which are affected.
+
+    Frameworks, which hardly ever change, are also cached between requests for ``DM_FRAMEWORK_CACHE_TTL`` seconds.
+
+    Identical GET requests made at the same time from different threads (e.g. a burst of requests for an open
+    framework's dashboard) share a single call to the API.
+
+    If the API times out or returns a 5xx error, the last good response from a few read only endpoints (frameworks,
+    suppliers and their users) is used instead, and ``data_api_responses_are_stale()`` is True for the rest of the
+    request. After ``DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD`` such failures in a row no requests are made to the API
+    for ``DM_DATA_API_CIRCUIT_BREAKER_RESET`` seconds - they fail (or use the last good response) straight away.
+
+    With ``DM_SUPPLIER_CACHE_REDIS`` set, each supplier's details, framework interest and users are cached in redis
+    (see ``SupplierCache``) until something this app does changes them.
+
+    Requests are made through the app's shared connection pools, so connections to the API are kept alive and reused.
+    """
+
+    framework_cache: Optional[TTLCache] = None
+    fallback_cache: Optional[LRUCache] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    supplier_cache: Optional[SupplierCache] = None
+    connection_pools: Optional[ConnectionPools] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.single_flight = SingleFlight()
+        # bumped by every write, so reads started afterwards don't share a response from before it
+        self._writes = 0
+
+    def init_app(self, app):
+        super().init_app(app)
+        self.connection_pools = init_connection_pools(app)
+        if app.config['DM_FRAMEWORK_CACHE_TTL']:
+            self.framework_cache = TTLCache(
+                app.config['DM_FRAMEWORK_CACHE_TTL'],
+                app.config['DM_FRAMEWORK_CACHE_MAX_AGE'],
+                on_lookup=lambda result: FRAMEWORK_CACHE_LOOKUPS.labels(result).inc(),
+            )
+        else:
+            self.framework_cache = None
+
+        if app.config['DM_DATA_API_FALLBACK_CACHE_SIZE']:
+            self.fallback_cache = LRUCache(app.config['DM_DATA_API_FALLBACK_CACHE_SIZE'])
+        else:
+            self.fallback_cache = None
+
+        if app.config['DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD']:
+            self.circuit_breaker = CircuitBreaker(
+                app.config['DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD'],
+                app.config['DM_DATA_API_CIRCUIT_BREAKER_RESET'],
+                on_change=_on_circuit_breaker_change,
+            )
+        else:
+            self.circuit_breaker = None
+
+    def init_supplier_cache(self, app):
+        """Set up the supplier cache, which needs the session redis client (so must be done after ``init_app``)"""
+        if app.config['DM_SUPPLIER_CACHE_REDIS'] and app.config.get('SESSION_REDIS'):
+            self.supplier_cache = SupplierCache(app.config['SESSION_REDIS'], app.config['DM_SUPPLIER_CACHE_TTL'])
+        else:
+            self.supplier_cache = None
+
+    def _requests_retry_session(self, *, retry_read_timeouts: bool = True):
+        if self.connection_pools is None:
+            return super()._requests_retry_session(retry_read_timeouts=retry_read_timeouts)
+        return self.connection_pools.session(
+            retry_read_timeouts=retry_read_timeouts, retry_statuses=self._RETRIES_FORCE_STATUS_CODES,
+        )
+
+    def find_frameworks(self):
+        return self._get_cached_frameworks(('find_frameworks',), super().find_frameworks)
+
+    def get_framework(self, slug):
+        return self._get_cached_frameworks(('get_framework', slug), partial(super().get_framework, slug))
+
+    def _get_cached_frameworks(self, key, fetch):
+        if self.framework_cache is None:
+            return fetch()
+        return deepcopy(self.framework_cache.get(key, fetch))
+
+    def purge_framework_cache(self, framework_slug: Optional[str] = None) -> None:
+        """Forget the cached frameworks (or just ``framework_slug``, and the list of all frameworks)"""
+        if self.framework_cache is None:
+            return
+        if framework_slug is None:
+            self.framework_cache.purge()
+        else:
+            self.framework_cache.purge(('get_framework', framework_slug))
+            self.framework_cache.purge(('find_frameworks',))
+
+    def _get_responses(self):
+        if not has_app_context():
+            return None
+        if '_data_api_responses' not in g:
+            g._data_api_responses = {}
+        return g._data_api_responses
+
+    def _get(self, url, params=None, *, client_wait_for_response: bool = True):
+        if not client_wait_for_response:
+            return super()._get(url, params, client_wait_for_response=client_wait_for_response)
+
+        key = self._build_url(url, params)
+        responses = self._get_responses()
+        if responses is None:
+            return self._get_once(key, url, params)
+        if key not in responses:
+            response = self._get_once(key, url, params)
+            if response is None:
+                return None
+            responses[key] = response
+        return deepcopy(responses[key])
+
+    def _get_once(self, key, url, params):
+        (response, stale), coalesced = self.single_flight.do(
+            (self._writes, key), partial(self._get_shared, key, url, params)
+        )
+        if coalesced:
+            DATA_API_COALESCED_REQUESTS.labels(_endpoint(key)).inc()
+        if stale and has_app_context():
+            g.data_api_responses_are_stale = True
+        # the response belongs to the caller which made the request
+        return deepcopy(response) if coalesced else response
+
+    def _get_shared(self, key, url, params):
+        supplier_id = cached_supplier_id(key) if self.supplier_cache is not None else None
+        if supplier_id is None:
+            return self._get_or_fallback(key, url, params)
+
+        response, generation = self.supplier_cache.get(supplier_id, key)
+        SUPPLIER_CACHE_LOOKUPS.labels('miss' if response is None else 'hit').inc()
+        if response is not None:
+            return response, False
+
+        response, stale = self._get_or_fallback(key, url, params)
+        if response is not None and not stale:
+            self.supplier_cache.set(supplier_id, key, response, generation)
+        return response, stale
+
+    def _get_or_fallback(self, key, url, params):
+        endpoint = _endpoint(key)
+        if self.fallback_cache is None or not FALLBACK_ENDPOINTS.match(endpoint):
+            return super()._get(url, params), False
+
+        try:
+            response = super()._get(url, params)
+        except APIError as e:
+            fallback = self.fallback_cache.get(key) if _is_unavailable(e) else None
+            if fallback is None:
+                raise
+            logger.warning(
+                "Using last good response for {url} as the Data API is unavailable: {error}",
+                extra={'url': key, 'error': str(e)},
+            )
+            DATA_API_STALE_RESPONSES.labels(endpoint).inc()
+            return deepcopy(fallback), True
+
+        if response is not None:
+            self.fallback_cache.set(key, deepcopy(response))
+        return response, False
+
+    def _request(self, method, url, data=None, params=None, *, client_wait_for_response: bool = True):
+        request = partial(
+            super()._request, method, url, data, params, client_wait_for_response=client_wait_for_response
+        )
+        if method == 'GET':
+            return self._request_through_circuit_breaker(request)
+
+        self._forget_responses(url)
+        try:
+            return self._request_through_circuit_breaker(request)
+        finally:
+            # even if it failed, the write might have been made
+            self._invalidate_supplier_cache(url, data)
+
+    def _forget_responses(self, url):
+        self._writes += 1
+        responses = self._get_responses()
+        if responses:
+            responses.clear()
+        if urlparse(url).path.startswith('/frameworks'):
+            self.purge_framework_cache()
+
+    def _invalidate_supplier_cache(self, url, data):
+        if self.supplier_cache is None:
+            return
+        supplier_ids = set(written_supplier_ids(url, data))
+        if urlparse(url).path.startswith(('/users', '/agreements', '/draft-services')) and has_request_context():
+            # e.g. deactivating a user, signing an agreement or completing a draft service (which changes the supplier's
+            # draft counts), which are only ever for the logged in user's supplier
+            supplier_id = getattr(current_user, 'supplier_id', None)
+            if supplier_id is not None:
+                supplier_ids.add(supplier_id)
+        self.supplier_cache.invalidate(supplier_ids)
+
+    def _request_through_circuit_breaker(self, request):
+        if self.circuit_breaker is None:
+            return request()
+        if not self.circuit_breaker.allow():
+            DATA_API_CIRCUIT_BREAKER_REJECTIONS.inc()
+            raise HTTPError(message="Data API circuit breaker is open")
+        try:
+            response = request()
+        except APIError as e:
+            if _is_unavailable(e):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        except Exception:
+            # anything else (e.g. a response that isn't JSON) counts as a failure too, so a failed trial call while the
+            # breaker is half-open always opens it again
+            self.circuit_breaker.record_failure()
+            raise
+        self.circuit_breaker.record_success()
+        return response
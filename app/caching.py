@@ -0,0 +1,222 @@
+import logging
+import time
+from collections import OrderedDict
+from functools import partial
+from queue import Queue
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """A bounded, threadsafe least recently used cache"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop every item whose key ``predicate`` returns True for"""
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                del self._items[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize}
+
+
+class _Refresher:
+    """Runs background refreshes one after another, on a single long-lived daemon thread.
+
+    Anything kept per thread (like S3 clients, see ``S3Buckets``) is then built once and reused by every refresh, rather
+    than built again for each one. The thread is started (again, e.g. in a forked worker) whenever it isn't running.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "Queue[Callable[[], None]]" = Queue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def submit(self, refresh: Callable[[], None]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name="ttl-cache-refresh", daemon=True)
+                self._thread.start()
+        self._queue.put(refresh)
+
+    def _run(self) -> None:
+        while True:
+            self._queue.get()()
+
+
+_refresher = _Refresher()
+
+
+class TTLCache:
+    """A threadsafe cache of values which are fetched again once they're more than ``ttl`` seconds old.
+
+    Expired values are still returned straight away for up to ``max_age`` seconds after they were fetched, while a
+    background thread (shared by every TTLCache) fetches a fresh one (stale-while-revalidate), so nothing waits for a
+    popular value to be refreshed. Values older than that are fetched before being returned.
+
+    ``on_lookup`` is called with ``'hit'``, ``'stale'`` or ``'miss'`` for every lookup.
+    """
+
+    def __init__(self, ttl: float, max_age: float, on_lookup: Optional[Callable[[str], None]] = None):
+        self.ttl = ttl
+        self.max_age = max(max_age, ttl)
+        self.on_lookup = on_lookup
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._items: Dict[Hashable, Tuple[float, Any]] = {}
+        self._refreshing: set = set()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Return the value cached for ``key``, calling ``fetch`` to get it if there isn't a usable one"""
+        now = time.monotonic()
+        fetched_at, value = self._items.get(key, (None, None))
+
+        if fetched_at is None or now - fetched_at > self.max_age:
+            self._record('miss')
+            return self._fetch(key, fetch)
+
+        if now - fetched_at > self.ttl:
+            self._record('stale')
+            with self._lock:
+                if key in self._refreshing:
+                    return value
+                self._refreshing.add(key)
+            _refresher.submit(partial(self._refresh, key, fetch))
+            return value
+
+        self._record('hit')
+        return value
+
+    def _fetch(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        fetched_at = time.monotonic()
+        value = fetch()
+        with self._lock:
+            # don't overwrite anything fetched more recently by another thread
+            if self._items.get(key, (fetched_at,))[0] <= fetched_at:
+                self._items[key] = (fetched_at, value)
+        return value
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Any]) -> None:
+        try:
+            self._fetch(key, fetch)
+        except Exception:
+            # the stale value will keep being used until it's too old, then it's fetched in the request again
+            logger.exception("Failed to refresh cached {key}", extra={'key': repr(key)})
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _record(self, result: str) -> None:
+        if result == 'hit':
+            self.hits += 1
+        elif result == 'stale':
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        if self.on_lookup:
+            self.on_lookup(result)
+
+    def purge(self, key: Optional[Hashable] = None) -> None:
+        """Forget the value cached for ``key``, or every value if no key is given"""
+        with self._lock:
+            if key is None:
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses, "size": len(self)}
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Lets concurrent calls for the same key share one call, rather than each making their own.
+
+    The first caller for a key makes the call; anyone else asking for the same key before it returns waits for it and
+    gets the same value (or exception). Nothing is remembered once the call has returned.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, fetch: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return the value of ``fetch()`` for ``key``, and whether it came from another caller's call"""
+        with self._lock:
+            other_flight = self._flights.get(key)
+            if other_flight is None:
+                flight = self._flights[key] = _Flight()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if other_flight is not None:
+            other_flight.done.wait()
+            if other_flight.error is not None:
+                raise other_flight.error
+            return other_flight.value, True
+
+        try:
+            flight.value = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value, False
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._flights)}
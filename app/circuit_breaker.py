@@ -0,0 +1,56 @@
+import time
+from threading import Lock
+from typing import Callable, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """A threadsafe circuit breaker, to stop calling a service which keeps failing.
+
+    The breaker opens after ``failure_threshold`` failures in a row, and no calls are allowed while it's open. Once it's
+    been open for ``reset_timeout`` seconds a single trial call is allowed (half-open): if that succeeds the breaker
+    closes again, otherwise it stays open for another ``reset_timeout`` seconds.
+
+    ``on_change`` is called with the new state whenever it changes.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, on_change: Optional[Callable[[str], None]] = None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def allow(self) -> bool:
+        """Whether a call should be made now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+                return True
+            # open, or the trial call hasn't finished yet
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            if self.on_change:
+                self.on_change(state)
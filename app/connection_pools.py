@@ -0,0 +1,145 @@
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from .metrics import HTTP_POOL_CONNECTIONS_IN_USE, HTTP_POOL_CONNECTIONS_OPENED, HTTP_POOL_EXHAUSTED
+
+
+class _MeteredHTTPConnection(HTTPConnection):
+    def connect(self):
+        HTTP_POOL_CONNECTIONS_OPENED.labels(self.host).inc()
+        super().connect()
+
+
+class _MeteredHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        HTTP_POOL_CONNECTIONS_OPENED.labels(self.host).inc()
+        super().connect()
+
+
+class _MeteredPoolMixin:
+    def _get_conn(self, timeout=None):
+        if self.pool is not None and self.pool.empty():
+            # every connection is in use, so we'll either wait for one or open one which won't be kept
+            HTTP_POOL_EXHAUSTED.labels(self.host).inc()
+        conn = super()._get_conn(timeout)
+        HTTP_POOL_CONNECTIONS_IN_USE.labels(self.host).inc()
+        return conn
+
+    def _put_conn(self, conn):
+        HTTP_POOL_CONNECTIONS_IN_USE.labels(self.host).dec()
+        super()._put_conn(conn)
+
+
+class _MeteredHTTPConnectionPool(_MeteredPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _MeteredHTTPConnection
+
+
+class _MeteredHTTPSConnectionPool(_MeteredPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _MeteredHTTPSConnection
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connection pools report how many connections they open, have in use, and when they run out.
+
+    ``socket_options`` are set on every connection the pools open (e.g. to turn on TCP keep-alive).
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['_socket_options']
+
+    def __init__(self, *args, socket_options=None, **kwargs):
+        self._socket_options = socket_options
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._socket_options:
+            pool_kwargs['socket_options'] = self._socket_options
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _MeteredHTTPConnectionPool,
+            'https': _MeteredHTTPSConnectionPool,
+        }
+
+
+def keep_alive_socket_options(idle: Optional[int]) -> list:
+    """Socket options to send TCP keep-alive probes after ``idle`` seconds without traffic (None to leave them off)"""
+    if not idle:
+        return list(HTTPConnection.default_socket_options)
+    options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # not every platform lets the timings be set
+    for name, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', max(idle // 4, 1)), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class ConnectionPools:
+    """HTTP connection pools for the app's outbound clients, shared between threads.
+
+    Adapters (and so their pools of kept alive connections) are shared by every thread, while each thread gets its own
+    ``requests.Session`` using them, as sessions' other state (e.g. cookies) isn't threadsafe.
+    """
+
+    def __init__(self, config):
+        self.pool_connections = config['DM_HTTP_POOL_CONNECTIONS']
+        self.pool_maxsize = config['DM_HTTP_POOL_MAXSIZE']
+        self.pool_block = config['DM_HTTP_POOL_BLOCK']
+        self.retries = config['DM_HTTP_RETRIES']
+        self.backoff_factor = config['DM_HTTP_RETRY_BACKOFF_FACTOR']
+        self.socket_options = keep_alive_socket_options(config['DM_HTTP_KEEP_ALIVE_IDLE'])
+        self._adapters: Dict[Tuple, PooledHTTPAdapter] = {}
+        self._sessions = threading.local()
+        self._lock = threading.Lock()
+
+    def adapter(self, *, retry_read_timeouts: bool = True, retry_statuses: Tuple[int, ...] = ()) -> PooledHTTPAdapter:
+        key = (retry_read_timeouts, tuple(retry_statuses))
+        with self._lock:
+            if key not in self._adapters:
+                self._adapters[key] = PooledHTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                    max_retries=Retry(
+                        total=self.retries,
+                        read=self.retries if retry_read_timeouts else 0,
+                        connect=self.retries,
+                        status=self.retries,
+                        backoff_factor=self.backoff_factor,
+                        status_forcelist=retry_statuses,
+                        raise_on_status=False,
+                    ),
+                    socket_options=self.socket_options,
+                )
+            return self._adapters[key]
+
+    def session(self, **adapter_kwargs) -> requests.Session:
+        """This thread's session using the shared ``adapter(**adapter_kwargs)``"""
+        key = tuple(sorted(adapter_kwargs.items()))
+        sessions: Dict[Tuple, requests.Session] = self._sessions.__dict__.setdefault('sessions', {})
+        if key not in sessions:
+            session = requests.Session()
+            adapter = self.adapter(**adapter_kwargs)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            sessions[key] = session
+        return sessions[key]
+
+    def close(self) -> None:
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters.clear()
+
+
+def init_app(app) -> ConnectionPools:
+    """Return the app's connection pools, setting them up if this is the first time they're needed"""
+    if 'connection_pools' not in app.extensions:
+        app.extensions['connection_pools'] = ConnectionPools(app.config)
+    connection_pools: ConnectionPools = app.extensions['connection_pools']
+    return connection_pools
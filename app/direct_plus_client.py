@@ -0,0 +1,49 @@
+from dmutils.direct_plus_client import DirectPlusClient
+
+
+class PooledDirectPlusClient(DirectPlusClient):
+    """A DirectPlusClient which makes its requests through one of the app's shared connection pools.
+
+    ``DirectPlusClient`` makes each request with a new connection (and so a new TLS handshake).
+    """
+
+    # Dun & Bradstreet's gateway errors are worth retrying, but not their 500s
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(self, username, password, connection_pools, logger=None):
+        super().__init__(username, password, logger=logger)
+        self.connection_pools = connection_pools
+
+    def _direct_plus_request(
+        self,
+        endpoint,
+        method='get',
+        version='v1',
+        payload=None,
+        extra_headers=(),
+        allow_access_token_reset=True
+    ):
+        if self.access_token is None and allow_access_token_reset is True:
+            self._reset_access_token()
+
+        url = f'{self.protocol}://{self.domain}/{version}/{endpoint}'
+        headers = {**dict(self.required_headers), **dict(extra_headers)}
+        session = self.connection_pools.session(retry_statuses=self.RETRY_STATUSES)
+
+        if method != 'get':
+            response = session.request(method, url, headers=headers, json=payload)
+        else:
+            response = session.get(url, headers=headers, params=payload)
+
+        if response.status_code == 401 and allow_access_token_reset is True:
+            # the access token has expired, so get a new one and try again (once)
+            self._reset_access_token()
+            response = self._direct_plus_request(
+                endpoint,
+                method=method,
+                version=version,
+                payload=payload,
+                extra_headers=extra_headers,
+                allow_access_token_reset=False
+            )
+        return response
@@ -1,14 +1,15 @@
-from copy import deepcopy
+from threading import Lock
 
 from flask import Blueprint, current_app
 from werkzeug.local import Local, LocalProxy
 
-from dmutils.direct_plus_client import DirectPlusClient
-
-from dmcontent.content_loader import ContentLoader
-
 from dmutils.timing import logged_duration
 
+from .. import connection_pools
+from ..direct_plus_client import PooledDirectPlusClient
+from ..metrics import record_content_metrics
+from .helpers.content import ContentWatcher, FrameworkContent, load_content_loader, write_content_snapshot
+
 main = Blueprint('main', __name__)
 
 # we use our own Local for objects we explicitly want to be able to retain between requests but shouldn't
@@ -16,97 +17,138 @@ main = Blueprint('main', __name__)
 _local = Local()
 
 
-def _make_content_loader_factory():
-    master_cl = ContentLoader('app/content')
-    master_cl.load_manifest('g-cloud-6', 'services', 'edit_service')
-    master_cl.load_messages('g-cloud-6', ['urls'])
-
-    master_cl.load_manifest('g-cloud-7', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-7', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-7', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-7', ['urls'])
-
-    master_cl.load_manifest('digital-outcomes-and-specialists', 'declaration', 'declaration')
-    master_cl.load_manifest('digital-outcomes-and-specialists', 'services', 'edit_submission')
-    master_cl.load_manifest('digital-outcomes-and-specialists', 'briefs', 'edit_brief')
-    master_cl.load_messages('digital-outcomes-and-specialists', ['urls'])
-
-    master_cl.load_manifest('digital-outcomes-and-specialists-2', 'declaration', 'declaration')
-    master_cl.load_manifest('digital-outcomes-and-specialists-2', 'services', 'edit_submission')
-    master_cl.load_manifest('digital-outcomes-and-specialists-2', 'services', 'edit_service')
-    master_cl.load_manifest('digital-outcomes-and-specialists-2', 'briefs', 'edit_brief')
-    master_cl.load_messages('digital-outcomes-and-specialists-2', ['urls'])
-
-    master_cl.load_manifest('g-cloud-8', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-8', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-8', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-8', ['urls'])
-
-    master_cl.load_manifest('g-cloud-9', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-9', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-9', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-9', ['urls', 'advice'])
-
-    master_cl.load_manifest('g-cloud-10', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-10', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-10', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-10', ['urls', 'advice'])
-    master_cl.load_metadata('g-cloud-10', ['copy_services'])
-
-    master_cl.load_manifest('digital-outcomes-and-specialists-3', 'declaration', 'declaration')
-    master_cl.load_manifest('digital-outcomes-and-specialists-3', 'services', 'edit_submission')
-    master_cl.load_manifest('digital-outcomes-and-specialists-3', 'services', 'edit_service')
-    master_cl.load_manifest('digital-outcomes-and-specialists-3', 'briefs', 'edit_brief')
-    master_cl.load_messages('digital-outcomes-and-specialists-3', ['urls'])
-    master_cl.load_metadata('digital-outcomes-and-specialists-3', ['copy_services', 'following_framework'])
-
-    master_cl.load_manifest('g-cloud-11', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-11', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-11', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-11', ['urls', 'advice'])
-    master_cl.load_metadata('g-cloud-11', ['copy_services', 'following_framework'])
-
-    master_cl.load_manifest('digital-outcomes-and-specialists-4', 'declaration', 'declaration')
-    master_cl.load_manifest('digital-outcomes-and-specialists-4', 'services', 'edit_submission')
-    master_cl.load_manifest('digital-outcomes-and-specialists-4', 'services', 'edit_service')
-    master_cl.load_manifest('digital-outcomes-and-specialists-4', 'briefs', 'edit_brief')
-    master_cl.load_messages('digital-outcomes-and-specialists-4', ['urls'])
-    master_cl.load_metadata('digital-outcomes-and-specialists-4', ['copy_services', 'following_framework'])
-
-    master_cl.load_manifest('g-cloud-12', 'services', 'edit_service')
-    master_cl.load_manifest('g-cloud-12', 'services', 'edit_submission')
-    master_cl.load_manifest('g-cloud-12', 'declaration', 'declaration')
-    master_cl.load_messages('g-cloud-12', ['urls', 'advice', 'e-signature'])
-    master_cl.load_metadata('g-cloud-12', ['copy_services', 'following_framework'])
-
-    master_cl.load_manifest('digital-outcomes-and-specialists-5', 'declaration', 'declaration')
-    master_cl.load_manifest('digital-outcomes-and-specialists-5', 'services', 'edit_submission')
-    master_cl.load_manifest('digital-outcomes-and-specialists-5', 'services', 'edit_service')
-    master_cl.load_manifest('digital-outcomes-and-specialists-5', 'briefs', 'edit_brief')
-    master_cl.load_messages('digital-outcomes-and-specialists-5', ['urls', 'e-signature'])
-    master_cl.load_metadata('digital-outcomes-and-specialists-5', ['copy_services', 'following_framework'])
-
-    # seal master_cl in a closure by returning a function which will only ever return an independent copy of it
-    return lambda: deepcopy(master_cl)
-
-
-_content_loader_factory = _make_content_loader_factory()
-
-
-@logged_duration(message="Spent {duration_real}s in get_content_loader")
+G_CLOUD_MANIFESTS = (('services', 'edit_service'), ('services', 'edit_submission'), ('declaration', 'declaration'))
+DOS_MANIFESTS = (
+    ('declaration', 'declaration'),
+    ('services', 'edit_submission'),
+    ('services', 'edit_service'),
+    ('briefs', 'edit_brief'),
+)
+
+FRAMEWORK_CONTENT = (
+    FrameworkContent('g-cloud-6', manifests=(('services', 'edit_service'),), messages=('urls',)),
+    FrameworkContent('g-cloud-7', manifests=G_CLOUD_MANIFESTS, messages=('urls',)),
+    FrameworkContent(
+        'digital-outcomes-and-specialists',
+        manifests=(('declaration', 'declaration'), ('services', 'edit_submission'), ('briefs', 'edit_brief')),
+        messages=('urls',),
+    ),
+    FrameworkContent('digital-outcomes-and-specialists-2', manifests=DOS_MANIFESTS, messages=('urls',)),
+    FrameworkContent('g-cloud-8', manifests=G_CLOUD_MANIFESTS, messages=('urls',)),
+    FrameworkContent('g-cloud-9', manifests=G_CLOUD_MANIFESTS, messages=('urls', 'advice')),
+    FrameworkContent(
+        'g-cloud-10', manifests=G_CLOUD_MANIFESTS, messages=('urls', 'advice'), metadata=('copy_services',)
+    ),
+    FrameworkContent(
+        'digital-outcomes-and-specialists-3',
+        manifests=DOS_MANIFESTS,
+        messages=('urls',),
+        metadata=('copy_services', 'following_framework'),
+    ),
+    FrameworkContent(
+        'g-cloud-11',
+        manifests=G_CLOUD_MANIFESTS,
+        messages=('urls', 'advice'),
+        metadata=('copy_services', 'following_framework'),
+    ),
+    FrameworkContent(
+        'digital-outcomes-and-specialists-4',
+        manifests=DOS_MANIFESTS,
+        messages=('urls',),
+        metadata=('copy_services', 'following_framework'),
+    ),
+    FrameworkContent(
+        'g-cloud-12',
+        manifests=G_CLOUD_MANIFESTS,
+        messages=('urls', 'advice', 'e-signature'),
+        metadata=('copy_services', 'following_framework'),
+    ),
+    FrameworkContent(
+        'digital-outcomes-and-specialists-5',
+        manifests=DOS_MANIFESTS,
+        messages=('urls', 'e-signature'),
+        metadata=('copy_services', 'following_framework'),
+    ),
+)
+
+CONTENT_PATH = 'app/content'
+# written at build time by `flask build-content-snapshot` - see scripts/build.sh
+CONTENT_SNAPSHOT_PATH = 'app/content-snapshot.pickle'
+
+# A single content loader shared by every thread. The loader only ever hands out fresh ContentManifests built over
+# its parsed content, so views are free to filter/summarise those in place without affecting anyone else.
+# If there's an up to date snapshot everything comes ready loaded from that, otherwise frameworks' content is parsed
+# on first use unless preload_content() is called (see DM_EAGER_CONTENT_LOADING).
+_content_loader = load_content_loader(CONTENT_PATH, FRAMEWORK_CONTENT, CONTENT_SNAPSHOT_PATH)
+
+
+def configure_content(expired_framework_limit):
+    _content_loader.expired_framework_limit = expired_framework_limit
+
+
+def log_content_summary(logger):
+    """Log how much memory each loaded framework's content is taking up and how long it took to load"""
+    framework_stats = _content_loader.framework_stats()
+    for framework_slug, stats in sorted(framework_stats.items()):
+        if stats['loaded']:
+            logger.info(
+                "Content for {framework_slug}: {content_bytes} bytes, loaded in {load_seconds:.3f}s",
+                extra={
+                    'framework_slug': framework_slug,
+                    'content_bytes': stats['bytes'],
+                    'load_seconds': stats['total_load_seconds'],
+                },
+            )
+
+    loaded_stats = [stats for stats in framework_stats.values() if stats['loaded']]
+    logger.info(
+        "Content loaded for {loaded_frameworks} of {registered_frameworks} frameworks: "
+        "{content_bytes} bytes, loaded in {load_seconds:.3f}s",
+        extra={
+            'loaded_frameworks': len(loaded_stats),
+            'registered_frameworks': len(framework_stats),
+            'content_bytes': sum(stats['bytes'] for stats in loaded_stats),
+            'load_seconds': sum(stats['total_load_seconds'] for stats in loaded_stats),
+        },
+    )
+
+
+def preload_content():
+    """Load every registered framework's content up front, e.g. before forking preloaded workers"""
+    _content_loader.load_all()
+
+
+_content_watcher = None
+_content_watcher_lock = Lock()
+
+
+def start_content_watcher(interval):
+    """Start reloading frameworks' content whenever their YAML changes (at most one watcher per process)"""
+    global _content_watcher
+    with _content_watcher_lock:
+        if _content_watcher is None:
+            _content_watcher = ContentWatcher(_content_loader, interval)
+            _content_watcher.start()
+    return _content_watcher
+
+
+def build_content_snapshot():
+    """Parse every registered framework's content and save it where workers will pick it up when they boot"""
+    return write_content_snapshot(load_content_loader(CONTENT_PATH, FRAMEWORK_CONTENT), CONTENT_SNAPSHOT_PATH)
+
+
 def get_content_loader():
-    if not hasattr(_local, "content_loader"):
-        _local.content_loader = _content_loader_factory()
-    return _local.content_loader
+    return _content_loader
 
 
 @logged_duration(message="Spent {duration_real}s in get_direct_plus_client")
 def get_direct_plus_client():
 
     if not hasattr(_local, "direct_plus_client"):
-        _local.direct_plus_client = DirectPlusClient(
+        _local.direct_plus_client = PooledDirectPlusClient(
             current_app.config['DM_DNB_API_USERNAME'],
-            current_app.config['DM_DNB_API_PASSWORD']
+            current_app.config['DM_DNB_API_PASSWORD'],
+            connection_pools.init_app(current_app),
         )
     return _local.direct_plus_client
 
@@ -121,5 +163,12 @@ def add_cache_control(response):
     return response
 
 
+@main.after_request
+def publish_content_metrics(response):
+    # the sizes and timings are worked out as frameworks are loaded, so this is cheap
+    record_content_metrics(_content_loader)
+    return response
+
+
 from .views import services, suppliers, login, frameworks, users
 from . import errors
@@ -0,0 +1,95 @@
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app
+
+from ...caching import TTLCache
+from ...metrics import COMMUNICATIONS_CACHE_LOOKUPS
+from ...s3_buckets import S3Buckets, init_app as init_s3_buckets
+
+
+class CommunicationsIndex:
+    """A framework's communications files (as listed by ``S3.list``, oldest first), indexed by folder and filename.
+
+    Every folder a file is in (at any depth) is indexed up front. Any other prefix (e.g. a whole path) is looked for
+    once, then remembered - listings are never changed, only replaced - so lookups don't scan the files again.
+    """
+
+    def __init__(self, files: Iterable[dict]):
+        self.files = tuple(files)
+        self._by_folder: Dict[str, List[dict]] = {}
+        self._by_prefix: Dict[str, Optional[dict]] = {}
+        for file in self.files:
+            folder = file['path']
+            while '/' in folder:
+                folder = folder.rsplit('/', 1)[0]
+                self._by_folder.setdefault(folder + '/', []).append(file)
+
+    def files_in(self, folder: str) -> List[dict]:
+        """The files whose paths start with ``folder`` (ending in a '/'), oldest first"""
+        return list(self._by_folder.get(folder, ()))
+
+    def latest(self, prefix: str) -> Optional[dict]:
+        """The most recently modified file whose path starts with ``prefix``, or None if there isn't one"""
+        if prefix in self._by_folder:
+            return self._by_folder[prefix][-1]
+        if prefix not in self._by_prefix:
+            self._by_prefix[prefix] = next(
+                (file for file in reversed(self.files) if file['path'].startswith(prefix)), None
+            )
+        return self._by_prefix[prefix]
+
+    def last_modified(self, prefix: str) -> Optional[str]:
+        return (self.latest(prefix) or {}).get('last_modified')
+
+
+class CommunicationsCache:
+    """Frameworks' communications listings from the communications bucket, which are the same for every supplier.
+
+    Listings are cached for ``ttl`` seconds (and refreshed in the background after that, see ``TTLCache``), or with
+    a ``ttl`` of 0 listed every time. ``refresh`` forgets them sooner, e.g. once new communications are published.
+    """
+
+    def __init__(self, s3_buckets: S3Buckets, bucket_name: str, ttl: float, max_age: float):
+        self.s3_buckets = s3_buckets
+        self.bucket_name = bucket_name
+        if ttl:
+            self.listings: Optional[TTLCache] = TTLCache(
+                ttl, max_age, on_lookup=lambda result: COMMUNICATIONS_CACHE_LOOKUPS.labels(result).inc(),
+            )
+        else:
+            self.listings = None
+
+    def _list(self, framework_slug: str) -> CommunicationsIndex:
+        return CommunicationsIndex(
+            self.s3_buckets.get(self.bucket_name).list("{}/communications".format(framework_slug), load_timestamps=True)
+        )
+
+    def get(self, framework_slug: str) -> CommunicationsIndex:
+        if self.listings is None:
+            return self._list(framework_slug)
+        communications: CommunicationsIndex = self.listings.get(framework_slug, lambda: self._list(framework_slug))
+        return communications
+
+    def refresh(self, framework_slug: Optional[str] = None) -> None:
+        """List ``framework_slug``'s communications (or every framework's) again next time they're needed"""
+        if self.listings is not None:
+            self.listings.purge(framework_slug)
+
+
+def init_app(app):
+    app.extensions['communications_cache'] = CommunicationsCache(
+        init_s3_buckets(app),
+        app.config['DM_COMMUNICATIONS_BUCKET'],
+        app.config['DM_COMMUNICATIONS_CACHE_TTL'],
+        app.config['DM_COMMUNICATIONS_CACHE_MAX_AGE'],
+    )
+
+
+def get_communications(framework_slug: str) -> CommunicationsIndex:
+    communications_cache: CommunicationsCache = current_app.extensions['communications_cache']
+    return communications_cache.get(framework_slug)
+
+
+def refresh_communications(framework_slug: Optional[str] = None) -> None:
+    communications_cache: CommunicationsCache = current_app.extensions['communications_cache']
+    communications_cache.refresh(framework_slug)
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Lock, local
+from typing import Any, Callable, Dict, List
+
+from flask import current_app
+from flask.globals import _app_ctx_stack, _request_ctx_stack
+
+# the config setting for the number of workers in each pool
+POOLS = {
+    'calls': 'DM_CONCURRENT_CALLS_MAX_WORKERS',
+    'uploads': 'DM_CONCURRENT_UPLOADS_MAX_WORKERS',
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = Lock()
+_worker = local()
+
+
+def _get_executor(pool: str) -> ThreadPoolExecutor:
+    with _executor_lock:
+        if pool not in _executors:
+            _executors[pool] = ThreadPoolExecutor(
+                max_workers=current_app.config[POOLS[pool]],
+                thread_name_prefix='concurrent-{}'.format(pool),
+            )
+        return _executors[pool]
+
+
+def _call_in_context(app_context, request_context, call: Callable[[], Any]) -> Any:
+    # Share the caller's contexts (and so its g, session and logged in user) rather than pushing copies, which would
+    # tear the request down when they're popped. They go straight onto this thread's stacks, so nothing is run on
+    # pushing or popping them.
+    _app_ctx_stack.push(app_context)
+    if request_context is not None:
+        _request_ctx_stack.push(request_context)
+    _worker.active = True
+    try:
+        return call()
+    finally:
+        _worker.active = False
+        if request_context is not None:
+            _request_ctx_stack.pop()
+        _app_ctx_stack.pop()
+
+
+def run_concurrently(*calls: Callable[[], Any], pool: str = 'calls') -> List[Any]:
+    """Make independent calls (e.g. API reads) at the same time, returning their results in the order given.
+
+    Each call runs in a thread from the shared ``pool`` (see ``POOLS``), with the caller's app and request contexts.
+    Once they've all finished the exception raised by the first call to fail (if any) is raised, just as if they'd been
+    called in turn. Slow calls like document uploads use a pool of their own, so they can't hold up other views' calls.
+
+    Calls made from inside another concurrent call (or with only one worker configured) are made one after another
+    instead, so the pool can never deadlock waiting for itself.
+    """
+    if getattr(_worker, 'active', False) or current_app.config[POOLS[pool]] < 2:
+        return [call() for call in calls]
+
+    app_context = _app_ctx_stack.top
+    request_context = _request_ctx_stack.top
+    executor = _get_executor(pool)
+    futures = [executor.submit(_call_in_context, app_context, request_context, call) for call in calls]
+    wait(futures)
+
+    return [future.result() for future in futures]
@@ -0,0 +1,756 @@
+import copyreg
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+from threading import Event, Lock, RLock, Thread
+from types import CodeType, FunctionType
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Tuple, cast
+
+import dmcontent
+from dmcontent.content_loader import ContentLoader, ContentManifest
+from dmcontent.errors import ContentNotFoundError
+from dmcontent.questions import ContentQuestion, Multiquestion, Pricing
+from dmcontent.utils import TemplateField, template_environment
+from jinja2 import meta
+
+from ...caching import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class FrameworkContent(NamedTuple):
+    """The manifests, messages and metadata a framework needs loading before it can be served"""
+    framework_slug: str
+    manifests: Tuple[Tuple[str, str], ...] = ()  # (question_set, manifest) pairs
+    messages: Tuple[str, ...] = ()
+    metadata: Tuple[str, ...] = ()
+
+
+def _template_variables(template_field: TemplateField) -> FrozenSet[str]:
+    return frozenset(meta.find_undeclared_variables(template_environment.parse(template_field.source)))
+
+
+def _context_keys(content: Any) -> FrozenSet[str]:
+    """The context keys which can affect filtering or rendering any part of some parsed manifest content"""
+    if isinstance(content, TemplateField):
+        return _template_variables(content)
+    if isinstance(content, (list, tuple)):
+        return frozenset().union(*(_context_keys(item) for item in content))
+    if not isinstance(content, dict):
+        return frozenset()
+
+    keys = frozenset().union(*(_context_keys(value) for value in content.values()))
+    if content.get('depends'):
+        keys |= frozenset(depends['on'] for depends in content['depends'])
+    if content.get('dynamic_field'):
+        keys |= {content['dynamic_field'].split('.')[0]}
+    return keys
+
+
+def _freeze(value: Any) -> Hashable:
+    # include the type so e.g. True and 1, which hash the same but render differently, don't share a cache entry
+    if isinstance(value, dict):
+        return dict, tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return list, tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset(_freeze(item) for item in value)
+    return type(value), value
+
+
+class IndexedQuestion:
+    """A question from a QuestionIndex, with the details validation needs looked up once"""
+    __slots__ = ('question', 'type', 'max_length_in_words', 'number', '_validations')
+
+    def __init__(self, question):
+        self.question = question
+        self.type = question.get('type')
+        self.max_length_in_words = question.get('max_length_in_words')
+        self.number = question.get('number')
+        self._validations: Optional[List[dict]] = None
+
+    @property
+    def validations(self) -> List[dict]:
+        # validation messages are templates, so only render them when they're needed
+        validations = self._validations
+        if validations is None:
+            validations = self._validations = self.question.get('validations', [])
+        return validations
+
+
+class QuestionIndex:
+    """All of a manifest's questions by id, in the order and with the precedence of ``ContentManifest.get_question``
+
+    Like ``get_question``, pricing questions can be looked up by the ids of their fields as well as their own.
+
+    ``section_offsets`` is the number of questions in the sections before each section, by section id.
+
+    Only valid for as long as the manifest isn't filtered or summarised in place.
+    """
+
+    def __init__(self, manifest: ContentManifest):
+        self.question_ids: List[str] = []
+        self.section_offsets: Dict[str, int] = {}
+        self._questions: Dict[str, IndexedQuestion] = {}
+
+        for section in manifest.sections:
+            self.section_offsets.setdefault(section.id, len(self.question_ids))
+            self.question_ids.extend(section.get_question_ids())
+            for question in section.questions:
+                self._add(question.id, question)
+                if isinstance(question, Pricing):
+                    for field_name in question.fields.values():
+                        self._add(field_name, question)
+                elif isinstance(question, Multiquestion):
+                    for nested_question in question.questions:
+                        self._add(nested_question.id, nested_question)
+
+    def _add(self, question_id: str, question):
+        if question_id not in self._questions:
+            self._questions[question_id] = IndexedQuestion(question)
+
+    def __contains__(self, question_id):
+        return question_id in self._questions
+
+    def __getitem__(self, question_id) -> IndexedQuestion:
+        return self._questions[question_id]
+
+    def get(self, question_id) -> Optional[IndexedQuestion]:
+        return self._questions.get(question_id)
+
+    def get_question(self, question_id):
+        """A drop-in replacement for ``ContentManifest.get_question``"""
+        indexed_question = self._questions.get(question_id)
+        return indexed_question.question if indexed_question else None
+
+
+def get_question_index(manifest: ContentManifest) -> QuestionIndex:
+    """Return ``manifest``'s QuestionIndex - cached for shared manifests, built from scratch for any other"""
+    if isinstance(manifest, FilteredContentManifest):
+        return manifest.question_index
+    return QuestionIndex(manifest)
+
+
+class FilteredContentManifest(ContentManifest):
+    """A ContentManifest filtered once and then shared between requests.
+
+    Filtering or summarising it always returns a new manifest - ``inplace_allowed`` is ignored.
+
+    ``cache_key`` identifies the content and context it was filtered with, so that anything derived from it (like draft
+    summaries) can be cached too. ``content_key`` identifies them by the content's checksum rather than its version in
+    this process, so is the same in every worker and can key anything shared between them.
+    """
+
+    def __init__(
+        self, sections, context, cache_key: Optional[Hashable] = None, content_key: Optional[Hashable] = None
+    ):
+        super().__init__(sections)
+        super().filter(context, inplace_allowed=True)
+        self.cache_key = cache_key
+        self.content_key = content_key
+        self._question_index: Optional[QuestionIndex] = None
+
+    @property
+    def question_index(self) -> QuestionIndex:
+        if self._question_index is None:
+            self._question_index = QuestionIndex(self)
+        return self._question_index
+
+    def get_question(self, field_name):
+        return self.question_index.get_question(field_name)
+
+    def filter(self, context, dynamic=True, inplace_allowed: bool = False) -> ContentManifest:
+        return super().filter(context, dynamic=dynamic, inplace_allowed=False)
+
+    def summary(self, service_data, inplace_allowed: bool = False) -> ContentManifest:
+        return super().summary(service_data, inplace_allowed=False)
+
+
+class FilteredManifestCache(LRUCache):
+    """A bounded, threadsafe LRU cache of FilteredContentManifests, keyed by tuples starting with the framework slug"""
+
+    def discard_framework(self, framework_slug: str) -> None:
+        """Drop every manifest cached for ``framework_slug``"""
+        self.discard_where(lambda key: cast(tuple, key)[0] == framework_slug)
+
+
+def _compiled_template(template_field: TemplateField) -> Any:
+    try:
+        # dmcontent seals the compiled jinja template inside the closure of its proxy's render function
+        template = template_field.template.render.__closure__[0].cell_contents
+    except (AttributeError, IndexError, TypeError):
+        return None
+    # the environment and its globals are shared by every template, so only count what was compiled for this one
+    return template, template.root_render_func, template.blocks, template._debug_info
+
+
+def _referents(obj: Any) -> Iterable[Any]:
+    if isinstance(obj, dict):
+        return chain(obj.keys(), obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return obj
+    if isinstance(obj, TemplateField):
+        return obj.source, _compiled_template(obj)
+    if isinstance(obj, FunctionType):
+        return obj.__code__,
+    if isinstance(obj, CodeType):
+        return obj.co_code, obj.co_consts
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return vars(obj),
+    return ()
+
+
+def retained_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximately how many bytes ``obj`` and everything it refers to take up.
+
+    Objects already in ``seen`` (a set of ids) aren't counted again, so sharing it between calls counts anything they
+    have in common once.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    return sys.getsizeof(obj) + sum(retained_size(referent, seen) for referent in _referents(obj))
+
+
+class LazyContentLoader(ContentLoader):
+    """A ContentLoader which loads each framework's declared content the first time it is asked for.
+
+    Frameworks not in the registry behave exactly as with a plain ContentLoader, so anything not declared (or not
+    loaded explicitly) still raises ContentNotFoundError.
+
+    Safe to share between threads: loading is serialised and the parsed content is never handed out directly.
+    Every ``get_manifest`` call builds a new ContentManifest (with its own sections and questions) on top of the
+    shared parsed content, so callers can ``filter``/``summary`` it with ``inplace_allowed=True`` without copying
+    anything else.
+
+    Manifests filtered with ``get_filtered_manifest`` are cached instead, so can't be changed in place.
+
+    Content is kept in two tiers, depending on the framework statuses passed to ``set_framework_status``. Expired
+    frameworks' content is only kept for the ``expired_framework_limit`` most recently used of them, and is loaded
+    again on demand once evicted. Every other framework's content is pinned once it has been loaded.
+    """
+
+    filtered_manifest_cache_size = 256
+    expired_framework_limit = 2
+
+    def __init__(self, content_path: str, framework_content: Iterable[FrameworkContent]):
+        super().__init__(content_path)
+        self._framework_content = {fc.framework_slug: fc for fc in framework_content}
+        self._loaded_frameworks: set = set()
+        # the loaders mutate shared dicts and dmcontent's markdown renderer is not threadsafe, so all loading
+        # happens with this held
+        self._lock = RLock()
+        self._manifest_context_keys: Dict[Tuple[str, str], FrozenSet[str]] = {}
+        # bumped every time a framework's content is (re)loaded, so anything derived from it can tell it's stale
+        self._framework_versions: Dict[str, int] = {}
+        # a checksum of each loaded framework's content, which (unlike its version) is the same in every process
+        self._framework_checksums: Dict[str, str] = {}
+        self.filtered_manifests = FilteredManifestCache(self.filtered_manifest_cache_size)
+        self._framework_statuses: Dict[str, Optional[str]] = {}
+        # loaded expired frameworks, least recently used first
+        self._expired_frameworks: "OrderedDict[str, None]" = OrderedDict()
+        self._framework_sizes: Dict[str, int] = {}
+        # how long (in seconds) loading each of a framework's manifests, messages and metadata blocks last took
+        self._load_durations: Dict[str, Dict[str, Dict[str, float]]] = {}
+        # things worked out from a framework's content, with the version of the content they were worked out from
+        self._derived_content: Dict[Tuple[str, str], Tuple[Optional[int], Any]] = {}
+        # guards the tiers, separately from loading so that using an expired framework never waits on a load
+        self._tier_lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_tier_lock"]
+        del state["filtered_manifests"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = RLock()
+        self._tier_lock = Lock()
+        self.filtered_manifests = FilteredManifestCache(self.filtered_manifest_cache_size)
+
+    @property
+    def framework_content(self) -> Tuple[FrameworkContent, ...]:
+        return tuple(self._framework_content.values())
+
+    @property
+    def loaded_frameworks(self) -> Tuple[str, ...]:
+        return tuple(sorted(self._loaded_frameworks))
+
+    @property
+    def framework_versions(self) -> Dict[str, int]:
+        return dict(self._framework_versions)
+
+    def load_framework(self, framework_slug: str) -> None:
+        if framework_slug in self._loaded_frameworks:
+            self._touch(framework_slug)
+            return
+        if framework_slug not in self._framework_content:
+            return
+
+        with self._lock:
+            # another thread may have finished loading while we waited for the lock
+            if framework_slug in self._loaded_frameworks:
+                return
+
+            start_time = time.perf_counter()
+            framework_content = self._framework_content[framework_slug]
+            self._framework_checksums[framework_slug] = framework_checksum(self.content_path, framework_content)
+            for question_set, manifest in framework_content.manifests:
+                self.load_manifest(framework_slug, question_set, manifest)
+            if framework_content.messages:
+                self.load_messages(framework_slug, list(framework_content.messages))
+            if framework_content.metadata:
+                self.load_metadata(framework_slug, list(framework_content.metadata))
+
+            self._loaded_frameworks.add(framework_slug)
+            self._framework_versions[framework_slug] = self._framework_versions.get(framework_slug, 0) + 1
+            self._framework_sizes[framework_slug] = self._retained_framework_size(framework_slug)
+
+        logger.info(
+            "Loaded content for %s in %.3fs (%s bytes)",
+            framework_slug, time.perf_counter() - start_time, self._framework_sizes[framework_slug],
+        )
+
+        with self._tier_lock:
+            if self._framework_statuses.get(framework_slug) == 'expired':
+                self._expired_frameworks[framework_slug] = None
+        self._evict_expired_frameworks()
+
+    def reload_framework(self, framework_slug: str) -> bool:
+        """Re-read a loaded framework's content from disk and swap it in, returning whether that worked.
+
+        Requests already holding the framework's old manifests carry on using them. If the new content can't be
+        loaded (e.g. it's part way through being edited) the old content is kept.
+        """
+        if framework_slug not in self._loaded_frameworks:
+            return False
+
+        # include any messages and metadata views have loaded explicitly, as well as the registered ones
+        framework_content = self._framework_content[framework_slug]._replace(
+            messages=tuple(self._messages.get(framework_slug, ())),
+            metadata=tuple(self._metadata.get(framework_slug, ())),
+        )
+        staging = LazyContentLoader(self.content_path, (framework_content,))
+
+        # dmcontent's markdown renderer isn't threadsafe so this blocks other loading, but not reading loaded content
+        with self._lock:
+            try:
+                staging.load_framework(framework_slug)
+            except Exception:
+                logger.exception("Failed to reload content for %s", framework_slug)
+                return False
+
+            self._content[framework_slug] = dict(self._content[framework_slug], **staging._content[framework_slug])
+            self._messages[framework_slug] = staging._messages[framework_slug]
+            self._metadata[framework_slug] = staging._metadata[framework_slug]
+            self._questions[framework_slug] = staging._questions[framework_slug]
+            self._framework_checksums[framework_slug] = staging._framework_checksums[framework_slug]
+            for kind, durations in staging._load_durations[framework_slug].items():
+                self._load_durations.setdefault(framework_slug, {}).setdefault(kind, {}).update(durations)
+            self._manifest_context_keys = {
+                key: context_keys for key, context_keys in self._manifest_context_keys.items()
+                if key[0] != framework_slug
+            }
+            self._framework_versions[framework_slug] += 1
+            self._framework_sizes[framework_slug] = self._retained_framework_size(framework_slug)
+
+        logger.info("Reloaded content for %s (version %s)", framework_slug, self._framework_versions[framework_slug])
+        return True
+
+    def unload_framework(self, framework_slug: str) -> None:
+        """Drop a framework's loaded content, so that it's loaded afresh from its YAML the next time it's needed"""
+        with self._lock:
+            if framework_slug not in self._loaded_frameworks:
+                return
+
+            self._loaded_frameworks.discard(framework_slug)
+            for loaded in (self._content, self._messages, self._metadata, self._questions, self._framework_sizes):
+                loaded.pop(framework_slug, None)
+            self._derived_content = {
+                key: derived for key, derived in self._derived_content.items() if key[0] != framework_slug
+            }
+            self._manifest_context_keys = {
+                key: context_keys for key, context_keys in self._manifest_context_keys.items()
+                if key[0] != framework_slug
+            }
+            # the version is kept, so that if the framework is loaded again its version still changes
+
+        with self._tier_lock:
+            self._expired_frameworks.pop(framework_slug, None)
+        self.filtered_manifests.discard_framework(framework_slug)
+
+        logger.info("Unloaded content for %s", framework_slug)
+
+    def set_framework_status(self, framework_slug: str, status: Optional[str]) -> None:
+        """Note a framework's status from the API, which decides which tier its content is kept in"""
+        if self._framework_statuses.get(framework_slug, object()) == status:
+            return
+
+        with self._tier_lock:
+            self._framework_statuses[framework_slug] = status
+            if status != 'expired':
+                self._expired_frameworks.pop(framework_slug, None)
+            elif framework_slug in self._loaded_frameworks:
+                self._expired_frameworks[framework_slug] = None
+        self._evict_expired_frameworks()
+
+    def _touch(self, framework_slug: str) -> None:
+        if framework_slug in self._expired_frameworks:
+            with self._tier_lock:
+                if framework_slug in self._expired_frameworks:
+                    self._expired_frameworks.move_to_end(framework_slug)
+
+    def _evict_expired_frameworks(self) -> None:
+        with self._tier_lock:
+            excess = len(self._expired_frameworks) - max(self.expired_framework_limit, 1)
+            evicted = list(self._expired_frameworks)[:max(excess, 0)]
+        for framework_slug in evicted:
+            self.unload_framework(framework_slug)
+
+    def _retained_framework_size(self, framework_slug: str) -> int:
+        # questions are shared between manifests and the question sets, so make sure they're only counted once
+        seen: set = set()
+        return sum(
+            retained_size(loaded.get(framework_slug, {}), seen)
+            for loaded in (self._content, self._messages, self._metadata, self._questions)
+        )
+
+    def tier_stats(self) -> Dict[str, Dict[str, Any]]:
+        """The frameworks loaded in each tier and roughly how many bytes of content each tier is holding on to"""
+        with self._tier_lock:
+            expired = tuple(self._expired_frameworks)
+        tiers = {
+            'pinned': sorted(set(self._loaded_frameworks).difference(expired)),
+            'expired': sorted(expired),
+        }
+        return {
+            tier: {
+                'frameworks': framework_slugs,
+                'bytes': sum(self._framework_sizes.get(framework_slug, 0) for framework_slug in framework_slugs),
+            }
+            for tier, framework_slugs in tiers.items()
+        }
+
+    def framework_stats(self) -> Dict[str, Dict[str, Any]]:
+        """How many bytes each registered framework's loaded content roughly takes up, and how long it took to load
+
+        ``load_seconds`` breaks the load time down into each manifest, messages block and metadata block, and is kept
+        after a framework is unloaded.
+        """
+        stats = {}
+        for framework_slug in self._framework_content:
+            load_durations = {
+                kind: dict(durations) for kind, durations in self._load_durations.get(framework_slug, {}).items()
+            }
+            stats[framework_slug] = {
+                'loaded': framework_slug in self._loaded_frameworks,
+                'bytes': self._framework_sizes.get(framework_slug, 0),
+                'load_seconds': load_durations,
+                'total_load_seconds': sum(sum(durations.values()) for durations in load_durations.values()),
+            }
+        return stats
+
+    @contextmanager
+    def _timed_load(self, framework_slug: str, kind: str, name: str):
+        start_time = time.perf_counter()
+        yield
+        self._load_durations.setdefault(framework_slug, {}).setdefault(kind, {})[name] = (
+            time.perf_counter() - start_time
+        )
+
+    def load_all(self) -> None:
+        for framework_slug in self._framework_content:
+            self.load_framework(framework_slug)
+
+    def load_manifest(self, framework_slug, question_set, manifest):
+        with self._lock:
+            if manifest in self._content.get(framework_slug, ()):
+                return None
+            with self._timed_load(framework_slug, 'manifests', manifest):
+                return super().load_manifest(framework_slug, question_set, manifest)
+
+    def load_messages(self, framework_slug, blocks):
+        # views load some messages at request time, which only needs to hit the filesystem the first time
+        if isinstance(blocks, list):
+            blocks = [block for block in blocks if block not in self._messages.get(framework_slug, ())]
+        with self._lock:
+            return super().load_messages(framework_slug, blocks)
+
+    def _load_message(self, framework_slug, message_name):
+        with self._timed_load(framework_slug, 'messages', message_name):
+            return super()._load_message(framework_slug, message_name)
+
+    def load_metadata(self, framework_slug, blocks):
+        if isinstance(blocks, list):
+            blocks = [block for block in blocks if block not in self._metadata.get(framework_slug, ())]
+        with self._lock:
+            return super().load_metadata(framework_slug, blocks)
+
+    def _load_metadata(self, framework_slug, metadata_name):
+        with self._timed_load(framework_slug, 'metadata', metadata_name):
+            return super()._load_metadata(framework_slug, metadata_name)
+
+    def _read_loaded(self, framework_slug: str, read: Callable[[], Any]) -> Any:
+        """Load ``framework_slug`` and return ``read()``, loading it again if it's unloaded before ``read`` runs"""
+        self.load_framework(framework_slug)
+        try:
+            return read()
+        except (KeyError, ContentNotFoundError):
+            if framework_slug not in self._framework_content:
+                raise
+        # another thread evicted the framework in between, so this time keep hold of the lock, which unloading needs
+        with self._lock:
+            self.load_framework(framework_slug)
+            return read()
+
+    def get_manifest(self, framework_slug, manifest):
+        return self._read_loaded(framework_slug, lambda: super(LazyContentLoader, self).get_manifest(
+            framework_slug, manifest
+        ))
+
+    # ContentLoader aliases get_builder to its own get_manifest, so it has to be re-pointed at ours
+    get_builder = get_manifest
+
+    def get_filtered_manifest(self, framework_slug: str, manifest: str, context: dict) -> FilteredContentManifest:
+        """Return ``get_manifest(framework_slug, manifest).filter(context)``, cached.
+
+        The context is narrowed down to the keys the manifest actually refers to (in ``depends`` rules, templates
+        and dynamic lists), so e.g. every draft service in the same lot shares a cache entry.
+        """
+        return cast(FilteredContentManifest, self._read_loaded(
+            framework_slug, lambda: self._get_filtered_manifest(framework_slug, manifest, context)
+        ))
+
+    def _get_filtered_manifest(self, framework_slug: str, manifest: str, context: dict) -> FilteredContentManifest:
+        context_keys = self._get_manifest_context_keys(framework_slug, manifest)
+        context = {key: value for key, value in context.items() if key in context_keys}
+        # entries for older versions of the framework's content just drop out of the cache unused
+        frozen_context = _freeze(context)
+        cache_key = (framework_slug, self._framework_versions.get(framework_slug), manifest, frozen_context)
+
+        filtered_manifest: Optional[FilteredContentManifest] = self.filtered_manifests.get(cache_key)
+        if filtered_manifest is None:
+            checksum = self._framework_checksums.get(framework_slug)
+            # content that wasn't registered (and so has no checksum) can't be told apart between processes
+            content_key = (framework_slug, checksum, manifest, frozen_context) if checksum else None
+            filtered_manifest = FilteredContentManifest(
+                self._get_manifest_sections(framework_slug, manifest), context, cache_key, content_key
+            )
+            self.filtered_manifests.set(cache_key, filtered_manifest)
+
+        return filtered_manifest
+
+    def get_lot_options(self, framework_slug: str) -> Dict[str, dict]:
+        """The rendered options of a framework's ``lot`` service question, by lot slug
+
+        Worked out once per version of the framework's content and shared, so mustn't be modified.
+        """
+        lot_options: Dict[str, dict] = self._get_derived_content(framework_slug, 'lot_options', self._build_lot_options)
+        return lot_options
+
+    def _build_lot_options(self, framework_slug: str) -> Dict[str, dict]:
+        lot_question = ContentQuestion(self.get_question(framework_slug, 'services', 'lot'))
+        return {option['value']: option for option in lot_question.get('options')}
+
+    def _get_derived_content(self, framework_slug: str, name: str, build: Callable[[str], Any]) -> Any:
+        self.load_framework(framework_slug)
+        version = self._framework_versions.get(framework_slug)
+        derived_version, derived = self._derived_content.get((framework_slug, name), (None, None))
+        if derived is None or derived_version != version:
+            derived = build(framework_slug)
+            self._derived_content[(framework_slug, name)] = (version, derived)
+        return derived
+
+    def _get_manifest_sections(self, framework_slug, manifest):
+        try:
+            return self._content[framework_slug][manifest]
+        except KeyError:
+            raise ContentNotFoundError("Content not found for {} and {}".format(framework_slug, manifest))
+
+    def _get_manifest_context_keys(self, framework_slug: str, manifest: str) -> FrozenSet[str]:
+        key = (framework_slug, manifest)
+        if key not in self._manifest_context_keys:
+            self._manifest_context_keys[key] = _context_keys(self._get_manifest_sections(framework_slug, manifest))
+        return self._manifest_context_keys[key]
+
+    def get_question(self, framework_slug, question_set, question):
+        try:
+            # questions are only ever added or swapped wholesale, so reading one that's loaded doesn't need the lock
+            return self._questions[framework_slug][question_set][question].copy()
+        except KeyError:
+            pass
+        with self._lock:
+            return super().get_question(framework_slug, question_set, question)
+
+    def get_message(self, framework_slug, block, key=None):
+        return self._read_loaded(framework_slug, lambda: super(LazyContentLoader, self).get_message(
+            framework_slug, block, key
+        ))
+
+    def get_metadata(self, framework_slug, block, key=None):
+        return self._read_loaded(framework_slug, lambda: super(LazyContentLoader, self).get_metadata(
+            framework_slug, block, key
+        ))
+
+
+def _reduce_template_field(template_field):
+    # a TemplateField's compiled template can't be pickled, so rebuild it from its source when unpickling
+    return TemplateField, (template_field.source, template_field.markdown)
+
+
+def _framework_yaml_files(content_path: str, framework_slug: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(os.path.join(content_path, 'frameworks', framework_slug)):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith('.yml'):
+                yield os.path.join(dirpath, filename)
+
+
+def _update_checksum(checksum, content_path: str, framework_slug: str) -> None:
+    for file_path in _framework_yaml_files(content_path, framework_slug):
+        checksum.update(os.path.relpath(file_path, content_path).encode())
+        with open(file_path, 'rb') as f:
+            checksum.update(f.read())
+
+
+def content_checksum(content_path: str, framework_content: Iterable[FrameworkContent]) -> str:
+    """A checksum of everything that goes into a fully loaded content loader, used to spot stale snapshots"""
+    framework_content = tuple(framework_content)
+    checksum = hashlib.sha256()
+    checksum.update(repr((dmcontent.__version__, sys.version_info[:2], framework_content)).encode())
+
+    for framework_slug in sorted(fc.framework_slug for fc in framework_content):
+        _update_checksum(checksum, content_path, framework_slug)
+
+    return checksum.hexdigest()
+
+
+def framework_checksum(content_path: str, framework_content: FrameworkContent) -> str:
+    """A checksum of the YAML a framework's manifests are built from, which is the same wherever it's worked out"""
+    checksum = hashlib.sha256()
+    checksum.update(repr((dmcontent.__version__, framework_content.manifests)).encode())
+    _update_checksum(checksum, content_path, framework_content.framework_slug)
+    return checksum.hexdigest()
+
+
+def framework_fingerprint(content_path: str, framework_slug: str) -> Tuple[Tuple[str, int, int], ...]:
+    """A cheap (stat-only) fingerprint of a framework's YAML, which changes when any file is added, removed or edited"""
+    fingerprint = []
+    for file_path in _framework_yaml_files(content_path, framework_slug):
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        fingerprint.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+class ContentWatcher(Thread):
+    """Polls the YAML of a content loader's frameworks and reloads any loaded framework whose files change"""
+
+    def __init__(self, content_loader: LazyContentLoader, interval: float):
+        super().__init__(name="content-watcher", daemon=True)
+        self.content_loader = content_loader
+        self.interval = interval
+        self._fingerprints = self._get_fingerprints()
+        self._stopped = Event()
+
+    def _get_fingerprints(self) -> Dict[str, Tuple[Tuple[str, int, int], ...]]:
+        return {
+            framework_content.framework_slug: framework_fingerprint(
+                self.content_loader.content_path, framework_content.framework_slug
+            )
+            for framework_content in self.content_loader.framework_content
+        }
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Failed to check content for changes")
+
+    def check(self) -> List[str]:
+        """Reload any frameworks which have changed since the last check, returning their slugs"""
+        fingerprints = self._get_fingerprints()
+        changed = sorted(
+            framework_slug for framework_slug, fingerprint in fingerprints.items()
+            if fingerprint != self._fingerprints.get(framework_slug)
+        )
+        self._fingerprints = fingerprints
+
+        # frameworks that haven't been loaded yet will pick up the changes whenever they are
+        return [framework_slug for framework_slug in changed if self.content_loader.reload_framework(framework_slug)]
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+def write_content_snapshot(content_loader: LazyContentLoader, snapshot_path: str) -> str:
+    """Load all of ``content_loader``'s frameworks and pickle it to ``snapshot_path``, returning its checksum"""
+    content_loader.load_all()
+    checksum = content_checksum(content_loader.content_path, content_loader.framework_content)
+
+    # write to a temporary file first so a worker booting mid-build never sees a partial snapshot
+    temporary_path = '{}.tmp'.format(snapshot_path)
+    with open(temporary_path, 'wb') as f:
+        pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.dispatch_table = copyreg.dispatch_table.copy()
+        pickler.dispatch_table[TemplateField] = _reduce_template_field
+        # the checksum goes first so a stale snapshot can be rejected without unpickling the content
+        pickler.dump(checksum)
+        pickler.dump(content_loader)
+    os.replace(temporary_path, snapshot_path)
+
+    return checksum
+
+
+def read_content_snapshot(snapshot_path: str, checksum: str) -> Optional[LazyContentLoader]:
+    """Return the content loader pickled at ``snapshot_path``, or None if it's missing or doesn't match ``checksum``
+
+    Snapshots are build artefacts written by ``write_content_snapshot`` - never point this at anything untrusted.
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            unpickler = pickle.Unpickler(f)
+            if unpickler.load() != checksum:
+                logger.warning("Ignoring stale content snapshot at %s", snapshot_path)
+                return None
+            content_loader = unpickler.load()
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception("Failed to read content snapshot at %s", snapshot_path)
+        return None
+
+    if not isinstance(content_loader, LazyContentLoader):
+        logger.warning("Ignoring content snapshot at %s which doesn't contain a content loader", snapshot_path)
+        return None
+
+    return content_loader
+
+
+def load_content_loader(
+    content_path: str,
+    framework_content: Iterable[FrameworkContent],
+    snapshot_path: Optional[str] = None,
+) -> LazyContentLoader:
+    """Return a content loader from an up to date snapshot if there is one, otherwise one which parses the YAML"""
+    framework_content = tuple(framework_content)
+    # checksumming reads all of the content, so don't bother if there's no snapshot to check
+    if snapshot_path and os.path.exists(snapshot_path):
+        content_loader = read_content_snapshot(snapshot_path, content_checksum(content_path, framework_content))
+        if content_loader is not None:
+            return content_loader
+
+    return LazyContentLoader(content_path, framework_content)
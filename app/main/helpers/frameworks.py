@@ -14,6 +14,7 @@ from dmutils.formats import DATETIME_FORMAT
 from dmcontent.errors import ContentNotFoundError
 
 from ...main import content_loader
+from .content import FilteredContentManifest
 from .suppliers import is_g12_recovery_supplier
 
 
@@ -21,6 +22,7 @@ def get_framework_or_404(client, framework_slug, allowed_statuses=None):
     if allowed_statuses is None:
         allowed_statuses = ['open', 'pending', 'standstill', 'live']
     framework = client.get_framework(framework_slug)['frameworks']
+    content_loader.set_framework_status(framework_slug, framework.get('status'))
 
     if allowed_statuses and framework['status'] not in allowed_statuses:
         abort(404)
@@ -31,7 +33,9 @@ def get_framework_or_404(client, framework_slug, allowed_statuses=None):
 def get_framework_or_500(client, framework_slug, logger=None):
     """Return a 500 if a framework is not found that we explicitly expect to be there"""
     try:
-        return client.get_framework(framework_slug)['frameworks']
+        framework = client.get_framework(framework_slug)['frameworks']
+        content_loader.set_framework_status(framework_slug, framework.get('status'))
+        return framework
     except HTTPError as e:
         if e.status_code == 404:
             if logger:
@@ -51,22 +55,32 @@ def get_framework_and_lot_or_404(client, framework_slug, lot_slug, allowed_statu
 
 def frameworks_by_slug(client):
     framework_list = client.find_frameworks().get("frameworks")
+    note_framework_statuses(framework_list)
     frameworks = {}
     for framework in framework_list:
         frameworks[framework['slug']] = framework
     return frameworks
 
 
+def note_framework_statuses(frameworks):
+    """Let the content loader know which frameworks have expired, so it can stop keeping their content loaded"""
+    for framework in frameworks:
+        content_loader.set_framework_status(framework['slug'], framework.get('status'))
+
+
 def get_completed_lots(client, lots, framework_slug, supplier_id):
     """Return an array of completed lot names for a supplier"""
-    def has_submitted(lot):
-        return client.find_draft_services_by_framework(framework_slug=framework_slug,
-                                                       status="submitted",
-                                                       supplier_id=supplier_id,
-                                                       lot=lot['slug'],
-                                                       page=1)['meta']['total'] > 0
+    # one request for all of the supplier's submitted drafts, rather than one per lot
+    submitted_lot_slugs = {
+        draft['lotSlug']
+        for draft in client.find_draft_services_by_framework_iter(
+            framework_slug, status='submitted', supplier_id=supplier_id
+        )
+    }
 
-    return [f"Lot {number}: {lot['name']}" for number, lot in enumerate(lots, start=1) if has_submitted(lot)]
+    return [
+        f"Lot {number}: {lot['name']}" for number, lot in enumerate(lots, start=1) if lot['slug'] in submitted_lot_slugs
+    ]
 
 
 def get_framework_lot_or_404(framework, lot_slug):
@@ -92,22 +106,10 @@ def register_interest_in_framework(client, framework_slug):
     client.register_framework_interest(current_user.supplier_id, framework_slug, current_user.email_address)
 
 
-def get_last_modified_from_first_matching_file(key_list, framework_slug, prefix):
-    """
-    Takes a list of file keys, a framework slug and a string that is a whole or start of a filename.
-    Returns the 'last_modified' timestamp for first file whose path starts with the framework slug and passed-in string,
-    or None if no matching file is found.
-
-    :param key_list: list of file keys (from an s3 bucket)
-    :param framework_slug: the framework that we're looking up a document for (this is the first part of the file path)
-    :param prefix: the first part of the filename to match (this could also be the complete filename for an exact match)
-    :return: the timestamp of the first matching file key or None
-    """
-    path_starts_with = '{}/{}'.format(framework_slug, prefix)
-    return next((key for key in key_list if key.get('path').startswith(path_starts_with)), {}).get('last_modified')
-
-
 def get_first_question_index(content, section):
+    if isinstance(content, FilteredContentManifest):
+        return content.question_index.section_offsets[section.id]
+
     questions_so_far = 0
     ind = content.sections.index(section)
     for i in range(0, ind):
@@ -198,7 +200,8 @@ def question_references(data, get_question):
     "This is my question hint which references question 7"
 
     :param data: Object to have placeholders replaced for example a string or Markup object
-    :param get_question: ContentManifest.get_question function
+    :param get_question: ContentManifest.get_question function (or QuestionIndex.get_question, which avoids
+                         searching the manifest for every reference)
     :return: Object with same type of original `data` object but with question references replaced
     """
     if not data:
@@ -234,12 +237,6 @@ def get_most_recent_expired_dos_framework(all_frameworks: List[Dict]) -> List[Di
     return []
 
 
-def count_drafts_by_lot(drafts, lotSlug):
-    return len([
-        draft for draft in drafts if draft['lotSlug'] == lotSlug
-    ])
-
-
 def get_statuses_for_lot(
     has_one_service_limit,
     drafts_count,
@@ -1,34 +1,57 @@
+from collections import defaultdict
 from datetime import datetime
+from functools import partial
 import re
-import urllib.parse as urlparse
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from flask import abort, current_app
+from flask import abort
 from flask_login import current_user
 
+from dmutils.documents import filter_empty_files, upload_document, validate_documents
+
+from ...s3_buckets import get_bucket
+from .concurrency import run_concurrently
 from .frameworks import get_supplier_framework_info
+from .signed_urls import get_signed_url
 
 
-def get_drafts(apiclient, framework_slug):
-    drafts = apiclient.find_draft_services_iter(
-        current_user.supplier_id,
-        framework=framework_slug
-    )
-    complete_drafts, unsubmitted_drafts = [], []
-    for draft in drafts:
-        if draft['status'] in ('submitted', 'failed'):
-            complete_drafts.append(draft)
-        if draft['status'] == 'not-submitted':
-            unsubmitted_drafts.append(draft)
+class DraftIndex:
+    """Draft services partitioned by status and lot, in a single pass over them.
 
-    return unsubmitted_drafts, complete_drafts
+    ``drafts`` are the unsubmitted drafts and ``complete_drafts`` the submitted (or failed) ones, each in the order
+    they were given; ``lot`` returns the same for a single lot.
+    """
 
+    def __init__(self, drafts: Iterable[dict]):
+        self.drafts: List[dict] = []
+        self.complete_drafts: List[dict] = []
+        self._lots: Dict[str, Tuple[List[dict], List[dict]]] = defaultdict(lambda: ([], []))
 
-def get_lot_drafts(apiclient, framework_slug, lot_slug):
-    drafts, complete_drafts = get_drafts(apiclient, framework_slug)
-    return (
-        [draft for draft in drafts if draft['lotSlug'] == lot_slug],
-        [draft for draft in complete_drafts if draft['lotSlug'] == lot_slug]
-    )
+        for draft in drafts:
+            if draft['status'] == 'not-submitted':
+                self.drafts.append(draft)
+                self._lots[draft['lotSlug']][0].append(draft)
+            elif draft['status'] in ('submitted', 'failed'):
+                self.complete_drafts.append(draft)
+                self._lots[draft['lotSlug']][1].append(draft)
+
+    def lot(self, lot_slug: str) -> Tuple[List[dict], List[dict]]:
+        """The unsubmitted and complete drafts for ``lot_slug``"""
+        drafts, complete_drafts = self._lots.get(lot_slug, ([], []))
+        return list(drafts), list(complete_drafts)
+
+    def draft_count(self, lot_slug: str) -> int:
+        return len(self._lots[lot_slug][0]) if lot_slug in self._lots else 0
+
+    def complete_count(self, lot_slug: str) -> int:
+        return len(self._lots[lot_slug][1]) if lot_slug in self._lots else 0
+
+
+def get_draft_index(apiclient, framework_slug) -> DraftIndex:
+    return DraftIndex(apiclient.find_draft_services_iter(
+        current_user.supplier_id,
+        framework=framework_slug
+    ))
 
 
 def is_service_associated_with_supplier(service):
@@ -36,11 +59,46 @@ def is_service_associated_with_supplier(service):
 
 
 def get_signed_document_url(uploader, document_path):
-    url = uploader.get_signed_url(document_path)
-    if url is not None:
-        url = urlparse.urlparse(url)
-        base_url = urlparse.urlparse(current_app.config['DM_ASSETS_URL'])
-        return url._replace(netloc=base_url.netloc, scheme=base_url.scheme).geturl()
+    return get_signed_url(uploader, document_path, current_user.supplier_id)
+
+
+def _upload_document(bucket_config_key, upload_type, documents_url, service, field, file_contents, public):
+    return upload_document(
+        get_bucket(bucket_config_key), upload_type, documents_url, service, field, file_contents, public=public
+    )
+
+
+def upload_documents(
+    bucket_config_key: str, upload_type: str, documents_url: str, service: dict, request_files, section,
+    public: bool = True,
+) -> Tuple[Optional[dict], dict]:
+    """Upload a section's documents to the bucket named by config ``bucket_config_key``, all at the same time.
+
+    This otherwise works like dmutils' ``upload_service_documents``, returning the uploaded documents' URLs by field
+    and any errors (e.g. ``'file_can_be_saved'`` for a document which couldn't be uploaded). Declarations pass a
+    pseudo service with just a ``frameworkSlug`` and ``supplierId``.
+    """
+    files = filter_empty_files({
+        field: request_files[field] for field in section.get_question_ids(type="upload") if field in request_files
+    })
+    errors = validate_documents(files)
+    if errors:
+        return None, errors
+
+    fields = list(files)
+    urls = run_concurrently(*(
+        partial(
+            _upload_document, bucket_config_key, upload_type, documents_url, service, field, files[field], public,
+        )
+        for field in fields
+    ), pool='uploads')
+    for field, url in zip(fields, urls):
+        if not url:
+            errors[field] = 'file_can_be_saved'
+        else:
+            files[field] = url
+
+    return files, errors
 
 
 def parse_document_upload_time(data):
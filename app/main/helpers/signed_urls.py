@@ -0,0 +1,65 @@
+import time
+from functools import lru_cache
+from typing import Hashable, Optional
+import urllib.parse as urlparse
+
+from flask import current_app
+
+from ...caching import LRUCache
+
+
+@lru_cache(maxsize=8)
+def _parse_base_url(base_url: str) -> urlparse.ParseResult:
+    return urlparse.urlparse(base_url)
+
+
+def with_base_url(url: str, base_url: Optional[str]) -> str:
+    """``url`` with its scheme and host replaced by ``base_url``'s (if there is one)"""
+    if base_url is None:
+        return url
+    parsed_base_url = _parse_base_url(base_url)
+    return urlparse.urlparse(url)._replace(netloc=parsed_base_url.netloc, scheme=parsed_base_url.scheme).geturl()
+
+
+class SignedURLCache:
+    """Signed S3 URLs, keyed by bucket, path and the supplier they were signed for.
+
+    URLs are signed to expire after ``expires_in`` seconds, and reused until ``margin`` seconds before that, so anyone
+    redirected to one still has time to follow it. Missing documents (for which no URL is signed) aren't remembered.
+    """
+
+    def __init__(self, maxsize: int, expires_in: int, margin: int):
+        self.urls = LRUCache(maxsize)
+        self.expires_in = expires_in
+        self.reuse_for = expires_in - margin
+
+    def get(self, bucket, path: str, supplier_id: Hashable) -> Optional[str]:
+        key = (bucket.bucket_name, path, supplier_id)
+        signed_at: Optional[float]
+        url: Optional[str]
+        signed_at, url = self.urls.get(key, (None, None))
+        if signed_at is not None and time.monotonic() - signed_at < self.reuse_for:
+            return url
+
+        signed_at = time.monotonic()
+        url = bucket.get_signed_url(path, expires_in=self.expires_in)
+        if url is not None and self.reuse_for > 0:
+            self.urls.set(key, (signed_at, url))
+        return url
+
+
+def init_app(app):
+    app.extensions['signed_url_cache'] = SignedURLCache(
+        app.config['DM_SIGNED_URL_CACHE_SIZE'],
+        app.config['DM_SIGNED_URL_EXPIRES_IN'],
+        app.config['DM_SIGNED_URL_CACHE_MARGIN'],
+    )
+
+
+def get_signed_url(bucket, path: str, supplier_id: Hashable) -> Optional[str]:
+    """A signed URL for ``path`` in ``bucket`` (served from ``DM_ASSETS_URL``), or None if there's no such document"""
+    signed_url_cache: SignedURLCache = current_app.extensions['signed_url_cache']
+    url = signed_url_cache.get(bucket, path, supplier_id)
+    if url is None:
+        return None
+    return with_base_url(url, current_app.config['DM_ASSETS_URL'])
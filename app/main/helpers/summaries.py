@@ -0,0 +1,133 @@
+import hashlib
+import logging
+from typing import Hashable, NamedTuple, Optional, Tuple, cast
+
+from flask import current_app
+from redis import RedisError
+
+from dmcontent.content_loader import ContentManifest
+from dmcontent.utils import count_unanswered_questions
+
+from ...caching import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class DraftSummary(NamedTuple):
+    sections: ContentManifest
+    unanswered_required: int
+    unanswered_optional: int
+
+
+def _summarise(manifest: ContentManifest, draft: dict) -> DraftSummary:
+    sections = manifest.summary(draft)
+    return DraftSummary(sections, *count_unanswered_questions(sections))
+
+
+class DraftSummaryCache:
+    """Draft services' summaries and unanswered question counts, keyed by draft revision and manifest version.
+
+    Only manifests from ``get_filtered_manifest`` (which know what content and context they came from) and drafts with
+    an ``id`` and ``updatedAt`` are cached - anything else is summarised every time.
+
+    Whole summaries are kept in a small in-process LRU. The unanswered question counts, which are all that the lists of
+    drafts need, are kept in a much bigger one, and can also be shared between workers through redis. Shared counts are
+    keyed on the manifest's ``content_key`` rather than its ``cache_key``, as content versions are only meaningful in
+    the process that loaded the content.
+    """
+
+    def __init__(self, maxsize: int, counts_maxsize: int, redis_client=None, redis_ttl: int = 86400):
+        self.summaries = LRUCache(maxsize)
+        self.counts = LRUCache(counts_maxsize)
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+
+    @staticmethod
+    def cache_key(manifest: ContentManifest, draft: dict) -> Optional[Hashable]:
+        manifest_key = getattr(manifest, 'cache_key', None)
+        if manifest_key is None or not draft.get('id') or not draft.get('updatedAt'):
+            return None
+        return manifest_key, draft['id'], draft['updatedAt']
+
+    def _redis_key(self, manifest: ContentManifest, draft: dict) -> Optional[str]:
+        content_key = getattr(manifest, 'content_key', None)
+        if self.redis_client is None or content_key is None:
+            return None
+        key = (content_key, draft['id'], draft['updatedAt'])
+        return "draft-summary:{}".format(hashlib.sha256(repr(key).encode()).hexdigest())
+
+    def summarise(self, manifest: ContentManifest, draft: dict) -> DraftSummary:
+        """Return ``manifest.summary(draft)`` and its unanswered required and optional question counts"""
+        key = self.cache_key(manifest, draft)
+        if key is None:
+            return _summarise(manifest, draft)
+
+        summary = cast(Optional[DraftSummary], self.summaries.get(key))
+        if summary is None:
+            summary = _summarise(manifest, draft)
+            self.summaries.set(key, summary)
+            self._set_counts(key, summary[1:], self._redis_key(manifest, draft))
+        return summary
+
+    def count_unanswered(self, manifest: ContentManifest, draft: dict) -> Tuple[int, int]:
+        """Return the numbers of unanswered required and optional questions in ``manifest.summary(draft)``"""
+        key = self.cache_key(manifest, draft)
+        if key is None:
+            return _summarise(manifest, draft)[1:]
+
+        counts = cast(Optional[Tuple[int, int]], self.counts.get(key))
+        if counts is not None:
+            return counts
+
+        redis_key = self._redis_key(manifest, draft)
+        counts = self._get_shared_counts(key, redis_key)
+        if counts is None:
+            # a list of drafts only needs the counts, so don't push whole summaries out of the cache for it
+            counts = _summarise(manifest, draft)[1:]
+            self._set_counts(key, counts, redis_key)
+        return counts
+
+    def _get_shared_counts(self, key: Hashable, redis_key: Optional[str]) -> Optional[Tuple[int, int]]:
+        if redis_key is None:
+            return None
+        try:
+            value = self.redis_client.get(redis_key)
+        except RedisError:
+            logger.exception("Failed to read draft summary from redis")
+            return None
+        if value is None:
+            return None
+
+        unanswered_required, unanswered_optional = map(int, value.split(b':'))
+        counts = unanswered_required, unanswered_optional
+        self.counts.set(key, counts)
+        return counts
+
+    def _set_counts(self, key: Hashable, counts: Tuple[int, int], redis_key: Optional[str]) -> None:
+        self.counts.set(key, tuple(counts))
+        if redis_key is None:
+            return
+        try:
+            self.redis_client.set(redis_key, "{}:{}".format(*counts), ex=self.redis_ttl)
+        except RedisError:
+            logger.exception("Failed to write draft summary to redis")
+
+
+def init_app(app):
+    redis_client = app.config.get('SESSION_REDIS') if app.config['DM_DRAFT_SUMMARY_CACHE_REDIS'] else None
+    app.extensions['draft_summary_cache'] = DraftSummaryCache(
+        app.config['DM_DRAFT_SUMMARY_CACHE_SIZE'],
+        app.config['DM_DRAFT_SUMMARY_COUNTS_CACHE_SIZE'],
+        redis_client=redis_client,
+        redis_ttl=app.config['DM_DRAFT_SUMMARY_CACHE_REDIS_TTL'],
+    )
+
+
+def summarise_draft(manifest: ContentManifest, draft: dict) -> DraftSummary:
+    draft_summary_cache: DraftSummaryCache = current_app.extensions['draft_summary_cache']
+    return draft_summary_cache.summarise(manifest, draft)
+
+
+def count_unanswered_draft_questions(manifest: ContentManifest, draft: dict) -> Tuple[int, int]:
+    draft_summary_cache: DraftSummaryCache = current_app.extensions['draft_summary_cache']
+    return draft_summary_cache.count_unanswered(manifest, draft)
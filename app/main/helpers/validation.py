@@ -1,10 +1,10 @@
-from functools import reduce
-from operator import add
 import re
 from typing import Any, List, Dict, Set, Tuple, Optional
 
 from werkzeug.datastructures import ImmutableOrderedMultiDict
 
+from .content import QuestionIndex, get_question_index
+
 EMAIL_REGEX = r'^[^@^\s]+@[^@^\.^\s]+(\.[^@^\.^\s]+)+$'
 
 
@@ -29,6 +29,13 @@ class DeclarationValidator(object):
     def __init__(self, content, answers):
         self.content = content
         self.answers = answers
+        self._questions: Optional[QuestionIndex] = None
+
+    @property
+    def questions(self) -> QuestionIndex:
+        if self._questions is None:
+            self._questions = get_question_index(self.content)
+        return self._questions
 
     def get_error_messages_for_page(self, section) -> ImmutableOrderedMultiDict:
         all_errors = self.get_error_messages()
@@ -40,19 +47,19 @@ class DeclarationValidator(object):
         errors_map = list()
         for question_id in self.all_fields():
             if question_id in raw_errors_map:
-                question_number = self.content.get_question(question_id).get('number')
+                question = self.questions[question_id]
                 validation_message = self.get_error_message(question_id, raw_errors_map[question_id])
                 errors_map.append((question_id, {
                     'input_name': question_id,
-                    'question': "Question {}".format(question_number)
-                    if question_number else self.content.get_question(question_id).get('question'),
+                    'question': "Question {}".format(question.number)
+                    if question.number else question.question.get('question'),
                     'message': validation_message,
                 }))
 
         return errors_map
 
     def get_error_message(self, question_id: str, message_key: str) -> str:
-        for validation in self.content.get_question(question_id).get('validations', []):
+        for validation in self.questions[question_id].validations:
             if validation['name'] == message_key:
                 return validation['message']  # type: ignore
         default_messages = {
@@ -64,7 +71,7 @@ class DeclarationValidator(object):
             message_key, 'There was a problem with the answer to this question')
 
     def all_fields(self) -> List[str]:
-        return reduce(add, (section.get_question_ids() for section in self.content))
+        return list(self.questions.question_ids)
 
     def fields_with_values(self) -> Set[str]:
         return set(key for key, value in self.answers.items()
@@ -91,7 +98,7 @@ class DeclarationValidator(object):
     def character_limit_errors(self) -> Dict[str, str]:
         errors_map = {}
         for question_id in self.all_fields():
-            if self.content.get_question(question_id).get('type') in ['text', 'textbox_large']:
+            if self.questions[question_id].type in ['text', 'textbox_large']:
                 answer = self.answers.get(question_id) or ''
                 if self.character_limit is not None and len(answer) > self.character_limit:
                     errors_map[question_id] = "under_character_limit"
@@ -101,10 +108,12 @@ class DeclarationValidator(object):
     def word_limit_errors(self) -> Dict[str, str]:
         errors_map = {}
         for question_id in self.all_fields():
-            question = self.content.get_question(question_id)
-            if question.get('type') in ['text', 'textbox_large']:
+            question = self.questions[question_id]
+            if question.type in ['text', 'textbox_large']:
                 # Get word limit from question content, fall back to class attribute
-                word_limit = question.get('max_length_in_words', self.word_limit)
+                word_limit = question.max_length_in_words
+                if word_limit is None:
+                    word_limit = self.word_limit
                 answer = self.answers.get(question_id) or ''
                 if word_limit is not None and len(answer.split()) > word_limit:
                     errors_map[question_id] = "under_word_limit"
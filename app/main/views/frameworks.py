@@ -10,14 +10,10 @@ from flask_login import current_user
 
 from dmapiclient import APIError, HTTPError
 from dmapiclient.audit import AuditTypes
-from dmcontent.questions import ContentQuestion
 from dmcontent.errors import ContentNotFoundError
-from dmcontent.utils import count_unanswered_questions
-from dmutils import s3
 from dmutils.dates import update_framework_with_formatted_dates
 from dmutils.documents import (
-    RESULT_LETTER_FILENAME, get_document_path, degenerate_document_path_and_return_doc_name, get_signed_url,
-    upload_declaration_documents
+    RESULT_LETTER_FILENAME, get_document_path, degenerate_document_path_and_return_doc_name,
 )
 from dmutils.email.dm_notify import DMNotifyClient
 from dmutils.email.exceptions import EmailError
@@ -29,9 +25,9 @@ from dmutils.timing import logged_duration
 
 from ... import data_api_client
 from ...main import main, content_loader
+from ...s3_buckets import get_bucket
 from ..helpers import login_required
 from ..helpers.frameworks import (
-    count_drafts_by_lot,
     EnsureApplicationCompanyDetailsHaveBeenConfirmed,
     get_declaration_status,
     get_declaration_status_from_info,
@@ -39,7 +35,6 @@ from ..helpers.frameworks import (
     get_framework_for_reuse,
     get_framework_or_404,
     get_framework_or_500,
-    get_last_modified_from_first_matching_file,
     get_statuses_for_lot,
     get_supplier_framework_info,
     get_supplier_on_framework_from_info,
@@ -52,10 +47,13 @@ from ..helpers.frameworks import (
     get_completed_lots, get_framework_contract_title
 )
 from ..helpers.services import (
-    get_drafts,
-    get_lot_drafts,
+    get_draft_index,
     get_signed_document_url,
+    upload_documents,
 )
+from ..helpers.communications import get_communications
+from ..helpers.concurrency import run_concurrently
+from ..helpers.summaries import count_unanswered_draft_questions
 from ..helpers.suppliers import (
     supplier_company_details_are_complete,
     get_company_details_from_supplier,
@@ -113,12 +111,15 @@ def framework_dashboard(framework_slug):
                 reply_to_address_id=current_app.config['DM_ENQUIRIES_EMAIL_ADDRESS_UUID']
             )
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index, supplier_framework_info, supplier, communications = run_concurrently(
+        lambda: get_draft_index(data_api_client, framework_slug),
+        lambda: get_supplier_framework_info(data_api_client, framework_slug),
+        lambda: data_api_client.get_supplier(current_user.supplier_id)['suppliers'],
+        lambda: get_communications(framework_slug),
+    )
 
-    supplier_framework_info = get_supplier_framework_info(data_api_client, framework_slug)
     declaration_status = get_declaration_status_from_info(supplier_framework_info)
     supplier_is_on_framework = get_supplier_on_framework_from_info(supplier_framework_info)
-    supplier = data_api_client.get_supplier(current_user.supplier_id)['suppliers']
 
     # Do not show a framework dashboard for earlier G-Cloud iterations
     if declaration_status == 'unstarted' and framework['status'] == 'live':
@@ -129,12 +130,12 @@ def framework_dashboard(framework_slug):
     )
     application_made = (
         supplier_is_on_framework or (
-            len(complete_drafts) > 0
+            len(draft_index.complete_drafts) > 0
             and declaration_status == 'complete'
             and application_company_details_confirmed
         )
     )
-    lots_with_completed_drafts = [lot for lot in framework['lots'] if count_drafts_by_lot(complete_drafts, lot['slug'])]
+    lots_with_completed_drafts = [lot for lot in framework['lots'] if draft_index.complete_count(lot['slug'])]
 
     # GA custom dimension stages for the application
     if supplier_framework_info and not supplier_framework_info['applicationCompanyDetailsConfirmed']:
@@ -143,7 +144,7 @@ def framework_dashboard(framework_slug):
         custom_dimension_stage = "company_details_confirmed"
     if declaration_status == 'complete':
         custom_dimension_stage = "declaration_confirmed"
-    if complete_drafts:
+    if draft_index.complete_drafts:
         # At least one service has been confirmed
         custom_dimension_stage = "services_confirmed"
     if application_made:
@@ -172,10 +173,6 @@ def framework_dashboard(framework_slug):
                 supplier_framework_info['agreementPath']
             )
 
-    communications_folder = "{}/communications".format(framework_slug)
-    key_list = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET']).list(communications_folder, load_timestamps=True)
-    key_list.reverse()
-
     base_communications_files = {
         "invitation": {
             "path": "communications/",
@@ -209,10 +206,8 @@ def framework_dashboard(framework_slug):
     communications_files = {
         label: dict(
             d,
-            last_modified=get_last_modified_from_first_matching_file(
-                key_list,
-                framework_slug,
-                d["path"] + d.get("filename", ""),
+            last_modified=communications.last_modified(
+                "{}/{}{}".format(framework_slug, d["path"], d.get("filename", ""))
             ),
         )
         for label, d in base_communications_files.items()
@@ -224,13 +219,13 @@ def framework_dashboard(framework_slug):
         application_made=application_made,
         communications_files=communications_files,
         completed_lots=tuple(
-            dict(lot, complete_count=count_drafts_by_lot(complete_drafts, lot['slug']))
+            dict(lot, complete_count=draft_index.complete_count(lot['slug']))
             for lot in lots_with_completed_drafts
         ),
         countersigned_agreement_file=countersigned_agreement_file,
         counts={
-            "draft": len(drafts),
-            "complete": len(complete_drafts)
+            "draft": len(draft_index.drafts),
+            "complete": len(draft_index.complete_drafts)
         },
         declaration_status=declaration_status,
         signed_agreement_document_name=signed_agreement_document_name,
@@ -256,7 +251,8 @@ def framework_submission_lots(framework_slug):
         # this page will 404 if g12 recovery suppliers try to visit it, so let's avoid that
         return redirect(url_for(".list_all_services", framework_slug=framework_slug))
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    drafts, complete_drafts = draft_index.drafts, draft_index.complete_drafts
     declaration_status = get_declaration_status(data_api_client, framework_slug)
     application_made = len(complete_drafts) > 0 and declaration_status == 'complete'
     if framework['status'] not in ["open", "pending", "standstill"]:
@@ -264,18 +260,15 @@ def framework_submission_lots(framework_slug):
 
     lots = [
         dict(lot,
-             draft_count=count_drafts_by_lot(drafts, lot['slug']),
-             complete_count=count_drafts_by_lot(complete_drafts, lot['slug']))
+             draft_count=draft_index.draft_count(lot['slug']),
+             complete_count=draft_index.complete_count(lot['slug']))
         for lot in framework['lots']]
 
-    lot_question = {
-        option["value"]: option
-        for option in ContentQuestion(content_loader.get_question(framework_slug, 'services', 'lot')).get('options')
-    }
+    lot_options = content_loader.get_lot_options(framework_slug)
 
     lots = [{
-        "title": lot_question[lot['slug']]['label'] if framework["status"] == "open" else lot["name"],
-        'body': lot_question[lot['slug']]['description'],
+        "title": lot_options[lot['slug']]['label'] if framework["status"] == "open" else lot["name"],
+        'body': lot_options[lot['slug']]['description'],
         "link": url_for('.framework_submission_services', framework_slug=framework_slug, lot_slug=lot['slug']),
         "statuses": get_statuses_for_lot(
             lot['oneServiceLimit'],
@@ -309,7 +302,8 @@ def g12_recovery_draft_services(framework_slug):
 
     framework = get_framework_or_404(data_api_client, framework_slug)
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    drafts, complete_drafts = draft_index.drafts, draft_index.complete_drafts
     declaration_status = get_declaration_status(data_api_client, framework_slug)
     application_made = len(complete_drafts) > 0 and declaration_status == 'complete'
     if framework['status'] != 'live':
@@ -320,19 +314,16 @@ def g12_recovery_draft_services(framework_slug):
 
     lots = [
         dict(lot,
-             draft_count=count_drafts_by_lot(drafts, lot['slug']),
-             complete_count=count_drafts_by_lot(complete_drafts, lot['slug']))
+             draft_count=draft_index.draft_count(lot['slug']),
+             complete_count=draft_index.complete_count(lot['slug']))
         for lot in framework['lots']
     ]
 
-    lot_question = {
-        option["value"]: option
-        for option in ContentQuestion(content_loader.get_question(framework_slug, 'services', 'lot')).get('options')
-    }
+    lot_options = content_loader.get_lot_options(framework_slug)
 
     lots = [{
-        "title": lot_question[lot['slug']]['label'],
-        'body': lot_question[lot['slug']]['description'],
+        "title": lot_options[lot['slug']]['label'],
+        'body': lot_options[lot['slug']]['description'],
         "link": url_for('.framework_submission_services', framework_slug=framework_slug, lot_slug=lot['slug']),
         "statuses": get_statuses_for_lot(
             lot['oneServiceLimit'],
@@ -368,7 +359,7 @@ def framework_submission_services(framework_slug, lot_slug):
         # so they have no need to see this page
         return redirect(url_for(".list_all_services", framework_slug=framework_slug))
 
-    drafts, complete_drafts = get_lot_drafts(data_api_client, framework_slug, lot_slug)
+    drafts, complete_drafts = get_draft_index(data_api_client, framework_slug).lot(lot_slug)
     declaration_status = get_declaration_status(data_api_client, framework_slug)
 
     try:
@@ -408,16 +399,11 @@ def framework_submission_services(framework_slug, lot_slug):
                     framework_slug=framework_slug, lot_slug=lot_slug, service_id=draft['id'])
         )
 
-    lot_service_sections = content_loader.get_manifest(
-        framework_slug,
-        'edit_submission',
-    ).filter(context={'lot': lot_slug}, inplace_allowed=True)
+    lot_service_sections = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', {'lot': lot_slug})
 
     with logged_duration(message="Annotated draft details in {duration_real}s"):
         for draft in drafts:
-            sections = lot_service_sections.summary(draft, inplace_allowed=True)
-
-            unanswered_required, unanswered_optional = count_unanswered_questions(sections)
+            unanswered_required, unanswered_optional = count_unanswered_draft_questions(lot_service_sections, draft)
             draft.update({
                 'unanswered_required': unanswered_required,
                 'unanswered_optional': unanswered_optional,
@@ -579,10 +565,7 @@ def framework_supplier_declaration_overview(framework_slug):
         abort(410)
 
     try:
-        content = content_loader.get_manifest(
-            framework_slug,
-            'declaration',
-        ).filter(sf["declaration"], inplace_allowed=True)
+        content = content_loader.get_filtered_manifest(framework_slug, 'declaration', sf["declaration"])
     except ContentNotFoundError:
         abort(404)
 
@@ -618,10 +601,7 @@ def framework_supplier_declaration_submit(framework_slug):
     # ensure our declaration is at least a dict
     sf["declaration"] = sf.get("declaration") or {}
 
-    content = content_loader.get_manifest(
-        framework_slug,
-        'declaration',
-    ).filter(sf["declaration"], inplace_allowed=True)
+    content = content_loader.get_filtered_manifest(framework_slug, 'declaration', sf["declaration"])
 
     validator = get_validator(framework, content, sf["declaration"])
     errors = validator.get_error_messages()
@@ -650,7 +630,7 @@ def framework_supplier_declaration_submit(framework_slug):
 def framework_supplier_declaration_edit(framework_slug, section_id):
     framework = get_framework_or_404(data_api_client, framework_slug, allowed_statuses=['open'])
 
-    content = content_loader.get_manifest(framework_slug, 'declaration').filter({}, inplace_allowed=True)
+    content = content_loader.get_filtered_manifest(framework_slug, 'declaration', {})
     status_code = 200
 
     # Get and check the current section.
@@ -698,15 +678,14 @@ def framework_supplier_declaration_edit(framework_slug, section_id):
         # File fields won't be returned by `section.get_data` so handle these separately
         if request.files:
             documents_url = url_for('.dashboard', _external=True) + '/assets/'
-            # This utils method filters out any empty documents and validates against service document rules
-            uploaded_documents, document_errors = upload_declaration_documents(
-                s3.S3(current_app.config['DM_DOCUMENTS_BUCKET']),
+            # This filters out any empty documents and validates against service document rules
+            uploaded_documents, document_errors = upload_documents(
+                'DM_DOCUMENTS_BUCKET',
                 'documents',
                 documents_url,
+                {"frameworkSlug": framework_slug, "supplierId": supplier_framework["supplierId"]},
                 request.files,
                 section,
-                framework_slug,
-                supplier_framework["supplierId"]
             )
 
             if document_errors:
@@ -774,7 +753,7 @@ def framework_supplier_declaration_edit(framework_slug, section_id):
 @main.route('/frameworks/<framework_slug>/files/<path:filepath>', methods=['GET'])
 @login_required
 def download_supplier_file(framework_slug, filepath):
-    uploader = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET'])
+    uploader = get_bucket('DM_COMMUNICATIONS_BUCKET')
     url = get_signed_document_url(uploader, "{}/communications/{}".format(framework_slug, filepath))
     if not url:
         abort(404)
@@ -789,9 +768,9 @@ def download_agreement_file(framework_slug, document_name):
     if supplier_framework_info is None or not supplier_framework_info.get("declaration"):
         abort(404)
 
-    agreements_bucket = s3.S3(current_app.config['DM_AGREEMENTS_BUCKET'])
+    agreements_bucket = get_bucket('DM_AGREEMENTS_BUCKET')
     path = get_document_path(framework_slug, current_user.supplier_id, 'agreements', document_name)
-    url = get_signed_url(agreements_bucket, path, current_app.config['DM_ASSETS_URL'])
+    url = get_signed_document_url(agreements_bucket, path)
     if not url:
         abort(404)
 
@@ -808,7 +787,7 @@ def download_declaration_document(framework_slug, supplier_id, document_name):
     if current_user.supplier_id != supplier_id:
         abort(404)
 
-    uploader = s3.S3(current_app.config['DM_DOCUMENTS_BUCKET'])
+    uploader = get_bucket('DM_DOCUMENTS_BUCKET')
     s3_url = get_signed_document_url(uploader, "{}/documents/{}/{}".format(framework_slug, supplier_id, document_name))
     if not s3_url:
         abort(404)
@@ -828,16 +807,15 @@ def framework_updates(framework_slug, error_message=None, default_textbox_value=
                                    'user_id': current_user.id,
                                    'supplier_id': current_user.supplier_id})
 
-    communications_bucket = s3.S3(current_app.config['DM_COMMUNICATIONS_BUCKET'])
-    file_list = communications_bucket.list('{}/communications/updates/'.format(framework_slug), load_timestamps=True)
+    file_list = get_communications(framework_slug).files_in('{}/communications/updates/'.format(framework_slug))
     files = {
         'communications': [],
         'clarifications': [],
     }
     for file in file_list:
         path_parts = file['path'].split('/')
-        file['path'] = '/'.join(path_parts[2:])
-        files[path_parts[3]].append(file)
+        # the listing is shared, so mustn't be changed
+        files[path_parts[3]].append(dict(file, path='/'.join(path_parts[2:])))
 
     return render_template(
         "frameworks/updates.html",
@@ -1098,9 +1076,12 @@ def sign_framework_agreement(framework_slug):
     if not framework.get('frameworkAgreementVersion'):
         abort(404, error_message="The framework agreement was not found")
 
-    supplier = data_api_client.get_supplier(current_user.supplier_id)["suppliers"]
+    supplier, declaration, completed_lots = run_concurrently(
+        lambda: data_api_client.get_supplier(current_user.supplier_id)["suppliers"],
+        lambda: data_api_client.get_supplier_declaration(current_user.supplier_id, framework_slug).get('declaration'),
+        lambda: get_completed_lots(data_api_client, framework['lots'], framework_slug, current_user.supplier_id),
+    )
     company_details = get_company_details_from_supplier(supplier)
-    declaration = data_api_client.get_supplier_declaration(current_user.supplier_id, framework_slug).get('declaration')
     framework_urls = content_loader.get_message(framework_slug, 'urls')
     contract_title = content_loader.get_message(framework_slug, 'e-signature', 'framework_contract_title')
     framework_specific_labels = {
@@ -1124,8 +1105,6 @@ def sign_framework_agreement(framework_slug):
 
     form = SignFrameworkAgreementForm(contract_title)
 
-    completed_lots = get_completed_lots(data_api_client, framework['lots'], framework_slug, current_user.supplier_id)
-
     if form.validate_on_submit():
         # For an e-signature we create, update and sign the agreement immediately following submission
         agreement_id = data_api_client.create_framework_agreement(
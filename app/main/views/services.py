@@ -5,10 +5,7 @@ from flask_login import current_user
 
 from dmapiclient import HTTPError
 from dmcontent.content_loader import ContentNotFoundError
-from dmcontent.utils import count_unanswered_questions
-from dmutils import s3
 from dmutils.dates import update_framework_with_formatted_dates
-from dmutils.documents import upload_service_documents
 from dmutils.formats import displaytimeformat
 from dmutils.flask import timed_render_template as render_template
 from dmutils.forms.helpers import get_errors_from_wtform
@@ -22,14 +19,16 @@ from ..helpers.suppliers import (
 )
 from ... import data_api_client
 from ...main import main, content_loader
+from ...s3_buckets import get_bucket
 from ..helpers import login_required
 from ..helpers.services import (
     copy_service_from_previous_framework,
-    get_drafts,
-    get_lot_drafts,
+    get_draft_index,
     get_signed_document_url,
     is_service_associated_with_supplier,
+    upload_documents,
 )
+from ..helpers.summaries import count_unanswered_draft_questions, summarise_draft
 from ..helpers.frameworks import (
     get_framework_and_lot_or_404,
     get_declaration_status,
@@ -101,21 +100,18 @@ def list_all_services(framework_slug):
         framework=framework_slug,
     )["services"]
 
-    drafts, complete_drafts = get_drafts(data_api_client, framework_slug)
+    draft_index = get_draft_index(data_api_client, framework_slug)
+    drafts, complete_drafts = draft_index.drafts, draft_index.complete_drafts
 
     g12_draft_allow_list = get_g12_recovery_draft_ids()
     drafts = [draft for draft in drafts if draft["id"] in g12_draft_allow_list]
     complete_drafts = [draft for draft in complete_drafts if draft["id"] in g12_draft_allow_list]
 
-    service_sections = content_loader.get_manifest(
-        framework_slug,
-        'edit_submission',
-    )
-
     for draft in drafts:
-        sections = service_sections.filter(context={'lot': draft["lotSlug"]}).summary(draft, inplace_allowed=True)
-
-        unanswered_required, unanswered_optional = count_unanswered_questions(sections)
+        unanswered_required, unanswered_optional = count_unanswered_draft_questions(
+            content_loader.get_filtered_manifest(framework_slug, 'edit_submission', {'lot': draft["lotSlug"]}),
+            draft,
+        )
         draft.update({
             'unanswered_required': unanswered_required,
             'unanswered_optional': unanswered_optional,
@@ -311,9 +307,9 @@ def update_section(framework_slug, service_id, section_id):
     posted_data = section.get_data(request.form)
 
     errors = None
-    # This utils method filters out any empty documents and validates against service document rules
-    uploaded_documents, document_errors = upload_service_documents(
-        s3.S3(current_app.config['DM_DOCUMENTS_BUCKET']),
+    # This filters out any empty documents and validates against service document rules
+    uploaded_documents, document_errors = upload_documents(
+        'DM_DOCUMENTS_BUCKET',
         'documents',
         current_app.config['DM_ASSETS_URL'],
         service,
@@ -582,7 +578,7 @@ def service_submission_document(framework_slug, supplier_id, document_name):
     if current_user.supplier_id != supplier_id:
         abort(404)
 
-    uploader = s3.S3(current_app.config['DM_SUBMISSIONS_BUCKET'])
+    uploader = get_bucket('DM_SUBMISSIONS_BUCKET')
     s3_url = get_signed_document_url(uploader,
                                      "{}/submissions/{}/{}".format(framework_slug, supplier_id, document_name))
     if not s3_url:
@@ -624,12 +620,9 @@ def view_service_submission(framework_slug, lot_slug, service_id):
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    sections = content_loader.get_manifest(
-        framework['slug'],
-        'edit_submission',
-    ).filter(draft, inplace_allowed=True).summary(draft, inplace_allowed=True)
-
-    unanswered_required, unanswered_optional = count_unanswered_questions(sections)
+    sections, unanswered_required, unanswered_optional = summarise_draft(
+        content_loader.get_filtered_manifest(framework['slug'], 'edit_submission', draft), draft
+    )
     delete_requested = True if request.args.get('delete_requested') else False
 
     return render_template(
@@ -688,7 +681,7 @@ def edit_service_submission(framework_slug, lot_slug, service_id, section_id, qu
     if not is_service_associated_with_supplier(draft):
         abort(404)
 
-    content = content_loader.get_manifest(framework_slug, 'edit_submission').filter(draft, inplace_allowed=True)
+    content = content_loader.get_filtered_manifest(framework_slug, 'edit_submission', draft)
     section = content.get_section(section_id)
     if section and (question_slug is not None):
         next_question = section.get_question_by_slug(section.get_next_question_slug(question_slug))
@@ -702,11 +695,10 @@ def edit_service_submission(framework_slug, lot_slug, service_id, section_id, qu
         update_data = section.get_data(request.form)
 
         if request.files:
-            uploader = s3.S3(current_app.config['DM_SUBMISSIONS_BUCKET'])
             documents_url = url_for('.dashboard', _external=True) + '/assets/'
-            # This utils method filters out any empty documents and validates against service document rules
-            uploaded_documents, document_errors = upload_service_documents(
-                uploader, 'submissions', documents_url, draft, request.files, section,
+            # This filters out any empty documents and validates against service document rules
+            uploaded_documents, document_errors = upload_documents(
+                'DM_SUBMISSIONS_BUCKET', 'submissions', documents_url, draft, request.files, section,
                 public=False)
 
             if document_errors:
@@ -876,7 +868,7 @@ def previous_services(framework_slug, lot_slug):
     if request.method == 'POST':
         if lot.get('oneServiceLimit'):
             # Don't copy a service if the lot has a one service limit and the supplier already has a draft for that lot
-            drafts, complete_drafts = get_lot_drafts(data_api_client, framework_slug, lot_slug)
+            drafts, complete_drafts = get_draft_index(data_api_client, framework_slug).lot(lot_slug)
             if drafts or complete_drafts:
                 return render_error_page(
                     status_code=400,
@@ -27,11 +27,13 @@ from ..forms.suppliers import (
     EmailAddressForm,
     ConfirmCompanyForm,
 )
+from ..helpers.concurrency import run_concurrently
 from ..helpers.frameworks import (
     get_frameworks_by_status,
     get_frameworks_closed_and_open_for_applications,
     get_most_recent_expired_dos_framework,
     get_unconfirmed_open_supplier_frameworks, get_framework_contract_title,
+    note_framework_statuses,
 )
 from ..helpers.suppliers import (
     COUNTRY_TUPLE,
@@ -62,21 +64,24 @@ JOIN_OPEN_FRAMEWORK_NOTIFICATION_MAILING_LIST_UNSUBSCRIBED_MESSAGE = Markup("""
 @main.route('')
 @login_required
 def dashboard():
-    supplier = data_api_client.get_supplier(
-        current_user.supplier_id
-    )['suppliers']
+    supplier, frameworks, supplier_framework_interest = run_concurrently(
+        lambda: data_api_client.get_supplier(current_user.supplier_id)['suppliers'],
+        lambda: data_api_client.find_frameworks()['frameworks'],
+        lambda: data_api_client.get_supplier_frameworks(current_user.supplier_id)['frameworkInterest'],
+    )
     supplier['contact'] = supplier['contactInformation'][0]
 
     supplier['g12_recovery'] = is_g12_recovery_supplier(supplier['id'])
 
     all_frameworks = list(sorted(
-        data_api_client.find_frameworks()['frameworks'],
+        frameworks,
         key=lambda framework: framework['slug'],
         reverse=True
     ))
+    note_framework_statuses(all_frameworks)
     supplier_frameworks = {
         framework['frameworkSlug']: framework
-        for framework in data_api_client.get_supplier_frameworks(current_user.supplier_id)['frameworkInterest']
+        for framework in supplier_framework_interest
     }
 
     # g12 should always be in frameworks.live for recovery suppliers
@@ -6,6 +6,7 @@ from dmutils.flask import timed_render_template as render_template
 from ..helpers import login_required
 from ...main import main
 from ... import data_api_client
+from ...user_loader import invalidate_user
 
 
 DEACTIVATED_USER_MESSAGE = "{user_name} ({user_email_address}) has been removed as a contributor."
@@ -77,6 +78,7 @@ def deactivate_user(user_id):
         abort(404)
 
     data_api_client.update_user(user_id=user_to_deactivate['id'], active=False, updater=current_user.email_address)
+    invalidate_user(user_to_deactivate['id'])
 
     flash(DEACTIVATED_USER_MESSAGE.format(
         user_name=user_to_deactivate['name'],
@@ -1,5 +1,6 @@
 from flask import Blueprint
 from dmutils.metrics import DMGDSMetrics
+from gds_metrics.metrics import Counter, Gauge, Histogram
 
 
 metrics = Blueprint('metrics', __name__)
@@ -7,3 +8,115 @@ metrics = Blueprint('metrics', __name__)
 gds_metrics = DMGDSMetrics()
 
 metrics.add_url_rule(gds_metrics.metrics_path, 'metrics', gds_metrics.metrics_endpoint)
+
+FRAMEWORK_CACHE_LOOKUPS = Counter(
+    'data_api_framework_cache_lookups_total',
+    'Framework metadata cache lookups, by whether they were a hit, a stale hit or a miss',
+    ['result'],
+)
+
+COMMUNICATIONS_CACHE_LOOKUPS = Counter(
+    'communications_cache_lookups_total',
+    'Framework communications listing cache lookups, by whether they were a hit, a stale hit or a miss',
+    ['result'],
+)
+
+DATA_API_COALESCED_REQUESTS = Counter(
+    'data_api_coalesced_requests_total',
+    'Data API GET requests which shared an identical request already in flight, by endpoint',
+    ['endpoint'],
+)
+
+DATA_API_STALE_RESPONSES = Counter(
+    'data_api_stale_responses_total',
+    'Last good Data API responses used because the API was unavailable, by endpoint',
+    ['endpoint'],
+)
+
+DATA_API_CIRCUIT_BREAKER_OPEN = Gauge(
+    'data_api_circuit_breaker_open',
+    'Whether requests to the Data API are being stopped because it keeps failing',
+    multiprocess_mode='max',
+)
+
+DATA_API_CIRCUIT_BREAKER_REJECTIONS = Counter(
+    'data_api_circuit_breaker_rejections_total',
+    'Data API requests not made because the circuit breaker was open',
+)
+
+SUPPLIER_CACHE_LOOKUPS = Counter(
+    'data_api_supplier_cache_lookups_total',
+    'Shared supplier cache lookups, by whether they were a hit or a miss',
+    ['result'],
+)
+
+USER_LOADER_LOOKUPS = Counter(
+    'user_loader_lookups_total',
+    'Logged in users loaded, by where they came from (this worker, the session or the API)',
+    ['source'],
+)
+
+HTTP_POOL_CONNECTIONS_OPENED = Counter(
+    'http_client_connections_opened_total',
+    'Connections (and so TCP/TLS handshakes) made by the outbound HTTP connection pools, by host',
+    ['host'],
+)
+
+HTTP_POOL_CONNECTIONS_IN_USE = Gauge(
+    'http_client_pool_connections_in_use',
+    'Connections taken from the outbound HTTP connection pools, by host',
+    ['host'],
+    multiprocess_mode='livesum',
+)
+
+HTTP_POOL_EXHAUSTED = Counter(
+    'http_client_pool_exhausted_total',
+    'Times a connection was needed when all of a host\'s pooled connections were in use, by host',
+    ['host'],
+)
+
+S3_REQUEST_DURATION = Histogram(
+    's3_request_duration_seconds',
+    'How long calls to S3 buckets took, by bucket and method',
+    ['bucket', 'method'],
+)
+
+CONTENT_LOADER_TIER_FRAMEWORKS = Gauge(
+    'content_loader_tier_frameworks',
+    'Number of frameworks with content loaded, by tier',
+    ['tier'],
+    multiprocess_mode='max',
+)
+
+CONTENT_LOADER_TIER_BYTES = Gauge(
+    'content_loader_tier_bytes',
+    'Approximate size of the frameworks content loaded, by tier',
+    ['tier'],
+    multiprocess_mode='max',
+)
+
+CONTENT_LOADER_FRAMEWORK_BYTES = Gauge(
+    'content_loader_framework_bytes',
+    'Approximate size of each framework\'s loaded content (0 if it isn\'t loaded)',
+    ['framework'],
+    multiprocess_mode='max',
+)
+
+CONTENT_LOADER_LOAD_SECONDS = Gauge(
+    'content_loader_load_seconds',
+    'How long loading each of a framework\'s manifests, messages and metadata blocks last took',
+    ['framework', 'kind', 'name'],
+    multiprocess_mode='max',
+)
+
+
+def record_content_metrics(content_loader):
+    for tier, stats in content_loader.tier_stats().items():
+        CONTENT_LOADER_TIER_FRAMEWORKS.labels(tier).set(len(stats['frameworks']))
+        CONTENT_LOADER_TIER_BYTES.labels(tier).set(stats['bytes'])
+
+    for framework_slug, stats in content_loader.framework_stats().items():
+        CONTENT_LOADER_FRAMEWORK_BYTES.labels(framework_slug).set(stats['bytes'])
+        for kind, durations in stats['load_seconds'].items():
+            for name, seconds in durations.items():
+                CONTENT_LOADER_LOAD_SECONDS.labels(framework_slug, kind, name).set(seconds)
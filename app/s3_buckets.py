@@ -0,0 +1,66 @@
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict
+
+from flask import current_app
+
+from dmutils import s3
+
+from .metrics import S3_REQUEST_DURATION
+
+
+class TimedBucket:
+    """An ``S3`` bucket whose method calls are timed, by bucket and method"""
+
+    def __init__(self, bucket: s3.S3, bucket_name: str):
+        self._bucket = bucket
+        self._bucket_name = bucket_name
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._bucket, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @wraps(attr)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                S3_REQUEST_DURATION.labels(self._bucket_name, name).observe(time.perf_counter() - start)
+
+        return timed
+
+
+class S3Buckets:
+    """The app's S3 buckets, each built once per thread then reused, with its connections to S3.
+
+    boto3 resources (which ``S3`` uses) aren't threadsafe, so each thread gets its own, but they're only ever built
+    one at a time as creating them isn't threadsafe either.
+    """
+
+    def __init__(self):
+        self._buckets = threading.local()
+        self._lock = threading.Lock()
+
+    def get(self, bucket_name: str) -> TimedBucket:
+        buckets: Dict[str, TimedBucket] = self._buckets.__dict__.setdefault('buckets', {})
+        if bucket_name not in buckets:
+            with self._lock:
+                buckets[bucket_name] = TimedBucket(s3.S3(bucket_name), bucket_name)
+        return buckets[bucket_name]
+
+
+def init_app(app) -> S3Buckets:
+    """Return the app's S3 buckets, setting them up if this is the first time they're needed"""
+    if 's3_buckets' not in app.extensions:
+        app.extensions['s3_buckets'] = S3Buckets()
+    s3_buckets: S3Buckets = app.extensions['s3_buckets']
+    return s3_buckets
+
+
+def get_bucket(config_key: str) -> TimedBucket:
+    """This thread's client for the bucket named by config ``config_key`` (e.g. ``'DM_DOCUMENTS_BUCKET'``)"""
+    s3_buckets: S3Buckets = current_app.extensions['s3_buckets']
+    return s3_buckets.get(current_app.config[config_key])
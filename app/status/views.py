@@ -2,11 +2,22 @@ from flask import request
 
 from . import status
 from .. import data_api_client
+from ..main import content_loader
 from dmutils.status import get_app_status
 
 
+def get_content_status():
+    return {
+        'content': {
+            'framework_versions': content_loader.framework_versions,
+            'tiers': content_loader.tier_stats(),
+        }
+    }
+
+
 @status.route('/_status')
 def show_status():
     return get_app_status(data_api_client=data_api_client,
                           search_api_client=None,
-                          ignore_dependencies='ignore-dependencies' in request.args)
+                          ignore_dependencies='ignore-dependencies' in request.args,
+                          additional_checks=[get_content_status])
@@ -0,0 +1,105 @@
+import json
+import logging
+import re
+from typing import Any, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from redis import RedisError, WatchError
+
+logger = logging.getLogger(__name__)
+
+SUPPLIER_PATH = re.compile(r'^/suppliers/(\d+)(/frameworks)?$')
+SUPPLIER_WRITE_PATH = re.compile(r'^/suppliers/(\d+)(/|$)')
+
+
+def cached_supplier_id(url: str) -> Optional[int]:
+    """The supplier a Data API GET ``url`` is for, if it's one of the per-supplier reads that can be cached.
+
+    These are ``get_supplier``, ``get_supplier_frameworks`` and (every page of) ``find_users_iter(supplier_id=...)``.
+    """
+    parsed_url = urlparse(url)
+    match = SUPPLIER_PATH.match(parsed_url.path)
+    if match:
+        return None if parsed_url.query else int(match.group(1))
+
+    params = parse_qs(parsed_url.query)
+    if parsed_url.path == '/users' and 'supplier_id' in params and set(params) <= {'supplier_id', 'page'}:
+        try:
+            return int(params['supplier_id'][0])
+        except ValueError:
+            return None
+    return None
+
+
+def written_supplier_ids(url: str, data: Optional[dict]) -> Iterable[int]:
+    """The suppliers whose cached reads a Data API write to ``url`` (with ``data``) might change"""
+    match = SUPPLIER_WRITE_PATH.match(urlparse(url).path)
+    if match:
+        yield int(match.group(1))
+    # e.g. create_user or create_framework_agreement
+    for value in (data or {}).values():
+        if isinstance(value, dict) and value.get('supplierId') is not None:
+            yield int(value['supplierId'])
+
+
+class SupplierCache:
+    """Per-supplier Data API responses, shared between workers through redis.
+
+    Each supplier's responses are kept in a redis hash (keyed by URL) which expires ``ttl`` seconds after it was last
+    written to. Invalidating a supplier deletes its hash and bumps its generation - responses fetched before that (so
+    possibly from before the write which caused it) aren't stored, so the cache is never stale after our own writes.
+    """
+
+    def __init__(self, redis_client, ttl: int):
+        self.redis_client = redis_client
+        self.ttl = ttl
+
+    @staticmethod
+    def _keys(supplier_id: int) -> Tuple[str, str]:
+        key = "supplier-cache:{}".format(supplier_id)
+        return key, key + ":generation"
+
+    def get(self, supplier_id: int, url: str) -> Tuple[Optional[Any], Optional[bytes]]:
+        """Return the response cached for ``url`` (or None), and the supplier's current generation"""
+        key, generation_key = self._keys(supplier_id)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            value, generation = pipe.hget(key, url).get(generation_key).execute()
+        except RedisError:
+            logger.exception("Failed to read supplier {supplier_id} from redis", extra={'supplier_id': supplier_id})
+            return None, None
+        return (None if value is None else json.loads(value)), generation
+
+    def set(self, supplier_id: int, url: str, value: Any, generation: Optional[bytes]) -> None:
+        """Cache ``value`` for ``url``, unless the supplier has been invalidated since ``generation``"""
+        key, generation_key = self._keys(supplier_id)
+        try:
+            with self.redis_client.pipeline() as pipe:
+                pipe.watch(generation_key)
+                if pipe.get(generation_key) != generation:
+                    return
+                pipe.multi()
+                pipe.hset(key, url, json.dumps(value))
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+        except WatchError:
+            # the supplier was invalidated while we were fetching it
+            pass
+        except RedisError:
+            logger.exception("Failed to write supplier {supplier_id} to redis", extra={'supplier_id': supplier_id})
+
+    def invalidate(self, supplier_ids: Iterable[int]) -> None:
+        supplier_ids = set(supplier_ids)
+        if not supplier_ids:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        for supplier_id in supplier_ids:
+            key, generation_key = self._keys(supplier_id)
+            pipe.delete(key)
+            pipe.incr(generation_key)
+            # the generation only needs to outlive anything fetched before it was bumped
+            pipe.expire(generation_key, max(self.ttl, 3600))
+        try:
+            pipe.execute()
+        except RedisError:
+            logger.exception("Failed to invalidate suppliers in redis")
@@ -0,0 +1,47 @@
+from tempfile import SpooledTemporaryFile
+from typing import Any, Optional
+
+from flask import Request, current_app
+
+from dmutils.documents import file_is_open_document_format
+from dmutils.s3 import FILE_SIZE_LIMIT
+
+# as much of a file as ``file_is_open_document_format`` looks at
+HEAD_BYTES = 128
+
+
+class BoundedUploadFile(SpooledTemporaryFile):
+    """An uploaded file, written to as it's received, which only keeps as much of it as validating it needs.
+
+    Files are kept in memory until they're ``spool_size`` bytes long, and on disk after that. Only the first
+    ``max_bytes`` are kept - enough to tell the file is too big - and only the first ``HEAD_BYTES`` of a file that
+    isn't an open document format (as that's all that's needed to say so).
+    """
+
+    def __init__(self, filename: Optional[str], max_bytes: int, spool_size: int):
+        super().__init__(max_size=spool_size, mode='wb+')
+        self.filename = filename or ''
+        self.max_bytes = max_bytes
+        self.received = 0
+
+    # typed as loosely as SpooledTemporaryFile.write, though as the file is opened in binary mode ``s`` is only bytes
+    def write(self, s: Any) -> int:
+        keep = max(min(len(s), self.max_bytes - self.received), 0)
+        was_head = self.received < HEAD_BYTES
+        self.received += len(s)
+        if keep:
+            super().write(s[:keep])
+        if was_head and self.received >= HEAD_BYTES and not file_is_open_document_format(self):
+            self.max_bytes = HEAD_BYTES
+        return len(s)
+
+
+class UploadRequest(Request):
+    """Flask's request, with uploaded files written to ``BoundedUploadFile``s as they're received"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return BoundedUploadFile(
+            filename,
+            max_bytes=FILE_SIZE_LIMIT + 1,
+            spool_size=current_app.config['DM_UPLOAD_SPOOL_SIZE'],
+        )
@@ -0,0 +1,138 @@
+import logging
+import time
+from typing import Optional, Tuple
+
+from flask import current_app, session
+from flask_login import user_logged_out
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from redis import RedisError
+
+from dmutils.user import User
+
+from .caching import LRUCache
+from .metrics import USER_LOADER_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SESSION_KEY = '_user_snapshot'
+
+
+class CachedUserLoader:
+    """Loads logged in users for flask-login without asking the API for them on every request.
+
+    Users are remembered for ``ttl`` seconds, both in this worker (by user id) and in the session, as a signed
+    snapshot, so other workers can use them too. Each user has a version, kept in redis (so it's shared between
+    workers), which ``invalidate`` bumps - any user remembered from before that (e.g. a user who's just been
+    deactivated) is loaded from the API again.
+    """
+
+    def __init__(self, data_api_client, redis_client, ttl: int, maxsize: int, secret_key: str):
+        self.data_api_client = data_api_client
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.users = LRUCache(maxsize)
+        self.serializer = URLSafeTimedSerializer(secret_key, salt='user-snapshot')
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return "user-loader:{}:version".format(user_id)
+
+    def _version(self, user_id: int) -> Optional[int]:
+        if self.redis_client is None:
+            return 0
+        try:
+            return int(self.redis_client.get(self._version_key(user_id)) or 0)
+        except RedisError:
+            logger.exception("Failed to read user {user_id}'s version from redis", extra={'user_id': user_id})
+            return None
+
+    def load(self, user_id: str) -> Optional[User]:
+        numeric_user_id = int(user_id)
+        version = self._version(numeric_user_id)
+        if version is None:
+            # we can't tell whether a remembered user is still valid
+            return self._load_from_api(numeric_user_id, version)
+
+        user_json, source = self._remembered(numeric_user_id, version)
+        if user_json is None:
+            return self._load_from_api(numeric_user_id, version)
+
+        USER_LOADER_LOOKUPS.labels(source).inc()
+        if source == 'session':
+            self.users.set(numeric_user_id, (time.monotonic(), version, user_json))
+        return User.from_json(user_json)
+
+    def _remembered(self, user_id: int, version: int) -> Tuple[Optional[dict], Optional[str]]:
+        loaded_at, loaded_version, user_json = self.users.get(user_id, (None, None, None))
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl and loaded_version == version:
+            return user_json, 'worker'
+
+        try:
+            snapshot = self.serializer.loads(session[SNAPSHOT_SESSION_KEY], max_age=self.ttl)
+        except (KeyError, BadSignature):
+            return None, None
+        if snapshot['id'] != user_id or snapshot['version'] != version:
+            return None, None
+        return snapshot['user'], 'session'
+
+    def _load_from_api(self, user_id: int, version: Optional[int]) -> Optional[User]:
+        USER_LOADER_LOOKUPS.labels('api').inc()
+        user_json = self.data_api_client.get_user(user_id=user_id)
+        if not user_json:
+            return None
+
+        user = User.from_json(user_json)
+        if not user.is_active():
+            return None
+
+        if version is not None:
+            self.users.set(user_id, (time.monotonic(), version, user_json))
+            session[SNAPSHOT_SESSION_KEY] = self.serializer.dumps(
+                {'id': user_id, 'version': version, 'user': user_json}
+            )
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """Make sure ``user_id`` is loaded from the API next time, in every worker"""
+        self.users.discard(int(user_id))
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.incr(self._version_key(user_id))
+            # it only needs to outlive any snapshots taken before it was bumped
+            self.redis_client.expire(self._version_key(user_id), max(self.ttl, 3600))
+        except RedisError:
+            logger.exception("Failed to invalidate user {user_id} in redis", extra={'user_id': user_id})
+
+
+def _forget_logged_out_user(sender, user):
+    session.pop(SNAPSHOT_SESSION_KEY, None)
+    if getattr(user, 'id', None) is not None:
+        invalidate_user(user.id)
+
+
+def init_app(app, data_api_client):
+    if app.config['DM_USER_CACHE_TTL']:
+        app.extensions['user_loader'] = CachedUserLoader(
+            data_api_client,
+            app.config.get('SESSION_REDIS'),
+            ttl=app.config['DM_USER_CACHE_TTL'],
+            maxsize=app.config['DM_USER_CACHE_SIZE'],
+            secret_key=app.config['SECRET_KEY'],
+        )
+        user_logged_out.connect(_forget_logged_out_user, app)
+    else:
+        app.extensions['user_loader'] = None
+
+
+def load_user(data_api_client, user_id: str) -> Optional[User]:
+    user_loader = current_app.extensions['user_loader']
+    if user_loader is None:
+        return User.load_user(data_api_client, user_id)
+    return user_loader.load(user_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_loader = current_app.extensions['user_loader']
+    if user_loader is not None:
+        user_loader.invalidate(user_id)
@@ -95,6 +95,75 @@ class Config(object):
     DM_G12_RECOVERY_SUPPLIER_IDS = None
     DM_G12_RECOVERY_DRAFT_IDS = None
 
+    # Load every framework's content at startup rather than on first use (e.g. for workers forked after preloading)
+    DM_EAGER_CONTENT_LOADING = False
+    # Check the frameworks content for changes this often (in seconds), reloading any that change. 0 disables this.
+    DM_CONTENT_RELOAD_INTERVAL = 0
+    # How many expired frameworks' content to keep loaded - any others are loaded again when they're next needed
+    DM_EXPIRED_FRAMEWORK_CONTENT_LIMIT = 2
+
+    # How many draft service summaries (and, separately, unanswered question counts) to cache in each worker
+    DM_DRAFT_SUMMARY_CACHE_SIZE = 100
+    DM_DRAFT_SUMMARY_COUNTS_CACHE_SIZE = 10000
+    # Share draft services' unanswered question counts between workers in the session redis
+    DM_DRAFT_SUMMARY_CACHE_REDIS = False
+    DM_DRAFT_SUMMARY_CACHE_REDIS_TTL = 86400
+
+    # Cache frameworks from the API for this many seconds in each worker (0 disables this). Once that's up cached
+    # frameworks are refreshed in the background, but still used until they're DM_FRAMEWORK_CACHE_MAX_AGE seconds old.
+    DM_FRAMEWORK_CACHE_TTL = 60
+    DM_FRAMEWORK_CACHE_MAX_AGE = 3600
+
+    # Cache each framework's communications listing from DM_COMMUNICATIONS_BUCKET for this many seconds in each worker
+    # (0 disables this), refreshing it in the background but using it until it's DM_COMMUNICATIONS_CACHE_MAX_AGE old
+    DM_COMMUNICATIONS_CACHE_TTL = 300
+    DM_COMMUNICATIONS_CACHE_MAX_AGE = 3600
+
+    # Remember the last good response from this many frameworks, suppliers and user list requests in each worker, to
+    # use if the API times out or returns a 5xx error (0 disables this)
+    DM_DATA_API_FALLBACK_CACHE_SIZE = 1000
+    # Stop making requests to the API for DM_DATA_API_CIRCUIT_BREAKER_RESET seconds after this many failures in a row
+    # (0 disables this)
+    DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD = 5
+    DM_DATA_API_CIRCUIT_BREAKER_RESET = 30
+
+    # Cache suppliers' details, framework interest and users from the API in the session redis, for
+    # DM_SUPPLIER_CACHE_TTL seconds or until this app changes them
+    DM_SUPPLIER_CACHE_REDIS = False
+    DM_SUPPLIER_CACHE_TTL = 300
+
+    # Remember logged in users for this many seconds (in each worker and in the session) rather than getting them from
+    # the API on every request (0 disables this). Deactivating a user or logging out forgets them straight away.
+    DM_USER_CACHE_TTL = 60
+    DM_USER_CACHE_SIZE = 1000
+
+    # Outbound HTTP connection pools, shared between threads by the Data API and Direct Plus clients. Up to
+    # DM_HTTP_POOL_MAXSIZE connections to each of DM_HTTP_POOL_CONNECTIONS hosts are kept alive to be reused - when
+    # they're all in use an extra connection is opened (and closed afterwards), or with DM_HTTP_POOL_BLOCK set requests
+    # wait for one to be free.
+    DM_HTTP_POOL_CONNECTIONS = 10
+    DM_HTTP_POOL_MAXSIZE = 20
+    DM_HTTP_POOL_BLOCK = False
+    DM_HTTP_RETRIES = 5
+    DM_HTTP_RETRY_BACKOFF_FACTOR = 0.3
+    # Send TCP keep-alive probes on connections idle for this many seconds, so dead ones are noticed (0 disables this)
+    DM_HTTP_KEEP_ALIVE_IDLE = 60
+
+    # Document download links are signed to expire after DM_SIGNED_URL_EXPIRES_IN seconds. Up to
+    # DM_SIGNED_URL_CACHE_SIZE of them are reused in each worker until DM_SIGNED_URL_CACHE_MARGIN seconds before they
+    # expire (a size of 0 disables this).
+    DM_SIGNED_URL_EXPIRES_IN = 30
+    DM_SIGNED_URL_CACHE_MARGIN = 10
+    DM_SIGNED_URL_CACHE_SIZE = 1000
+
+    # Uploaded documents are kept in memory until they're this many bytes long, and in a temporary file after that
+    DM_UPLOAD_SPOOL_SIZE = 512 * 1024
+
+    # Size of the thread pool views use to make independent API/S3 calls at the same time (1 makes them in turn)
+    DM_CONCURRENT_CALLS_MAX_WORKERS = 8
+    # Size of the separate thread pool documents are uploaded to S3 from, so uploads never hold up other views' calls
+    DM_CONCURRENT_UPLOADS_MAX_WORKERS = 4
+
     @staticmethod
     def init_app(app):
         repo_root = os.path.abspath(os.path.dirname(__file__))
@@ -131,6 +200,10 @@ class Test(Config):
 
     DM_ASSETS_URL = 'http://asset-host'
 
+    DM_FRAMEWORK_CACHE_TTL = 0
+    DM_COMMUNICATIONS_CACHE_TTL = 0
+    DM_USER_CACHE_TTL = 0
+
     DM_G12_RECOVERY_SUPPLIER_IDS = "577184"
     DM_G12_RECOVERY_DRAFT_IDS = "123456"
 
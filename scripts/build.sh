@@ -4,8 +4,12 @@ set -e
 
 npm run frontend-build:production 1>&2
 
+# Precompile the frameworks content copied in by the frontend build so workers don't have to parse it on boot
+FLASK_APP=application flask build-content-snapshot 1>&2
+
 # Non-Git paths that should be included when deploying
 echo "app/static"
 echo "app/templates/toolkit"
 echo "app/templates/govuk"
 echo "app/content"
+echo "app/content-snapshot.pickle"
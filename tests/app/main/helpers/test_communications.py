@@ -0,0 +1,118 @@
+import threading
+
+import mock
+import pytest
+
+from app.caching import _refresher
+from app.main.helpers.communications import CommunicationsCache, CommunicationsIndex
+from app.s3_buckets import S3Buckets
+
+
+def _file(path, last_modified):
+    return {'path': path, 'last_modified': last_modified}
+
+
+@pytest.fixture
+def files():
+    # as listed by S3.list(..., load_timestamps=True), oldest first
+    return [
+        _file('g-cloud-12/communications/updates/communications/first.pdf', '2020-01-01T12:00:00.000Z'),
+        _file('g-cloud-12/communications/g-cloud-12-invitation.pdf', '2020-02-01T12:00:00.000Z'),
+        _file('g-cloud-12/communications/updates/clarifications/answers.pdf', '2020-03-01T12:00:00.000Z'),
+        _file('g-cloud-12/communications/g-cloud-12-proposed-call-off.pdf', '2020-04-01T12:00:00.000Z'),
+    ]
+
+
+@pytest.fixture
+def s3():
+    with mock.patch('app.s3_buckets.s3.S3') as s3:
+        yield s3
+
+
+class TestCommunicationsIndex:
+
+    @pytest.mark.parametrize('prefix, last_modified', (
+        ('g-cloud-12/communications/g-cloud-12-invitation.pdf', '2020-02-01T12:00:00.000Z'),
+        ('g-cloud-12/communications/g-cloud-12-proposed', '2020-04-01T12:00:00.000Z'),
+        ('g-cloud-12/communications/updates/', '2020-03-01T12:00:00.000Z'),
+        ('g-cloud-12/communications/updates/communications/', '2020-01-01T12:00:00.000Z'),
+        ('g-cloud-12/communications/', '2020-04-01T12:00:00.000Z'),
+        ('g-cloud-12/communications/g-cloud-12-final-call-off.pdf', None),
+    ))
+    def test_last_modified(self, files, prefix, last_modified):
+        assert CommunicationsIndex(files).last_modified(prefix) == last_modified
+
+    def test_files_in(self, files):
+        index = CommunicationsIndex(files)
+
+        assert index.files_in('g-cloud-12/communications/updates/') == [files[0], files[2]]
+        assert index.files_in('g-cloud-12/communications/updates/clarifications/') == [files[2]]
+        assert index.files_in('g-cloud-12/communications/nothing/') == []
+
+    def test_prefixes_are_only_looked_for_once(self, files):
+        index = CommunicationsIndex(files)
+        index.last_modified('g-cloud-12/communications/g-cloud-12-final-call-off.pdf')
+
+        with mock.patch.object(index, 'files', ()):
+            assert index.latest('g-cloud-12/communications/g-cloud-12-final-call-off.pdf') is None
+            assert index.latest('g-cloud-12/communications/updates/') is files[2]
+
+
+class TestCommunicationsCache:
+
+    def test_listings_are_cached_per_framework(self, s3, files):
+        s3.return_value.list.return_value = files
+        cache = CommunicationsCache(S3Buckets(), 'communications-bucket', ttl=60, max_age=3600)
+
+        assert cache.get('g-cloud-12').files == tuple(files)
+        assert cache.get('g-cloud-12') is cache.get('g-cloud-12')
+        cache.get('g-cloud-11')
+
+        assert s3.call_args_list == [mock.call('communications-bucket')]
+        assert s3.return_value.list.call_args_list == [
+            mock.call('g-cloud-12/communications', load_timestamps=True),
+            mock.call('g-cloud-11/communications', load_timestamps=True),
+        ]
+
+    def test_refresh(self, s3, files):
+        s3.return_value.list.return_value = files
+        cache = CommunicationsCache(S3Buckets(), 'communications-bucket', ttl=60, max_age=3600)
+        cache.get('g-cloud-12')
+        cache.get('g-cloud-11')
+
+        cache.refresh('g-cloud-12')
+        cache.get('g-cloud-12')
+        cache.get('g-cloud-11')
+        assert s3.return_value.list.call_count == 3
+
+        cache.refresh()
+        cache.get('g-cloud-11')
+        assert s3.return_value.list.call_count == 4
+
+    def test_listings_are_not_cached_with_no_ttl(self, s3, files):
+        s3.return_value.list.return_value = files
+        cache = CommunicationsCache(S3Buckets(), 'communications-bucket', ttl=0, max_age=3600)
+
+        cache.get('g-cloud-12')
+        cache.get('g-cloud-12')
+        cache.refresh('g-cloud-12')
+
+        assert s3.return_value.list.call_count == 2
+
+    def test_background_refreshes_reuse_one_bucket(self, s3, files):
+        s3.return_value.list.return_value = files
+        cache = CommunicationsCache(S3Buckets(), 'communications-bucket', ttl=60, max_age=3600)
+
+        with mock.patch('app.caching.time.monotonic') as now:
+            now.return_value = 1000.0
+            cache.get('g-cloud-12')
+            for _ in range(2):
+                now.return_value += 61
+                cache.get('g-cloud-12')
+                refreshed = threading.Event()
+                _refresher.submit(refreshed.set)
+                assert refreshed.wait(5)
+
+        assert s3.return_value.list.call_count == 3
+        # one for this thread, and one for the thread refreshes are made on
+        assert s3.call_count == 2
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+from flask import Flask, g, request
+
+from app.main.helpers.concurrency import run_concurrently
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['DM_CONCURRENT_CALLS_MAX_WORKERS'] = 4
+    app.config['DM_CONCURRENT_UPLOADS_MAX_WORKERS'] = 2
+    return app
+
+
+class TestRunConcurrently:
+
+    def test_returns_results_in_order(self, app):
+        with app.app_context():
+            assert run_concurrently(lambda: 1, lambda: 2, lambda: 3) == [1, 2, 3]
+
+    def test_calls_are_made_at_the_same_time(self, app):
+        barrier = threading.Barrier(2, timeout=5)
+
+        with app.app_context():
+            # each call waits for the other, so this would time out if they were made in turn
+            assert run_concurrently(barrier.wait, barrier.wait) in ([0, 1], [1, 0])
+
+    def test_calls_share_the_callers_request_and_g(self, app):
+        with app.test_request_context('/suppliers?page=2'):
+            g.supplier_id = 1234
+            assert run_concurrently(
+                lambda: g.supplier_id,
+                lambda: request.args['page'],
+            ) == [1234, '2']
+            assert request.path == '/suppliers'
+
+    def test_raises_the_first_exception_once_all_calls_have_finished(self, app):
+        finished = []
+
+        def fail(message):
+            raise ValueError(message)
+
+        with app.app_context():
+            with pytest.raises(ValueError, match='first'):
+                run_concurrently(lambda: fail('first'), lambda: finished.append(True), lambda: fail('second'))
+
+        assert finished == [True]
+
+    def test_nested_calls_are_made_in_turn(self, app):
+        with app.app_context():
+            threads = run_concurrently(
+                lambda: run_concurrently(threading.current_thread, threading.current_thread),
+            )[0]
+
+        assert threads[0] is threads[1]
+        assert threads[0] is not threading.current_thread()
+
+    def test_calls_are_made_in_turn_with_a_single_worker(self, app):
+        app.config['DM_CONCURRENT_CALLS_MAX_WORKERS'] = 1
+
+        with app.app_context():
+            assert run_concurrently(threading.current_thread, threading.current_thread) == [
+                threading.current_thread(),
+                threading.current_thread(),
+            ]
+
+    def test_pools_have_their_own_threads(self, app):
+        with app.app_context():
+            calls_thread = run_concurrently(threading.current_thread, threading.current_thread)[0]
+            uploads_thread = run_concurrently(threading.current_thread, threading.current_thread, pool='uploads')[0]
+
+        assert calls_thread.name.startswith('concurrent-calls')
+        assert uploads_thread.name.startswith('concurrent-uploads')
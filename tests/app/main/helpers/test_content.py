@@ -0,0 +1,688 @@
+import os
+import pathlib
+from copy import deepcopy
+
+import mock
+import pytest
+
+from dmcontent.errors import ContentNotFoundError
+
+from app.main.helpers.content import (
+    ContentWatcher,
+    FilteredManifestCache,
+    FrameworkContent,
+    LazyContentLoader,
+    QuestionIndex,
+    content_checksum,
+    get_question_index,
+    load_content_loader,
+    read_content_snapshot,
+    retained_size,
+    write_content_snapshot,
+)
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def content_path(tmp_path):
+    for framework_slug in ('g-cloud-99', 'g-cloud-100'):
+        framework_path = tmp_path / 'frameworks' / framework_slug
+        _write(
+            framework_path / 'manifests' / 'edit_submission.yml',
+            "- name: About your service\n"
+            "  description: Tell us about your {{ frameworkName }} service\n"
+            "  questions:\n    - serviceName\n    - serviceDescription\n",
+        )
+        _write(
+            framework_path / 'questions' / 'services' / 'serviceName.yml',
+            "question: Service name\ntype: text\ndepends:\n  - \"on\": lot\n    being:\n      - cloud-hosting\n",
+        )
+        _write(
+            framework_path / 'questions' / 'services' / 'serviceDescription.yml',
+            "question: Service description\ntype: textbox_large\nmax_length_in_words: 50\n",
+        )
+        _write(
+            framework_path / 'questions' / 'services' / 'lot.yml',
+            "question: Lot\ntype: radios\noptions:\n"
+            "  - label: Cloud hosting\n    value: cloud-hosting\n    description: Platform or infrastructure\n"
+            "  - label: Cloud software\n    value: cloud-software\n    description: Applications\n",
+        )
+        _write(
+            framework_path / 'manifests' / 'declaration.yml',
+            "- name: About you\n  questions:\n    - contact\n    - biography\n"
+            "- name: About your company\n  questions:\n    - companyName\n",
+        )
+        _write(
+            framework_path / 'questions' / 'declaration' / 'contact.yml',
+            "name: Contact details\nquestion: Contact details\ntype: multiquestion\n"
+            "questions:\n  - contactName\n  - biography\n",
+        )
+        _write(framework_path / 'questions' / 'declaration' / 'contactName.yml', "question: Name\ntype: text\n")
+        _write(
+            framework_path / 'questions' / 'declaration' / 'biography.yml',
+            "question: Biography\ntype: textbox_large\nmax_length_in_words: 100\nvalidations:\n"
+            "  - name: answer_required\n    message: Tell us about yourself\n",
+        )
+        _write(
+            framework_path / 'questions' / 'declaration' / 'companyName.yml', "question: Company name\ntype: text\n"
+        )
+        _write(framework_path / 'messages' / 'urls.yml', "framework_pricing_document: pricing.pdf\n")
+        _write(framework_path / 'metadata' / 'copy_services.yml', "source_framework: g-cloud-98\n")
+
+    return str(tmp_path)
+
+
+@pytest.fixture
+def framework_content():
+    return tuple(
+        FrameworkContent(
+            framework_slug,
+            manifests=(('services', 'edit_submission'), ('declaration', 'declaration')),
+            messages=('urls',),
+            metadata=('copy_services',),
+        )
+        for framework_slug in ('g-cloud-99', 'g-cloud-100')
+    )
+
+
+class TestLazyContentLoader:
+
+    def test_nothing_is_loaded_up_front(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        assert content_loader.loaded_frameworks == ()
+
+    @pytest.mark.parametrize('get_content', (
+        lambda cl: cl.get_manifest('g-cloud-99', 'edit_submission'),
+        lambda cl: cl.get_builder('g-cloud-99', 'edit_submission'),
+        lambda cl: cl.get_message('g-cloud-99', 'urls'),
+        lambda cl: cl.get_metadata('g-cloud-99', 'copy_services'),
+    ))
+    def test_framework_is_loaded_on_first_use(self, content_path, framework_content, get_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        get_content(content_loader)
+
+        assert content_loader.loaded_frameworks == ('g-cloud-99',)
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'pricing.pdf'
+        assert content_loader.get_metadata('g-cloud-99', 'copy_services', 'source_framework') == 'g-cloud-98'
+        assert content_loader.get_manifest('g-cloud-99', 'edit_submission').get_question('serviceName')
+
+    def test_framework_is_only_loaded_once(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        with mock.patch.object(content_loader, 'load_manifest', wraps=content_loader.load_manifest) as load_manifest:
+            content_loader.get_manifest('g-cloud-99', 'edit_submission')
+            content_loader.get_message('g-cloud-99', 'urls')
+            content_loader.get_manifest('g-cloud-99', 'edit_submission')
+
+        assert load_manifest.call_args_list == [
+            mock.call('g-cloud-99', 'services', 'edit_submission'),
+            mock.call('g-cloud-99', 'declaration', 'declaration'),
+        ]
+
+    def test_load_all_loads_every_registered_framework(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        content_loader.load_all()
+
+        assert content_loader.loaded_frameworks == ('g-cloud-100', 'g-cloud-99')
+
+    def test_unregistered_framework_raises_content_not_found(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        with pytest.raises(ContentNotFoundError):
+            content_loader.get_manifest('g-cloud-101', 'edit_submission')
+
+        assert content_loader.loaded_frameworks == ()
+
+    def test_explicitly_loaded_messages_are_still_available(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, ())
+
+        content_loader.load_messages('g-cloud-99', ['urls'])
+
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'pricing.pdf'
+
+    def test_can_be_deep_copied(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+
+        content_loader_copy = deepcopy(content_loader)
+
+        assert content_loader_copy.loaded_frameworks == ('g-cloud-99',)
+        content_loader_copy.load_framework('g-cloud-100')
+        assert content_loader_copy.loaded_frameworks == ('g-cloud-100', 'g-cloud-99')
+        assert content_loader.loaded_frameworks == ('g-cloud-99',)
+
+    def test_explicitly_loaded_messages_are_only_read_once(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, ())
+
+        with mock.patch.object(content_loader, '_load_message', wraps=content_loader._load_message) as _load_message:
+            content_loader.load_messages('g-cloud-99', ['urls'])
+            content_loader.load_messages('g-cloud-99', ['urls'])
+
+        assert _load_message.call_args_list == [mock.call('g-cloud-99', 'urls')]
+
+    def test_manifests_filtered_in_place_do_not_affect_each_other(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        content_loader.get_manifest('g-cloud-99', 'edit_submission').filter(
+            {'lot': 'cloud-software'}, inplace_allowed=True
+        ).summary({'serviceDescription': 'Tasty'}, inplace_allowed=True)
+        manifest = content_loader.get_manifest('g-cloud-99', 'edit_submission')
+
+        assert manifest.sections[0].get_question_ids() == ['serviceName', 'serviceDescription']
+        assert manifest.get_question('serviceDescription').number == 2
+        assert not hasattr(manifest.get_question('serviceDescription'), 'value')
+
+
+class TestFrameworkStats:
+
+    def test_unloaded_frameworks_have_no_stats(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        assert content_loader.framework_stats()['g-cloud-99'] == {
+            'loaded': False, 'bytes': 0, 'load_seconds': {}, 'total_load_seconds': 0,
+        }
+
+    def test_load_time_and_size_of_loaded_frameworks(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        content_loader.load_framework('g-cloud-99')
+
+        stats = content_loader.framework_stats()
+        assert stats['g-cloud-99']['loaded'] is True
+        assert stats['g-cloud-99']['bytes'] > 0
+        assert {
+            kind: sorted(durations) for kind, durations in stats['g-cloud-99']['load_seconds'].items()
+        } == {
+            'manifests': ['declaration', 'edit_submission'],
+            'messages': ['urls'],
+            'metadata': ['copy_services'],
+        }
+        assert stats['g-cloud-99']['total_load_seconds'] == pytest.approx(
+            sum(sum(durations.values()) for durations in stats['g-cloud-99']['load_seconds'].values())
+        )
+        assert stats['g-cloud-100']['loaded'] is False
+
+    def test_load_times_are_kept_when_a_framework_is_unloaded(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+
+        content_loader.unload_framework('g-cloud-99')
+
+        stats = content_loader.framework_stats()['g-cloud-99']
+        assert stats['loaded'] is False
+        assert stats['bytes'] == 0
+        assert stats['total_load_seconds'] > 0
+
+
+class TestReloadFramework:
+
+    def _edit_urls(self, content_path, content):
+        with open(os.path.join(content_path, 'frameworks', 'g-cloud-99', 'messages', 'urls.yml'), 'w') as f:
+            f.write(content)
+
+    def test_reloads_changed_content(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting'})
+
+        self._edit_urls(content_path, "framework_pricing_document: new-pricing.pdf\n")
+
+        assert content_loader.reload_framework('g-cloud-99') is True
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'new-pricing.pdf'
+        assert content_loader.framework_versions == {'g-cloud-99': 2}
+        assert content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting'}
+        ) is not manifest
+
+    def test_keeps_explicitly_loaded_messages(self, content_path, framework_content):
+        other_urls_path = pathlib.Path(content_path) / 'frameworks' / 'g-cloud-99' / 'messages' / 'other-urls.yml'
+        _write(other_urls_path, "framework_pricing_document: other-pricing.pdf\n")
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_messages('g-cloud-99', ['other-urls'])
+        content_loader.load_framework('g-cloud-99')
+
+        _write(other_urls_path, "framework_pricing_document: new-other-pricing.pdf\n")
+
+        assert content_loader.reload_framework('g-cloud-99') is True
+        assert content_loader.get_message('g-cloud-99', 'other-urls', 'framework_pricing_document') == (
+            'new-other-pricing.pdf'
+        )
+
+    def test_keeps_old_content_if_new_content_is_broken(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+
+        self._edit_urls(content_path, "framework_pricing_document: [\n")
+
+        assert content_loader.reload_framework('g-cloud-99') is False
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'pricing.pdf'
+        assert content_loader.framework_versions == {'g-cloud-99': 1}
+
+    def test_does_not_load_unloaded_frameworks(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        assert content_loader.reload_framework('g-cloud-99') is False
+        assert content_loader.loaded_frameworks == ()
+
+
+class TestContentWatcher:
+
+    def test_reloads_loaded_frameworks_which_change(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+        content_watcher = ContentWatcher(content_loader, interval=60)
+
+        assert content_watcher.check() == []
+
+        for framework_slug in ('g-cloud-99', 'g-cloud-100'):
+            _write(
+                pathlib.Path(content_path) / 'frameworks' / framework_slug / 'messages' / 'urls.yml',
+                "framework_pricing_document: new-pricing.pdf\n",
+            )
+
+        assert content_watcher.check() == ['g-cloud-99']
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'new-pricing.pdf'
+        assert content_loader.loaded_frameworks == ('g-cloud-99',)
+        assert content_watcher.check() == []
+
+
+class TestFrameworkTiers:
+
+    @pytest.fixture
+    def content_loader(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.expired_framework_limit = 1
+        return content_loader
+
+    def test_frameworks_are_pinned_by_default(self, content_loader):
+        content_loader.load_all()
+
+        tier_stats = content_loader.tier_stats()
+        assert tier_stats['pinned']['frameworks'] == ['g-cloud-100', 'g-cloud-99']
+        assert tier_stats['pinned']['bytes'] > 0
+        assert tier_stats['expired'] == {'frameworks': [], 'bytes': 0}
+
+    def test_least_recently_used_expired_framework_is_unloaded(self, content_loader):
+        content_loader.set_framework_status('g-cloud-99', 'expired')
+        content_loader.set_framework_status('g-cloud-100', 'expired')
+        content_loader.get_manifest('g-cloud-99', 'declaration')
+        content_loader.get_filtered_manifest('g-cloud-99', 'declaration', {})
+
+        content_loader.get_manifest('g-cloud-100', 'declaration')
+
+        assert content_loader.loaded_frameworks == ('g-cloud-100',)
+        assert content_loader.tier_stats()['expired']['frameworks'] == ['g-cloud-100']
+        assert len(content_loader.filtered_manifests) == 0
+
+    def test_unloaded_expired_framework_is_loaded_again_on_demand(self, content_loader):
+        content_loader.set_framework_status('g-cloud-99', 'expired')
+        content_loader.set_framework_status('g-cloud-100', 'expired')
+        content_loader.get_message('g-cloud-99', 'urls')
+        content_loader.get_message('g-cloud-100', 'urls')
+
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'pricing.pdf'
+        assert content_loader.get_metadata('g-cloud-100', 'copy_services', 'source_framework') == 'g-cloud-98'
+        assert content_loader.framework_versions == {'g-cloud-99': 2, 'g-cloud-100': 2}
+
+    @pytest.mark.parametrize('read', (
+        lambda content_loader: content_loader.get_manifest('g-cloud-99', 'declaration').sections[0].id,
+        lambda content_loader: content_loader.get_filtered_manifest('g-cloud-99', 'declaration', {}).sections[0].id,
+        lambda content_loader: content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document'),
+        lambda content_loader: content_loader.get_metadata('g-cloud-99', 'copy_services', 'source_framework'),
+    ))
+    def test_frameworks_evicted_before_they_are_read_are_loaded_again(self, content_loader, read):
+        load_framework = content_loader.load_framework
+
+        def load_framework_then_evict_it(framework_slug):
+            load_framework(framework_slug)
+            if content_loader.framework_versions[framework_slug] == 1:
+                # as if another thread evicted it straight away
+                content_loader.unload_framework(framework_slug)
+
+        with mock.patch.object(content_loader, 'load_framework', side_effect=load_framework_then_evict_it):
+            assert read(content_loader) in ('about-you', 'pricing.pdf', 'g-cloud-98')
+
+        assert content_loader.loaded_frameworks == ('g-cloud-99',)
+        assert content_loader.framework_versions == {'g-cloud-99': 2}
+
+    def test_using_an_expired_framework_keeps_it_loaded(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.expired_framework_limit = 2
+        for framework_slug in ('g-cloud-99', 'g-cloud-100'):
+            content_loader.set_framework_status(framework_slug, 'expired')
+            content_loader.load_framework(framework_slug)
+
+        content_loader.get_manifest('g-cloud-99', 'declaration')
+        content_loader.expired_framework_limit = 1
+        content_loader.set_framework_status('g-cloud-101', 'expired')
+
+        assert content_loader.loaded_frameworks == ('g-cloud-99',)
+
+    def test_loaded_framework_is_moved_between_tiers_when_its_status_changes(self, content_loader):
+        content_loader.load_all()
+
+        content_loader.set_framework_status('g-cloud-99', 'expired')
+        assert content_loader.tier_stats()['expired']['frameworks'] == ['g-cloud-99']
+
+        content_loader.set_framework_status('g-cloud-99', 'live')
+        assert content_loader.tier_stats()['expired']['frameworks'] == []
+        assert content_loader.tier_stats()['pinned']['frameworks'] == ['g-cloud-100', 'g-cloud-99']
+
+    def test_pinned_frameworks_are_never_unloaded(self, content_loader):
+        content_loader.set_framework_status('g-cloud-99', 'live')
+        content_loader.set_framework_status('g-cloud-100', 'expired')
+
+        content_loader.load_all()
+
+        assert content_loader.loaded_frameworks == ('g-cloud-100', 'g-cloud-99')
+
+
+def test_retained_size_counts_shared_objects_once():
+    shared = ['x' * 1000]
+
+    assert retained_size({'a': shared, 'b': shared}) < retained_size({'a': shared, 'b': ['y' * 1000]})
+    assert retained_size(shared, seen={id(shared)}) == 0
+
+
+class TestGetFilteredManifest:
+
+    def test_filters_manifest(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_submission', {'lot': 'cloud-software'})
+
+        assert manifest.sections[0].get_question_ids() == ['serviceDescription']
+        assert manifest.get_question('serviceDescription').number == 1
+
+    def test_cache_key_identifies_content_version_and_context(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_submission', {'lot': 'cloud-software'})
+        content_loader.reload_framework('g-cloud-99')
+        reloaded_manifest = content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-software'}
+        )
+
+        assert manifest.cache_key[:3] == ('g-cloud-99', 1, 'edit_submission')
+        assert reloaded_manifest.cache_key[:3] == ('g-cloud-99', 2, 'edit_submission')
+        assert manifest.cache_key[3:] == reloaded_manifest.cache_key[3:]
+
+    def test_content_key_is_the_same_for_the_same_content_in_any_loader(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        other_content_loader = LazyContentLoader(content_path, framework_content)
+        other_content_loader.load_framework('g-cloud-99')
+        other_content_loader.reload_framework('g-cloud-99')
+
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_submission', {'lot': 'cloud-software'})
+        other_manifest = other_content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-software'}
+        )
+        services_path = pathlib.Path(content_path) / 'frameworks' / 'g-cloud-99' / 'questions' / 'services'
+        _write(
+            services_path / 'serviceDescription.yml',
+            "question: Describe your service\ntype: textbox_large\n",
+        )
+        content_loader.reload_framework('g-cloud-99')
+        edited_manifest = content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-software'}
+        )
+
+        assert manifest.cache_key != other_manifest.cache_key
+        assert manifest.content_key == other_manifest.content_key
+        assert manifest.content_key[0] == 'g-cloud-99'
+        assert edited_manifest.content_key != manifest.content_key
+
+    def test_contexts_are_narrowed_to_the_keys_the_manifest_uses(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        manifest = content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting', 'id': 1, 'updatedAt': '2020-01-01'}
+        )
+
+        assert content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting', 'id': 2, 'serviceName': 'Cheese'}
+        ) is manifest
+        assert content_loader.get_filtered_manifest(
+            'g-cloud-99', 'edit_submission', {'lot': 'cloud-software'}
+        ) is not manifest
+        assert content_loader.get_filtered_manifest(
+            'g-cloud-100', 'edit_submission', {'lot': 'cloud-hosting'}
+        ) is not manifest
+        assert content_loader.filtered_manifests.stats() == {'hits': 1, 'misses': 3, 'size': 3, 'maxsize': 256}
+
+    def test_contexts_used_in_templates_are_kept(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        manifests = [
+            content_loader.get_filtered_manifest(
+                'g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting', 'frameworkName': framework_name}
+            )
+            for framework_name in ('G-Cloud 99', 'G-Cloud 99', 'G-Cloud 100')
+        ]
+
+        assert manifests[0] is manifests[1]
+        assert manifests[0].sections[0].description == 'Tell us about your G-Cloud 99 service'
+        assert manifests[2].sections[0].description == 'Tell us about your G-Cloud 100 service'
+
+    def test_cached_manifests_cannot_be_changed_in_place(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_submission', {'lot': 'cloud-hosting'})
+
+        summary = manifest.summary({'serviceName': 'Cheese'}, inplace_allowed=True)
+        filtered = manifest.filter({'lot': 'cloud-software'}, inplace_allowed=True)
+
+        assert summary is not manifest
+        assert summary.get_question('serviceName').value == 'Cheese'
+        assert filtered is not manifest
+        assert manifest.sections[0].get_question_ids() == ['serviceName', 'serviceDescription']
+        assert not hasattr(manifest.get_question('serviceName'), 'value')
+
+    def test_unknown_manifest_raises_content_not_found(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        with pytest.raises(ContentNotFoundError):
+            content_loader.get_filtered_manifest('g-cloud-99', 'edit_service', {'lot': 'cloud-hosting'})
+
+
+class TestQuestionIndex:
+
+    @pytest.fixture
+    def manifest(self, content_path, framework_content):
+        return LazyContentLoader(content_path, framework_content).get_manifest('g-cloud-99', 'declaration')
+
+    def test_question_ids_match_the_manifest_sections(self, manifest):
+        assert QuestionIndex(manifest).question_ids == ['contactName', 'biography', 'biography', 'companyName']
+
+    @pytest.mark.parametrize('question_id', ('contact', 'contactName', 'biography', 'companyName', 'notAQuestion'))
+    def test_get_question_matches_manifest(self, manifest, question_id):
+        assert QuestionIndex(manifest).get_question(question_id) is manifest.get_question(question_id)
+
+    def test_question_details(self, manifest):
+        question_index = QuestionIndex(manifest)
+
+        assert 'companyName' in question_index
+        assert 'notAQuestion' not in question_index
+        assert question_index.get('notAQuestion') is None
+        assert question_index['companyName'].number == 3
+        assert question_index['companyName'].type == 'text'
+        assert question_index['companyName'].max_length_in_words is None
+        assert question_index['companyName'].validations == []
+        assert question_index['biography'].number is None
+        assert question_index['biography'].type == 'textbox_large'
+        assert question_index['biography'].max_length_in_words == 100
+        assert question_index['biography'].validations == [
+            {'name': 'answer_required', 'message': 'Tell us about yourself'}
+        ]
+
+    def test_filtered_manifests_keep_their_index(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'declaration', {})
+
+        assert get_question_index(manifest) is get_question_index(manifest)
+        assert manifest.get_question('companyName') is get_question_index(manifest).get_question('companyName')
+
+    def test_other_manifests_are_indexed_from_scratch(self, manifest):
+        assert get_question_index(manifest) is not get_question_index(manifest)
+
+    def test_section_offsets(self, manifest):
+        assert QuestionIndex(manifest).section_offsets == {'about-you': 0, 'about-your-company': 3}
+
+    def test_pricing_questions_are_found_by_their_field_ids(self, content_path, framework_content):
+        framework_path = pathlib.Path(content_path) / 'frameworks' / 'g-cloud-99'
+        _write(framework_path / 'manifests' / 'edit_pricing.yml', "- name: Pricing\n  questions:\n    - price\n")
+        _write(
+            framework_path / 'questions' / 'services' / 'price.yml',
+            "question: Price\ntype: pricing\nfields:\n  minimum_price: priceMin\n  maximum_price: priceMax\n",
+        )
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_manifest('g-cloud-99', 'services', 'edit_pricing')
+        manifest = content_loader.get_filtered_manifest('g-cloud-99', 'edit_pricing', {})
+        question_index = get_question_index(manifest)
+
+        assert manifest.get_question('priceMin').id == 'price'
+        assert question_index['priceMax'].question is manifest.get_question('price')
+        assert question_index.question_ids == ['price']
+
+
+class TestGetLotOptions:
+
+    def test_lot_options_by_slug(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+
+        lot_options = content_loader.get_lot_options('g-cloud-99')
+
+        assert list(lot_options) == ['cloud-hosting', 'cloud-software']
+        assert lot_options['cloud-software']['label'] == 'Cloud software'
+        assert lot_options['cloud-software']['description'] == 'Applications'
+
+    def test_lot_options_are_only_worked_out_once(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.load_framework('g-cloud-99')
+
+        with mock.patch.object(content_loader, 'get_question', wraps=content_loader.get_question) as get_question:
+            assert content_loader.get_lot_options('g-cloud-99') is content_loader.get_lot_options('g-cloud-99')
+
+        assert get_question.call_count == 1
+
+    def test_lot_options_change_with_the_content(self, content_path, framework_content):
+        content_loader = LazyContentLoader(content_path, framework_content)
+        content_loader.get_lot_options('g-cloud-99')
+        _write(
+            pathlib.Path(content_path) / 'frameworks' / 'g-cloud-99' / 'questions' / 'services' / 'lot.yml',
+            "question: Lot\ntype: radios\noptions:\n"
+            "  - label: Cloud support\n    value: cloud-support\n    description: Help\n",
+        )
+
+        content_loader.reload_framework('g-cloud-99')
+
+        assert list(content_loader.get_lot_options('g-cloud-99')) == ['cloud-support']
+
+
+class TestFilteredManifestCache:
+
+    def test_least_recently_used_manifest_is_evicted(self):
+        cache = FilteredManifestCache(maxsize=2)
+        cache.set('a', mock.sentinel.a)
+        cache.set('b', mock.sentinel.b)
+        cache.get('a')
+
+        cache.set('c', mock.sentinel.c)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is mock.sentinel.a
+        assert cache.get('c') is mock.sentinel.c
+        assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+    def test_clear(self):
+        cache = FilteredManifestCache(maxsize=2)
+        cache.set('a', mock.sentinel.a)
+
+        cache.clear()
+
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_discard_framework(self):
+        cache = FilteredManifestCache(maxsize=3)
+        cache.set(('g-cloud-99', 1, 'declaration'), mock.sentinel.a)
+        cache.set(('g-cloud-99', 1, 'edit_submission'), mock.sentinel.b)
+        cache.set(('g-cloud-100', 1, 'declaration'), mock.sentinel.c)
+
+        cache.discard_framework('g-cloud-99')
+
+        assert len(cache) == 1
+        assert cache.get(('g-cloud-100', 1, 'declaration')) is mock.sentinel.c
+
+
+class TestContentSnapshot:
+
+    def test_checksum_changes_with_the_content(self, content_path, framework_content):
+        checksum = content_checksum(content_path, framework_content)
+        assert content_checksum(content_path, framework_content) == checksum
+
+        with open(os.path.join(content_path, 'frameworks', 'g-cloud-99', 'messages', 'urls.yml'), 'a') as f:
+            f.write("framework_agreement_document: agreement.pdf\n")
+
+        assert content_checksum(content_path, framework_content) != checksum
+
+    def test_checksum_changes_with_the_registry(self, content_path, framework_content):
+        checksum = content_checksum(content_path, framework_content)
+
+        assert content_checksum(content_path, framework_content[:1]) != checksum
+
+    def test_snapshot_round_trip(self, tmp_path, content_path, framework_content):
+        snapshot_path = str(tmp_path / 'snapshot.pickle')
+
+        checksum = write_content_snapshot(LazyContentLoader(content_path, framework_content), snapshot_path)
+        content_loader = read_content_snapshot(snapshot_path, checksum)
+
+        assert content_loader.loaded_frameworks == ('g-cloud-100', 'g-cloud-99')
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'pricing.pdf'
+        manifest = content_loader.get_manifest('g-cloud-99', 'edit_submission').filter({'lot': 'cloud-hosting'})
+        assert manifest.get_question('serviceName').question == 'Service name'
+        # the lock isn't pickled, so make sure a working one was recreated
+        content_loader.load_messages('g-cloud-99', ['urls'])
+
+    def test_stale_snapshot_is_ignored(self, tmp_path, content_path, framework_content):
+        snapshot_path = str(tmp_path / 'snapshot.pickle')
+        write_content_snapshot(LazyContentLoader(content_path, framework_content), snapshot_path)
+
+        assert read_content_snapshot(snapshot_path, 'not-the-checksum') is None
+
+    def test_missing_snapshot_is_ignored(self, tmp_path):
+        assert read_content_snapshot(str(tmp_path / 'snapshot.pickle'), 'checksum') is None
+
+    def test_load_content_loader_uses_up_to_date_snapshot(self, tmp_path, content_path, framework_content):
+        snapshot_path = str(tmp_path / 'snapshot.pickle')
+        write_content_snapshot(LazyContentLoader(content_path, framework_content), snapshot_path)
+
+        content_loader = load_content_loader(content_path, framework_content, snapshot_path)
+
+        assert content_loader.loaded_frameworks == ('g-cloud-100', 'g-cloud-99')
+
+    def test_load_content_loader_falls_back_to_yaml(self, tmp_path, content_path, framework_content):
+        snapshot_path = str(tmp_path / 'snapshot.pickle')
+        write_content_snapshot(LazyContentLoader(content_path, framework_content), snapshot_path)
+
+        with open(os.path.join(content_path, 'frameworks', 'g-cloud-99', 'messages', 'urls.yml'), 'w') as f:
+            f.write("framework_pricing_document: new-pricing.pdf\n")
+        content_loader = load_content_loader(content_path, framework_content, snapshot_path)
+
+        assert content_loader.loaded_frameworks == ()
+        assert content_loader.get_message('g-cloud-99', 'urls', 'framework_pricing_document') == 'new-pricing.pdf'
+
+    def test_load_content_loader_does_not_checksum_the_content_without_a_snapshot(
+        self, tmp_path, content_path, framework_content
+    ):
+        with mock.patch('app.main.helpers.content.content_checksum') as content_checksum:
+            content_loader = load_content_loader(content_path, framework_content, str(tmp_path / 'snapshot.pickle'))
+
+        assert content_loader.loaded_frameworks == ()
+        assert not content_checksum.called
@@ -15,7 +15,8 @@ from app.main.helpers.frameworks import (
     check_agreement_is_related_to_supplier_framework_or_abort, get_framework_for_reuse, get_statuses_for_lot,
     return_supplier_framework_info_if_on_framework_or_abort, order_frameworks_for_reuse,
     get_frameworks_closed_and_open_for_applications, get_supplier_registered_name_from_declaration,
-    get_framework_or_500, EnsureApplicationCompanyDetailsHaveBeenConfirmed, return_404_if_applications_closed
+    get_framework_or_500, EnsureApplicationCompanyDetailsHaveBeenConfirmed, return_404_if_applications_closed,
+    get_completed_lots,
 )
 
 from ...helpers import BaseApplicationTest
@@ -636,6 +637,24 @@ def test_get_supplier_registered_name_from_declaration(name_of_org, supplier_reg
     assert get_supplier_registered_name_from_declaration(declaration) == expected_result
 
 
+def test_get_completed_lots_makes_one_request():
+    data_api_client = mock.Mock()
+    data_api_client.find_draft_services_by_framework_iter.return_value = iter([
+        {'id': 1, 'lotSlug': 'cloud-support', 'status': 'submitted'},
+        {'id': 4, 'lotSlug': 'cloud-support', 'status': 'submitted'},
+    ])
+    lots = [
+        {'slug': 'cloud-hosting', 'name': 'Cloud hosting'},
+        {'slug': 'cloud-software', 'name': 'Cloud software'},
+        {'slug': 'cloud-support', 'name': 'Cloud support'},
+    ]
+
+    assert get_completed_lots(data_api_client, lots, 'g-cloud-12', 1234) == ["Lot 3: Cloud support"]
+    assert data_api_client.find_draft_services_by_framework_iter.call_args_list == [
+        mock.call('g-cloud-12', status='submitted', supplier_id=1234)
+    ]
+
+
 class CustomAbortException(Exception):
     """Custom error for testing abort"""
     pass
@@ -648,6 +667,17 @@ class TestGetFrameworkOr500():
 
         assert get_framework_or_500(data_api_client_mock, 'g-cloud-10')['slug'] == 'g-cloud-10'
 
+    @mock.patch('app.main.helpers.frameworks.content_loader')
+    def test_tells_content_loader_the_framework_status(self, content_loader):
+        data_api_client_mock = mock.Mock()
+        data_api_client_mock.get_framework.return_value = FrameworkStub(
+            slug='g-cloud-7', status='expired'
+        ).single_result_response()
+
+        get_framework_or_500(data_api_client_mock, 'g-cloud-7')
+
+        assert content_loader.set_framework_status.call_args_list == [mock.call('g-cloud-7', 'expired')]
+
     @mock.patch('app.main.helpers.frameworks.abort')
     def test_aborts_with_500_if_framework_not_found(self, abort):
         data_api_client_mock = mock.Mock()
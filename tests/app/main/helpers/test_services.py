@@ -1,9 +1,16 @@
+import threading
+from io import BytesIO
+
 import mock
 import pytest
+from flask import Flask
+from werkzeug.datastructures import FileStorage
 
 from dmtestutils.api_model_stubs import SupplierFrameworkStub
 
-from app.main.helpers.services import copy_service_from_previous_framework
+from app.main.helpers.services import (
+    DraftIndex, copy_service_from_previous_framework, get_draft_index, upload_documents,
+)
 
 
 class CustomAbortException(Exception):
@@ -138,3 +145,143 @@ class TestCopyServiceFromPreviousFramework():
             )
 
         self.assert_404_and_no_copy(assertion_error='Service being copied must belong to the current users supplier')
+
+
+class TestDraftIndex:
+
+    drafts = [
+        {'id': 1, 'lotSlug': 'cloud-hosting', 'status': 'not-submitted'},
+        {'id': 2, 'lotSlug': 'cloud-software', 'status': 'submitted'},
+        {'id': 3, 'lotSlug': 'cloud-hosting', 'status': 'failed'},
+        {'id': 4, 'lotSlug': 'cloud-hosting', 'status': 'not-submitted'},
+        {'id': 5, 'lotSlug': 'cloud-support', 'status': 'submitted'},
+        {'id': 6, 'lotSlug': 'cloud-support', 'status': 'published'},
+    ]
+
+    def ids(self, drafts):
+        return [draft['id'] for draft in drafts]
+
+    def test_drafts_are_partitioned_by_status(self):
+        draft_index = DraftIndex(iter(self.drafts))
+
+        assert self.ids(draft_index.drafts) == [1, 4]
+        assert self.ids(draft_index.complete_drafts) == [2, 3, 5]
+
+    def test_lot(self):
+        draft_index = DraftIndex(iter(self.drafts))
+
+        drafts, complete_drafts = draft_index.lot('cloud-hosting')
+        assert self.ids(drafts) == [1, 4]
+        assert self.ids(complete_drafts) == [3]
+        assert draft_index.lot('cloud-support') == ([], [self.drafts[4]])
+        assert draft_index.lot('digital-specialists') == ([], [])
+
+    def test_counts(self):
+        draft_index = DraftIndex(iter(self.drafts))
+
+        assert draft_index.draft_count('cloud-hosting') == 2
+        assert draft_index.complete_count('cloud-hosting') == 1
+        assert draft_index.draft_count('cloud-software') == 0
+        assert draft_index.complete_count('cloud-software') == 1
+        assert draft_index.draft_count('digital-specialists') == 0
+        assert draft_index.complete_count('digital-specialists') == 0
+        assert 'digital-specialists' not in draft_index._lots
+
+    def test_get_draft_index(self):
+        data_api_client = mock.Mock()
+        data_api_client.find_draft_services_iter.return_value = iter(self.drafts)
+
+        with mock.patch('app.main.helpers.services.current_user', supplier_id=1234):
+            draft_index = get_draft_index(data_api_client, 'g-cloud-12')
+
+        assert data_api_client.find_draft_services_iter.call_args_list == [mock.call(1234, framework='g-cloud-12')]
+        assert self.ids(draft_index.drafts) == [1, 4]
+
+
+class TestUploadDocuments:
+
+    def setup_method(self):
+        self.app = Flask(__name__)
+        self.app.config['DM_CONCURRENT_UPLOADS_MAX_WORKERS'] = 2
+        self.app.config['DM_SUBMISSIONS_BUCKET'] = 'submissions-bucket'
+
+        self.get_bucket_patch = mock.patch('app.main.helpers.services.get_bucket')
+        self.get_bucket = self.get_bucket_patch.start()
+        self.upload_document_patch = mock.patch('app.main.helpers.services.upload_document')
+        self.upload_document = self.upload_document_patch.start()
+        self.upload_document.side_effect = self.uploaded_url
+
+        self.section = mock.Mock()
+        self.section.get_question_ids.return_value = ['pricingDocumentURL', 'sfiaRateDocumentURL']
+        self.service = {'frameworkSlug': 'g-cloud-12', 'supplierId': 1234, 'id': 1}
+
+    def teardown_method(self):
+        self.get_bucket_patch.stop()
+        self.upload_document_patch.stop()
+
+    @staticmethod
+    def uploaded_url(uploader, upload_type, documents_url, service, field, file_contents, public):
+        return '{}{}'.format(documents_url, field)
+
+    @staticmethod
+    def pdf(filename='document.pdf'):
+        return FileStorage(BytesIO(b'%PDF-1.4\n' + b'0' * 200), filename)
+
+    def upload_documents(self, request_files):
+        with self.app.test_request_context():
+            return upload_documents(
+                'DM_SUBMISSIONS_BUCKET', 'submissions', 'https://assets.example.com/', self.service, request_files,
+                self.section, public=False,
+            )
+
+    def test_documents_are_uploaded_at_the_same_time(self):
+        barrier = threading.Barrier(2, timeout=5)
+        threads = []
+        upload_document = self.upload_document.side_effect
+
+        def wait_for_each_other(*args, **kwargs):
+            # each upload waits for the other, so this would time out if they were made in turn
+            barrier.wait()
+            threads.append(threading.current_thread().name)
+            return upload_document(*args, **kwargs)
+        self.upload_document.side_effect = wait_for_each_other
+
+        assert self.upload_documents({
+            'pricingDocumentURL': self.pdf(), 'sfiaRateDocumentURL': self.pdf(), 'otherField': self.pdf(),
+        }) == ({
+            'pricingDocumentURL': 'https://assets.example.com/pricingDocumentURL',
+            'sfiaRateDocumentURL': 'https://assets.example.com/sfiaRateDocumentURL',
+        }, {})
+
+        assert self.get_bucket.call_args_list == [mock.call('DM_SUBMISSIONS_BUCKET')] * 2
+        assert sorted(call[0][4] for call in self.upload_document.call_args_list) == [
+            'pricingDocumentURL', 'sfiaRateDocumentURL',
+        ]
+        assert all(call[1] == {'public': False} for call in self.upload_document.call_args_list)
+        assert all(thread.startswith('concurrent-uploads') for thread in threads)
+
+    def test_failed_uploads_are_errors(self):
+        self.upload_document.side_effect = lambda *args, **kwargs: (
+            False if args[4] == 'sfiaRateDocumentURL' else self.uploaded_url(*args, **kwargs)
+        )
+
+        uploaded_documents, errors = self.upload_documents({
+            'pricingDocumentURL': self.pdf(), 'sfiaRateDocumentURL': self.pdf(),
+        })
+
+        assert uploaded_documents['pricingDocumentURL'] == 'https://assets.example.com/pricingDocumentURL'
+        assert errors == {'sfiaRateDocumentURL': 'file_can_be_saved'}
+
+    def test_invalid_documents_are_not_uploaded(self):
+        assert self.upload_documents({
+            'pricingDocumentURL': self.pdf('document.docx'), 'sfiaRateDocumentURL': self.pdf(),
+        }) == (None, {'pricingDocumentURL': 'file_is_open_document_format'})
+
+        assert not self.upload_document.called
+
+    def test_empty_documents_are_ignored(self):
+        assert self.upload_documents({
+            'pricingDocumentURL': FileStorage(BytesIO(b''), ''),
+        }) == ({}, {})
+
+        assert not self.upload_document.called
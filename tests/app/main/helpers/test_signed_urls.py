@@ -0,0 +1,73 @@
+import mock
+import pytest
+
+from app.main.helpers.signed_urls import SignedURLCache, with_base_url
+
+
+@pytest.fixture
+def bucket():
+    bucket = mock.Mock(bucket_name='submissions-bucket')
+    bucket.get_signed_url.return_value = 'https://s3.example.com/g-cloud-12/document.pdf?signature=1'
+    return bucket
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('app.main.helpers.signed_urls.time.monotonic') as monotonic:
+        monotonic.return_value = 1000
+        yield monotonic
+
+
+class TestSignedURLCache:
+
+    def test_urls_are_reused_until_the_margin_before_they_expire(self, bucket, monotonic):
+        cache = SignedURLCache(maxsize=10, expires_in=30, margin=10)
+
+        assert cache.get(bucket, 'g-cloud-12/document.pdf', 1234) == bucket.get_signed_url.return_value
+        monotonic.return_value = 1019
+        assert cache.get(bucket, 'g-cloud-12/document.pdf', 1234) == bucket.get_signed_url.return_value
+        assert bucket.get_signed_url.call_args_list == [mock.call('g-cloud-12/document.pdf', expires_in=30)]
+
+        monotonic.return_value = 1020
+        cache.get(bucket, 'g-cloud-12/document.pdf', 1234)
+        assert bucket.get_signed_url.call_count == 2
+
+    @pytest.mark.parametrize('bucket_name, path, supplier_id', (
+        ('documents-bucket', 'g-cloud-12/document.pdf', 1234),
+        ('submissions-bucket', 'g-cloud-12/other-document.pdf', 1234),
+        ('submissions-bucket', 'g-cloud-12/document.pdf', 5678),
+    ))
+    def test_urls_are_signed_for_each_bucket_path_and_supplier(self, bucket, monotonic, bucket_name, path, supplier_id):
+        cache = SignedURLCache(maxsize=10, expires_in=30, margin=10)
+        cache.get(bucket, 'g-cloud-12/document.pdf', 1234)
+
+        bucket.bucket_name = bucket_name
+        cache.get(bucket, path, supplier_id)
+
+        assert bucket.get_signed_url.call_count == 2
+
+    def test_missing_documents_are_not_remembered(self, bucket, monotonic):
+        bucket.get_signed_url.return_value = None
+        cache = SignedURLCache(maxsize=10, expires_in=30, margin=10)
+
+        assert cache.get(bucket, 'g-cloud-12/document.pdf', 1234) is None
+        assert cache.get(bucket, 'g-cloud-12/document.pdf', 1234) is None
+        assert bucket.get_signed_url.call_count == 2
+
+    def test_urls_are_not_reused_without_enough_time_left(self, bucket, monotonic):
+        cache = SignedURLCache(maxsize=10, expires_in=30, margin=30)
+
+        cache.get(bucket, 'g-cloud-12/document.pdf', 1234)
+        cache.get(bucket, 'g-cloud-12/document.pdf', 1234)
+
+        assert bucket.get_signed_url.call_count == 2
+        assert len(cache.urls) == 0
+
+
+@pytest.mark.parametrize('base_url, expected', (
+    ('https://assets.example.com', 'https://assets.example.com/document.pdf?signature=1'),
+    ('http://asset-host', 'http://asset-host/document.pdf?signature=1'),
+    (None, 'https://s3.example.com/document.pdf?signature=1'),
+))
+def test_with_base_url(base_url, expected):
+    assert with_base_url('https://s3.example.com/document.pdf?signature=1', base_url) == expected
@@ -0,0 +1,152 @@
+import mock
+import pytest
+from redis import RedisError
+
+from app.main.helpers.summaries import DraftSummary, DraftSummaryCache
+
+
+@pytest.fixture
+def count_unanswered_questions():
+    with mock.patch('app.main.helpers.summaries.count_unanswered_questions') as count_unanswered_questions:
+        count_unanswered_questions.return_value = (3, 1)
+        yield count_unanswered_questions
+
+
+@pytest.fixture
+def manifest():
+    manifest = mock.Mock(
+        cache_key=('g-cloud-99', 1, 'edit_submission', ()), content_key=('g-cloud-99', 'abc123', 'edit_submission', ())
+    )
+    manifest.summary.return_value = mock.sentinel.sections
+    return manifest
+
+
+@pytest.fixture
+def draft():
+    return {'id': 1, 'updatedAt': '2020-06-01T12:00:00.000000Z', 'serviceName': 'My service'}
+
+
+class TestDraftSummaryCache:
+
+    def test_summarise(self, count_unanswered_questions, manifest, draft):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+
+        assert cache.summarise(manifest, draft) == DraftSummary(mock.sentinel.sections, 3, 1)
+        assert manifest.summary.call_args_list == [mock.call(draft)]
+        assert count_unanswered_questions.call_args_list == [mock.call(mock.sentinel.sections)]
+
+    def test_unchanged_drafts_are_only_summarised_once(self, count_unanswered_questions, manifest, draft):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+
+        cache.summarise(manifest, draft)
+        assert cache.summarise(manifest, dict(draft)) == DraftSummary(mock.sentinel.sections, 3, 1)
+        assert cache.count_unanswered(manifest, dict(draft)) == (3, 1)
+
+        assert manifest.summary.call_count == 1
+
+    @pytest.mark.parametrize('change', (
+        {'updatedAt': '2020-06-02T12:00:00.000000Z'},
+        {'id': 2},
+    ))
+    def test_changed_drafts_are_summarised_again(self, count_unanswered_questions, manifest, draft, change):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+
+        cache.count_unanswered(manifest, draft)
+        cache.count_unanswered(manifest, dict(draft, **change))
+
+        assert manifest.summary.call_count == 2
+
+    def test_new_manifest_versions_are_summarised_again(self, count_unanswered_questions, manifest, draft):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+        reloaded_manifest = mock.Mock(cache_key=('g-cloud-99', 2, 'edit_submission', ()), content_key=None)
+
+        cache.count_unanswered(manifest, draft)
+        cache.count_unanswered(reloaded_manifest, draft)
+
+        assert manifest.summary.call_count == 1
+        assert reloaded_manifest.summary.call_count == 1
+
+    @pytest.mark.parametrize('manifest_cache_key, draft_change', (
+        (None, {}),
+        (('g-cloud-99', 1, 'edit_submission', ()), {'updatedAt': None}),
+    ))
+    def test_uncacheable_drafts_are_always_summarised(
+        self, count_unanswered_questions, draft, manifest_cache_key, draft_change
+    ):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+        manifest = mock.Mock(cache_key=manifest_cache_key, content_key=None)
+        draft.update(draft_change)
+
+        cache.summarise(manifest, draft)
+        cache.count_unanswered(manifest, draft)
+
+        assert manifest.summary.call_count == 2
+        assert len(cache.summaries) == len(cache.counts) == 0
+
+    def test_counting_does_not_cache_whole_summaries(self, count_unanswered_questions, manifest, draft):
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10)
+
+        assert cache.count_unanswered(manifest, draft) == (3, 1)
+
+        assert len(cache.summaries) == 0
+        assert len(cache.counts) == 1
+
+    def test_counts_are_shared_through_redis(self, count_unanswered_questions, manifest, draft):
+        redis_client = mock.Mock()
+        redis_client.get.return_value = None
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10, redis_client=redis_client, redis_ttl=60)
+
+        cache.count_unanswered(manifest, draft)
+
+        (redis_key, value), kwargs = redis_client.set.call_args
+        assert redis_key.startswith('draft-summary:')
+        assert value == '3:1'
+        assert kwargs == {'ex': 60}
+
+        other_worker_cache = DraftSummaryCache(maxsize=10, counts_maxsize=10, redis_client=redis_client)
+        redis_client.get.return_value = b'3:1'
+
+        assert other_worker_cache.count_unanswered(manifest, draft) == (3, 1)
+        assert redis_client.get.call_args == mock.call(redis_key)
+        assert manifest.summary.call_count == 1
+
+    def test_shared_counts_are_keyed_on_the_content_not_its_version(self, count_unanswered_questions, manifest, draft):
+        redis_client = mock.Mock()
+        redis_client.get.return_value = None
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10, redis_client=redis_client)
+        # the same content, loaded by a worker which has reloaded it once more
+        other_workers_manifest = mock.Mock(
+            cache_key=('g-cloud-99', 2, 'edit_submission', ()), content_key=manifest.content_key
+        )
+        edited_manifest = mock.Mock(
+            cache_key=('g-cloud-99', 3, 'edit_submission', ()),
+            content_key=('g-cloud-99', 'def456', 'edit_submission', ()),
+        )
+
+        cache.count_unanswered(manifest, draft)
+        cache.count_unanswered(other_workers_manifest, draft)
+        cache.count_unanswered(edited_manifest, draft)
+
+        first_key, other_workers_key, edited_key = [call[0][0] for call in redis_client.get.call_args_list]
+        assert other_workers_key == first_key
+        assert edited_key != first_key
+
+    def test_manifests_without_a_content_key_are_not_shared(self, count_unanswered_questions, manifest, draft):
+        redis_client = mock.Mock()
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10, redis_client=redis_client)
+        manifest.content_key = None
+
+        assert cache.count_unanswered(manifest, draft) == (3, 1)
+        assert cache.summarise(manifest, dict(draft, updatedAt='2020-06-02T12:00:00.000000Z')).unanswered_required == 3
+
+        assert redis_client.get.call_count == redis_client.set.call_count == 0
+
+    def test_redis_errors_are_ignored(self, count_unanswered_questions, manifest, draft):
+        redis_client = mock.Mock()
+        redis_client.get.side_effect = RedisError()
+        redis_client.set.side_effect = RedisError()
+        cache = DraftSummaryCache(maxsize=10, counts_maxsize=10, redis_client=redis_client)
+
+        assert cache.count_unanswered(manifest, draft) == (3, 1)
+        assert cache.count_unanswered(manifest, draft) == (3, 1)
+        assert manifest.summary.call_count == 1
@@ -1917,7 +1917,7 @@ class TestFrameworkAgreementDocumentDownload(BaseApplicationTest):
 
         assert res.status_code == 302
         assert res.location == 'http://asset-host/path?param=value'
-        uploader.get_signed_url.assert_called_with('g-cloud-7/agreements/1234/1234-example.pdf')
+        uploader.get_signed_url.assert_called_with('g-cloud-7/agreements/1234/1234-example.pdf', expires_in=30)
 
     def test_download_document_with_asset_url(self, S3):
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework()
@@ -1933,7 +1933,7 @@ class TestFrameworkAgreementDocumentDownload(BaseApplicationTest):
 
         assert res.status_code == 302
         assert res.location == 'https://example/path?param=value'
-        uploader.get_signed_url.assert_called_with('g-cloud-7/agreements/1234/1234-example.pdf')
+        uploader.get_signed_url.assert_called_with('g-cloud-7/agreements/1234/1234-example.pdf', expires_in=30)
 
 
 @mock.patch('dmutils.s3.S3')
@@ -1949,7 +1949,7 @@ class TestFrameworkDocumentDownload(BaseApplicationTest):
 
         assert res.status_code == 302
         assert res.location == 'http://asset-host/path?param=value'
-        uploader.get_signed_url.assert_called_with('g-cloud-7/communications/example.pdf')
+        uploader.get_signed_url.assert_called_with('g-cloud-7/communications/example.pdf', expires_in=30)
 
     def test_download_document_returns_404_if_url_is_None(self, S3):
         uploader = mock.Mock()
@@ -3847,7 +3847,7 @@ class TestSendClarificationQuestionEmail(BaseApplicationTest):
         assert response.status_code == 200
 
 
-@mock.patch('app.main.views.frameworks.count_unanswered_questions')
+@mock.patch('app.main.helpers.summaries.count_unanswered_questions')
 class TestFrameworkSubmissionLots(BaseApplicationTest, MockEnsureApplicationCompanyDetailsHaveBeenConfirmedMixin):
 
     def setup_method(self, method):
@@ -4049,7 +4049,7 @@ class TestFrameworkSubmissionLots(BaseApplicationTest, MockEnsureApplicationComp
         assert u'Apply to provide' not in submissions.get_data(as_text=True)
 
 
-@mock.patch('app.main.views.frameworks.count_unanswered_questions')
+@mock.patch('app.main.helpers.summaries.count_unanswered_questions')
 class TestG12RecoveryDraftServices(BaseApplicationTest, MockEnsureApplicationCompanyDetailsHaveBeenConfirmedMixin):
 
     def setup_method(self, method):
@@ -4131,7 +4131,7 @@ class TestG12RecoveryDraftServices(BaseApplicationTest, MockEnsureApplicationCom
         assert "Your application is not complete" not in raw_html
 
 
-@mock.patch('app.main.views.frameworks.count_unanswered_questions')
+@mock.patch('app.main.helpers.summaries.count_unanswered_questions')
 class TestFrameworkSubmissionServices(BaseApplicationTest, MockEnsureApplicationCompanyDetailsHaveBeenConfirmedMixin):
 
     def setup_method(self, method):
@@ -5010,6 +5010,14 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
         self.data_api_client_patch.stop()
         super().teardown_method(method)
 
+    @staticmethod
+    def submitted_drafts():
+        return [
+            {'id': 1, 'lotSlug': 'cloud-hosting', 'status': 'submitted'},
+            {'id': 2, 'lotSlug': 'cloud-software', 'status': 'submitted'},
+            {'id': 3, 'lotSlug': 'cloud-support', 'status': 'submitted'},
+        ]
+
     @pytest.mark.parametrize(
         ('is_e_signature_supported', 'on_framework', 'status_code'),
         (
@@ -5025,9 +5033,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
             slug='g-cloud-12',
             framework_agreement_version="1",
             is_e_signature_supported=is_e_signature_supported)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(
             on_framework=on_framework)
 
@@ -5050,9 +5056,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
                                                                          slug='g-cloud-12',
                                                                          framework_agreement_version="1",
                                                                          is_e_signature_supported=True)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(
             on_framework=True)
         self.login()
@@ -5066,9 +5070,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
                                                                          slug='g-cloud-12',
                                                                          framework_agreement_version="1",
                                                                          is_e_signature_supported=True)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(
             on_framework=True)
 
@@ -5083,9 +5085,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
         self.data_api_client.create_framework_agreement.return_value = {"agreement": {"id": 789}}
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(
             on_framework=True)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_framework.return_value = self.framework(status='standstill',
                                                                          slug='g-cloud-12',
                                                                          framework_agreement_version="1",
@@ -5127,9 +5127,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
         self.data_api_client.create_framework_agreement.return_value = {"agreement": {"id": 789}}
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(
             on_framework=True)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_framework.return_value = self.framework(status='standstill',
                                                                          slug='g-cloud-12',
                                                                          framework_agreement_version="1",
@@ -5150,9 +5148,7 @@ class TestSignFrameworkAgreement(BaseApplicationTest):
                                                                          slug='g-cloud-12',
                                                                          framework_agreement_version="1",
                                                                          is_e_signature_supported=True)
-        self.data_api_client.find_draft_services_by_framework.return_value = {
-            'meta': {'total': 1}
-        }
+        self.data_api_client.find_draft_services_by_framework_iter.return_value = self.submitted_drafts()
         self.data_api_client.get_supplier_framework_info.return_value = self.supplier_framework(on_framework=True)
 
         self.data_api_client.get_supplier.return_value = {'suppliers': {'registeredName': 'Acme Company',
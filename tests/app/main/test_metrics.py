@@ -56,3 +56,17 @@ class TestMetricsPageRegistersPageViews(BaseApplicationTest):
 
         assert expected_metric_name in results
         assert metric_value - initial_metric_value == 3
+
+
+class TestMetricsPageRegistersContentMetrics(BaseApplicationTest):
+
+    def test_metrics_page_includes_content_loader_metrics(self):
+        res = self.client.get('/suppliers/create/start')
+        assert res.status_code == 200
+
+        metrics_response = self.client.get('/suppliers/_metrics')
+        results = load_prometheus_metrics(metrics_response.data)
+
+        assert b'content_loader_tier_frameworks{tier="pinned"}' in results
+        assert b'content_loader_tier_bytes{tier="expired"}' in results
+        assert b'content_loader_framework_bytes{framework="g-cloud-12"}' in results
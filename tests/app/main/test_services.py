@@ -505,7 +505,7 @@ class TestG12RecoveryListServices(BaseApplicationTest):
 
         assert "74 unanswered questions" in draft_services_table.text_content()
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_draft_services_table_shows_when_service_can_be_marked_as_complete(
         self, count_unanswered_questions, g12_recovery_supplier_id
     ):
@@ -2432,7 +2432,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
         service_price_xpath = service_price_row_xpath + '/td[@class="summary-item-field"]/span/text()'
         assert document.xpath(service_price_xpath)[0].strip() == u"£12.50 to £15 a person a second"
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_unanswered_questions_count(self, count_unanswered):
         self.data_api_client.get_framework.return_value = self.framework(status='open')
         self.data_api_client.get_draft_service.return_value = self.draft_service
@@ -2442,7 +2442,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
         assert u'3 unanswered questions' in res.get_data(as_text=True), \
             "'3 unanswered questions' not found in html"
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_move_to_complete_button(self, count_unanswered):
         self.data_api_client.get_framework.return_value = self.framework(status='open')
         self.data_api_client.get_draft_service.return_value = self.draft_service
@@ -2454,7 +2454,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
         doc = html.fromstring(res.get_data(as_text=True))
         assert doc.xpath("//form//button[normalize-space(string())=$t]", t="Mark as complete")
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_no_move_to_complete_button_if_not_open(self, count_unanswered):
         self.data_api_client.get_framework.return_value = self.framework(status='other')
         self.data_api_client.get_draft_service.return_value = self.draft_service
@@ -2464,7 +2464,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
         doc = html.fromstring(res.get_data(as_text=True))
         assert not doc.xpath("//form//button[normalize-space(string())=$t]", t="Mark as complete")
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_no_move_to_complete_button_if_validation_errors(self, count_unanswered):
         draft_service = copy.deepcopy(self.draft_service)
         draft_service['validationErrors'] = {'_errors': "Everything's busted"}
@@ -2498,7 +2498,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
         assert res.status_code == 200
         assert not doc.xpath("//form//button[normalize-space(string())=$t]", t="Remove draft service")
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_shows_g7_message_if_pending_and_service_is_in_draft(self, count_unanswered):
         self.data_api_client.get_framework.return_value = self.framework(status='pending')
         self.data_api_client.get_draft_service.return_value = self.draft_service
@@ -2516,7 +2516,7 @@ class TestShowDraftService(BaseApplicationTest, MockEnsureApplicationCompanyDeta
             'p[@class="temporary-message-message"]/text()'
         )[0]
 
-    @mock.patch('app.main.views.services.count_unanswered_questions')
+    @mock.patch('app.main.helpers.summaries.count_unanswered_questions')
     def test_shows_g7_message_if_pending_and_service_is_complete(self, count_unanswered):
         self.data_api_client.get_framework.return_value = self.framework(status='pending')
         self.data_api_client.get_draft_service.return_value = self.complete_service
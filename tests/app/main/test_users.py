@@ -177,6 +177,17 @@ class TestPostUsers(BaseApplicationTest):
         assert self.data_api_client.get_user.call_args_list == [mock.call(user_id=4)]
         assert res.status_code == 404
 
+    def test_deactivating_a_user_forgets_their_cached_login(self):
+        self.login()
+
+        self.data_api_client.get_user.return_value = get_users(index=1)
+        self.data_api_client.update_user.return_value = True
+
+        with mock.patch('app.main.views.users.invalidate_user') as invalidate_user:
+            self.client.post('/suppliers/users/1/deactivate')
+
+        assert invalidate_user.call_args_list == [mock.call(1)]
+
     def can_deactivate_a_user(self):
         self.login()
 
@@ -41,3 +41,24 @@ class TestStatus(BaseApplicationTest):
         assert "{}".format(json_data['status']) == "error"
         assert "{}".format(json_data['api_status']['status']) == "error"
         assert "Error connecting to" in "{}".format(json_data['message'])
+
+    @mock.patch('app.status.views.content_loader')
+    @mock.patch('app.status.views.data_api_client')
+    def test_status_includes_content_versions(self, data_api_client, content_loader):
+        content_loader.framework_versions = {'g-cloud-12': 2, 'digital-outcomes-and-specialists-5': 1}
+        content_loader.tier_stats.return_value = {
+            'pinned': {'frameworks': ['g-cloud-12'], 'bytes': 1000},
+            'expired': {'frameworks': ['digital-outcomes-and-specialists-5'], 'bytes': 500},
+        }
+
+        status_response = self.client.get('/suppliers/_status?ignore-dependencies')
+        assert status_response.status_code == 200
+
+        json_data = json.loads(status_response.get_data().decode('utf-8'))
+        assert json_data['content'] == {
+            'framework_versions': {'g-cloud-12': 2, 'digital-outcomes-and-specialists-5': 1},
+            'tiers': {
+                'pinned': {'frameworks': ['g-cloud-12'], 'bytes': 1000},
+                'expired': {'frameworks': ['digital-outcomes-and-specialists-5'], 'bytes': 500},
+            },
+        }
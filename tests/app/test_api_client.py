@@ -0,0 +1,427 @@
+import threading
+import time
+
+import mock
+import pytest
+from flask import Flask
+
+from dmapiclient import HTTPError
+
+from app.api_client import DataAPIClient, _endpoint, data_api_responses_are_stale
+from app.circuit_breaker import OPEN
+from config import Config
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update({key: getattr(Config, key) for key in dir(Config) if key.startswith('DM_HTTP_')})
+    return app
+
+
+@pytest.fixture
+def base_request():
+    with mock.patch('dmapiclient.base.BaseAPIClient._request', autospec=True) as base_request:
+        base_request.side_effect = lambda self, method, url, data=None, params=None, **kwargs: {
+            'method': method, 'url': url, 'params': params,
+        }
+        yield base_request
+
+
+@pytest.fixture
+def data_api_client():
+    return DataAPIClient('http://localhost', 'token')
+
+
+class TestDataAPIClient:
+
+    def test_gets_are_only_made_once_per_app_context(self, app, base_request, data_api_client):
+        with app.app_context():
+            assert data_api_client.get_framework('g-cloud-12') == data_api_client.get_framework('g-cloud-12')
+            data_api_client.get_supplier(1234)
+            data_api_client.get_supplier(1234)
+
+        assert base_request.call_count == 2
+
+        with app.app_context():
+            data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 3
+
+    def test_different_params_are_fetched_separately(self, app, base_request, data_api_client):
+        with app.app_context():
+            data_api_client.find_draft_services(supplier_id=1234, framework='g-cloud-12')
+            data_api_client.find_draft_services(supplier_id=1234, framework='g-cloud-11')
+
+        assert base_request.call_count == 2
+
+    def test_callers_can_modify_responses(self, app, base_request, data_api_client):
+        with app.app_context():
+            data_api_client.get_framework('g-cloud-12')['url'] = 'changed'
+
+            assert data_api_client.get_framework('g-cloud-12')['url'] != 'changed'
+
+    def test_writes_forget_remembered_responses(self, app, base_request, data_api_client):
+        with app.app_context():
+            data_api_client.get_framework('g-cloud-12')
+            data_api_client.update_supplier(1234, {'name': 'New name'}, 'user@example.com')
+            data_api_client.get_framework('g-cloud-12')
+
+        assert [call[0][1] for call in base_request.call_args_list] == ['GET', 'POST', 'GET']
+
+    def test_errors_are_not_remembered(self, app, base_request, data_api_client):
+        base_request.side_effect = HTTPError(mock.Mock(status_code=503))
+
+        with app.app_context():
+            for _ in range(2):
+                with pytest.raises(HTTPError):
+                    data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 2
+
+    def test_gets_outside_an_app_context_are_not_remembered(self, base_request, data_api_client):
+        data_api_client.get_framework('g-cloud-12')
+        data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 2
+
+    def test_concurrent_identical_gets_share_one_request(self, app, base_request, data_api_client):
+        started, release = threading.Event(), threading.Event()
+        responses = []
+
+        def slow_request(self, method, url, data=None, params=None, **kwargs):
+            started.set()
+            assert release.wait(5)
+            return {'url': url}
+
+        def get_framework():
+            with app.app_context():
+                responses.append(data_api_client.get_framework('g-cloud-12'))
+
+        base_request.side_effect = slow_request
+        threads = [threading.Thread(target=get_framework) for _ in range(3)]
+        threads[0].start()
+        assert started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        with mock.patch('app.api_client.DATA_API_COALESCED_REQUESTS') as coalesced_requests:
+            while data_api_client.single_flight.stats()['coalesced'] < 2:
+                release.wait(0.01)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert base_request.call_count == 1
+        assert responses == [{'url': '/frameworks/g-cloud-12'}] * 3
+        assert responses[0] is not responses[1]
+        assert coalesced_requests.labels.call_args_list == [mock.call('/frameworks/g-cloud-12')] * 2
+
+    @pytest.mark.parametrize('url, endpoint', (
+        ('http://localhost/frameworks/g-cloud-12', '/frameworks/g-cloud-12'),
+        ('http://localhost/suppliers/1234/frameworks/g-cloud-12', '/suppliers/:id/frameworks/g-cloud-12'),
+        ('http://localhost/draft-services/5678?page=2', '/draft-services/:id'),
+        ('http://localhost/users?supplier_id=1234', '/users'),
+    ))
+    def test_endpoint(self, url, endpoint):
+        assert _endpoint(url) == endpoint
+
+
+class TestFrameworkCache:
+
+    @pytest.fixture
+    def data_api_client(self, app):
+        app.config.update({
+            'DM_DATA_API_URL': 'http://localhost',
+            'DM_DATA_API_AUTH_TOKEN': 'token',
+            'DM_FRAMEWORK_CACHE_TTL': 60,
+            'DM_FRAMEWORK_CACHE_MAX_AGE': 3600,
+            'DM_DATA_API_FALLBACK_CACHE_SIZE': 0,
+            'DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD': 0,
+        })
+        data_api_client = DataAPIClient()
+        data_api_client.init_app(app)
+        return data_api_client
+
+    def test_frameworks_are_cached_between_requests(self, app, base_request, data_api_client):
+        for _ in range(2):
+            with app.app_context():
+                data_api_client.find_frameworks()
+                data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 2
+        assert data_api_client.framework_cache.stats()['hits'] == 2
+
+    def test_callers_can_modify_cached_frameworks(self, base_request, data_api_client):
+        data_api_client.get_framework('g-cloud-12')['url'] = 'changed'
+
+        assert data_api_client.get_framework('g-cloud-12')['url'] != 'changed'
+
+    def test_purge_framework_cache(self, base_request, data_api_client):
+        data_api_client.find_frameworks()
+        data_api_client.get_framework('g-cloud-11')
+        data_api_client.get_framework('g-cloud-12')
+
+        data_api_client.purge_framework_cache('g-cloud-12')
+        data_api_client.find_frameworks()
+        data_api_client.get_framework('g-cloud-11')
+        data_api_client.get_framework('g-cloud-12')
+
+        assert [call[0][2] for call in base_request.call_args_list] == [
+            '/frameworks', '/frameworks/g-cloud-11', '/frameworks/g-cloud-12', '/frameworks', '/frameworks/g-cloud-12',
+        ]
+
+    def test_framework_writes_purge_the_cache(self, base_request, data_api_client):
+        data_api_client.get_framework('g-cloud-12')
+        data_api_client.update_framework('g-cloud-12', {'status': 'live'}, 'user@example.com')
+        data_api_client.get_framework('g-cloud-12')
+
+        assert [call[0][1] for call in base_request.call_args_list] == ['GET', 'POST', 'GET']
+
+    def test_frameworks_are_not_cached_if_disabled(self, app, base_request, data_api_client):
+        app.config['DM_FRAMEWORK_CACHE_TTL'] = 0
+        data_api_client.init_app(app)
+
+        data_api_client.get_framework('g-cloud-12')
+        data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 2
+
+
+class TestFallbackCache:
+
+    @pytest.fixture
+    def data_api_client(self, app):
+        app.config.update({
+            'DM_DATA_API_URL': 'http://localhost',
+            'DM_DATA_API_AUTH_TOKEN': 'token',
+            'DM_FRAMEWORK_CACHE_TTL': 0,
+            'DM_DATA_API_FALLBACK_CACHE_SIZE': 10,
+            'DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD': 2,
+            'DM_DATA_API_CIRCUIT_BREAKER_RESET': 30,
+        })
+        data_api_client = DataAPIClient()
+        data_api_client.init_app(app)
+        return data_api_client
+
+    @pytest.fixture(autouse=True)
+    def circuit_breaker_open(self):
+        with mock.patch('app.api_client.DATA_API_CIRCUIT_BREAKER_OPEN') as circuit_breaker_open:
+            yield circuit_breaker_open
+
+    def test_last_good_response_is_used_if_the_api_is_unavailable(self, app, base_request, data_api_client):
+        with app.app_context():
+            assert data_api_client.get_supplier(1234) == {'method': 'GET', 'url': '/suppliers/1234', 'params': None}
+            assert not data_api_responses_are_stale()
+
+        base_request.side_effect = HTTPError(mock.Mock(status_code=504))
+        with app.app_context():
+            assert data_api_client.get_supplier(1234) == {'method': 'GET', 'url': '/suppliers/1234', 'params': None}
+            assert data_api_responses_are_stale()
+
+    def test_client_errors_are_raised(self, app, base_request, data_api_client):
+        with app.app_context():
+            data_api_client.get_supplier(1234)
+
+        base_request.side_effect = HTTPError(mock.Mock(status_code=404))
+        with app.app_context():
+            with pytest.raises(HTTPError):
+                data_api_client.get_supplier(1234)
+
+    def test_errors_are_raised_without_a_good_response(self, app, base_request, data_api_client):
+        base_request.side_effect = HTTPError(mock.Mock(status_code=503))
+
+        with app.app_context():
+            with pytest.raises(HTTPError):
+                data_api_client.get_supplier(1234)
+            assert not data_api_responses_are_stale()
+
+    def test_only_selected_endpoints_use_the_last_good_response(self, app, base_request, data_api_client):
+        with app.app_context():
+            data_api_client.get_draft_service(5678)
+
+        base_request.side_effect = HTTPError(mock.Mock(status_code=503))
+        with app.app_context():
+            with pytest.raises(HTTPError):
+                data_api_client.get_draft_service(5678)
+
+    def test_circuit_breaker_stops_requests_to_a_failing_api(
+        self, app, base_request, data_api_client, circuit_breaker_open
+    ):
+        with app.app_context():
+            data_api_client.get_framework('g-cloud-12')
+
+        base_request.side_effect = HTTPError(mock.Mock(status_code=503))
+        for _ in range(2):
+            with app.app_context():
+                data_api_client.get_framework('g-cloud-12')
+
+        assert base_request.call_count == 3
+        assert circuit_breaker_open.set.call_args_list == [mock.call(True)]
+
+        with app.app_context():
+            assert data_api_client.get_framework('g-cloud-12')['url'] == '/frameworks/g-cloud-12'
+            assert data_api_responses_are_stale()
+            with pytest.raises(HTTPError) as e:
+                data_api_client.get_supplier(1234)
+
+        assert e.value.status_code == 503
+        assert base_request.call_count == 3
+
+    def test_any_error_during_the_half_open_trial_opens_the_circuit_breaker_again(
+        self, app, base_request, data_api_client, circuit_breaker_open
+    ):
+        base_request.side_effect = HTTPError(mock.Mock(status_code=503))
+        for _ in range(2):
+            with pytest.raises(HTTPError):
+                data_api_client.get_draft_service(5678)
+
+        base_request.side_effect = ValueError("Not JSON")
+        with mock.patch('app.circuit_breaker.time.monotonic', return_value=time.monotonic() + 31):
+            with pytest.raises(ValueError):
+                data_api_client.get_draft_service(5678)
+
+            assert data_api_client.circuit_breaker.state == OPEN
+            with pytest.raises(HTTPError):
+                data_api_client.get_draft_service(5678)
+
+        assert base_request.call_count == 3
+        assert circuit_breaker_open.set.call_args_list == [mock.call(True), mock.call(False), mock.call(True)]
+
+
+class TestSupplierCache:
+
+    @pytest.fixture
+    def supplier_cache(self):
+        supplier_cache = mock.Mock()
+        supplier_cache.get.return_value = (None, b'1')
+        return supplier_cache
+
+    @pytest.fixture
+    def data_api_client(self, data_api_client, supplier_cache):
+        data_api_client.supplier_cache = supplier_cache
+        return data_api_client
+
+    @pytest.fixture(autouse=True)
+    def supplier_cache_lookups(self):
+        with mock.patch('app.api_client.SUPPLIER_CACHE_LOOKUPS') as supplier_cache_lookups:
+            yield supplier_cache_lookups
+
+    def test_supplier_reads_are_cached(self, base_request, data_api_client, supplier_cache):
+        response = data_api_client.get_supplier(1234)
+
+        assert supplier_cache.get.call_args_list == [mock.call(1234, 'http://localhost/suppliers/1234')]
+        assert supplier_cache.set.call_args_list == [
+            mock.call(1234, 'http://localhost/suppliers/1234', response, b'1')
+        ]
+
+    def test_cached_supplier_reads_are_used(self, base_request, data_api_client, supplier_cache):
+        supplier_cache.get.return_value = ({'suppliers': {'id': 1234}}, b'1')
+
+        assert data_api_client.get_supplier_frameworks(1234) == {'suppliers': {'id': 1234}}
+        assert not base_request.called
+
+    def test_other_reads_are_not_cached(self, base_request, data_api_client, supplier_cache):
+        data_api_client.get_supplier_framework_info(1234, 'g-cloud-12')
+
+        assert not supplier_cache.get.called
+        assert base_request.called
+
+    def test_supplier_writes_invalidate_the_supplier(self, base_request, data_api_client, supplier_cache):
+        data_api_client.update_supplier(1234, {'name': 'New name'}, 'user@example.com')
+
+        assert supplier_cache.invalidate.call_args_list == [mock.call({1234})]
+
+    def test_failed_writes_invalidate_the_supplier(self, base_request, data_api_client, supplier_cache):
+        base_request.side_effect = HTTPError(mock.Mock(status_code=504))
+
+        with pytest.raises(HTTPError):
+            data_api_client.update_contact_information(1234, 1, {'email': 'me@example.com'}, 'user@example.com')
+
+        assert supplier_cache.invalidate.call_args_list == [mock.call({1234})]
+
+    def test_user_writes_invalidate_the_logged_in_users_supplier(
+        self, app, base_request, data_api_client, supplier_cache
+    ):
+        with app.test_request_context(), mock.patch('app.api_client.current_user', supplier_id=1234):
+            data_api_client.update_user(5678, active=False, updater='user@example.com')
+
+        assert supplier_cache.invalidate.call_args_list == [mock.call({1234})]
+
+    @pytest.mark.parametrize('write', (
+        lambda client: client.complete_draft_service(1, 'user@example.com'),
+        lambda client: client.copy_draft_service(1, 'user@example.com'),
+        lambda client: client.delete_draft_service(1, 'user@example.com'),
+        lambda client: client.update_draft_service(1, {'serviceName': 'New name'}, 'user@example.com'),
+        lambda client: client.copy_published_from_framework('g-cloud-12', 'cloud-hosting', 'user@example.com'),
+    ))
+    def test_draft_service_writes_invalidate_the_logged_in_users_supplier(
+        self, app, base_request, data_api_client, supplier_cache, write
+    ):
+        with app.test_request_context(), mock.patch('app.api_client.current_user', supplier_id=1234):
+            write(data_api_client)
+
+        assert supplier_cache.invalidate.call_args_list == [mock.call({1234})]
+
+    def test_draft_counts_are_read_again_after_completing_a_draft(self, app, base_request, data_api_client):
+        data_api_client.supplier_cache = _DictSupplierCache()
+        base_request.side_effect = lambda self, method, url, data=None, params=None, **kwargs: (
+            {'frameworkInterest': [{'completeDraftsCount': base_request.call_count}]}
+        )
+
+        with mock.patch('app.api_client.current_user', supplier_id=1234):
+            with app.test_request_context():
+                before = data_api_client.get_supplier_frameworks(1234)
+            with app.test_request_context():
+                data_api_client.complete_draft_service(1, 'user@example.com')
+            with app.test_request_context():
+                after = data_api_client.get_supplier_frameworks(1234)
+
+        assert before['frameworkInterest'][0]['completeDraftsCount'] == 1
+        assert after['frameworkInterest'][0]['completeDraftsCount'] == 3
+
+
+class _DictSupplierCache:
+    """Just enough of ``SupplierCache`` to cache and invalidate responses in a dict"""
+
+    def __init__(self):
+        self.responses = {}
+
+    def get(self, supplier_id, url):
+        return self.responses.get((supplier_id, url)), b'1'
+
+    def set(self, supplier_id, url, value, generation):
+        self.responses[(supplier_id, url)] = value
+
+    def invalidate(self, supplier_ids):
+        self.responses = {key: value for key, value in self.responses.items() if key[0] not in set(supplier_ids)}
+
+
+class TestConnectionPools:
+
+    @pytest.fixture
+    def data_api_client(self, app):
+        app.config.update({
+            'DM_DATA_API_URL': 'http://localhost',
+            'DM_DATA_API_AUTH_TOKEN': 'token',
+            'DM_FRAMEWORK_CACHE_TTL': 0,
+            'DM_DATA_API_FALLBACK_CACHE_SIZE': 0,
+            'DM_DATA_API_CIRCUIT_BREAKER_THRESHOLD': 0,
+        })
+        data_api_client = DataAPIClient()
+        data_api_client.init_app(app)
+        return data_api_client
+
+    def test_requests_use_the_apps_connection_pools(self, app, data_api_client):
+        assert data_api_client.connection_pools is app.extensions['connection_pools']
+
+        session = data_api_client._requests_retry_session()
+        assert session is data_api_client._requests_retry_session()
+        assert session.get_adapter('http://localhost/') is data_api_client.connection_pools.adapter(
+            retry_read_timeouts=True, retry_statuses=(500, 502, 503, 504),
+        )
+
+    def test_nowait_requests_dont_retry_read_timeouts(self, data_api_client):
+        adapter = data_api_client._requests_retry_session(retry_read_timeouts=False).get_adapter('http://localhost/')
+
+        assert adapter.max_retries.read == 0
+        assert adapter.max_retries.connect == 5
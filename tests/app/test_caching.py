@@ -0,0 +1,236 @@
+import threading
+import time
+
+import mock
+import pytest
+
+from app.caching import LRUCache, SingleFlight, TTLCache, _Refresher
+
+
+class TestLRUCache:
+
+    def test_least_recently_used_item_is_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', mock.sentinel.a)
+        cache.set('b', mock.sentinel.b)
+        cache.get('a')
+
+        cache.set('c', mock.sentinel.c)
+
+        assert cache.get('b') is None
+        assert cache.get('a') is mock.sentinel.a
+        assert cache.get('c') is mock.sentinel.c
+        assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+    def test_get_default(self):
+        cache = LRUCache(maxsize=2)
+
+        assert cache.get('a', mock.sentinel.default) is mock.sentinel.default
+
+    def test_falsey_values_are_cached(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 0)
+
+        assert cache.get('a', mock.sentinel.default) == 0
+
+    def test_discard(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', mock.sentinel.a)
+        cache.set('b', mock.sentinel.b)
+
+        cache.discard('a')
+        cache.discard('z')
+
+        assert cache.get('a') is None
+        assert cache.get('b') is mock.sentinel.b
+
+    def test_discard_where(self):
+        cache = LRUCache(maxsize=3)
+        cache.set(('g-cloud-99', 1), mock.sentinel.a)
+        cache.set(('g-cloud-99', 2), mock.sentinel.b)
+        cache.set(('g-cloud-100', 1), mock.sentinel.c)
+
+        cache.discard_where(lambda key: key[0] == 'g-cloud-99')
+
+        assert len(cache) == 1
+        assert cache.get(('g-cloud-100', 1)) is mock.sentinel.c
+
+
+class TestTTLCache:
+
+    @pytest.fixture
+    def now(self):
+        with mock.patch('app.caching.time.monotonic') as monotonic:
+            monotonic.return_value = 1000.0
+            yield monotonic
+
+    @pytest.fixture(autouse=True)
+    def refresh(self):
+        # run background refreshes straight away so the tests can see their results
+        with mock.patch('app.caching._refresher.submit') as refresh:
+            refresh.side_effect = lambda refresh: refresh()
+            yield refresh
+
+    def test_values_are_fetched_once_until_they_expire(self, now):
+        cache = TTLCache(ttl=60, max_age=3600)
+        fetch = mock.Mock(return_value=mock.sentinel.value)
+
+        assert cache.get('a', fetch) is mock.sentinel.value
+        now.return_value += 60
+        assert cache.get('a', fetch) is mock.sentinel.value
+
+        assert fetch.call_count == 1
+        assert cache.stats() == {'hits': 1, 'stale_hits': 0, 'misses': 1, 'size': 1}
+
+    def test_expired_values_are_returned_while_being_refreshed(self, now, refresh):
+        cache = TTLCache(ttl=60, max_age=3600)
+        cache.get('a', lambda: mock.sentinel.old_value)
+        now.return_value += 61
+
+        assert cache.get('a', lambda: mock.sentinel.new_value) is mock.sentinel.old_value
+        assert cache.get('a', lambda: mock.sentinel.newer_value) is mock.sentinel.new_value
+        assert refresh.call_count == 1
+        assert cache.stats() == {'hits': 1, 'stale_hits': 1, 'misses': 1, 'size': 1}
+
+    def test_values_are_only_refreshed_by_one_thread_at_a_time(self, now, refresh):
+        refresh.side_effect = None
+        cache = TTLCache(ttl=60, max_age=3600)
+        cache.get('a', lambda: mock.sentinel.value)
+        now.return_value += 61
+
+        cache.get('a', lambda: mock.sentinel.new_value)
+        cache.get('a', lambda: mock.sentinel.new_value)
+
+        assert refresh.call_count == 1
+
+    def test_failed_refreshes_keep_the_old_value(self, now):
+        cache = TTLCache(ttl=60, max_age=3600)
+        cache.get('a', lambda: mock.sentinel.value)
+        now.return_value += 61
+
+        assert cache.get('a', mock.Mock(side_effect=ValueError)) is mock.sentinel.value
+        assert cache.get('a', lambda: mock.sentinel.new_value) is mock.sentinel.value
+
+    def test_values_older_than_max_age_are_fetched_before_returning(self, now, refresh):
+        cache = TTLCache(ttl=60, max_age=3600)
+        cache.get('a', lambda: mock.sentinel.old_value)
+        now.return_value += 3601
+
+        assert cache.get('a', lambda: mock.sentinel.new_value) is mock.sentinel.new_value
+        assert refresh.call_count == 0
+
+    def test_purge(self, now):
+        cache = TTLCache(ttl=60, max_age=3600)
+        cache.get('a', lambda: mock.sentinel.a)
+        cache.get('b', lambda: mock.sentinel.b)
+
+        cache.purge('a')
+        assert cache.get('a', lambda: mock.sentinel.new_a) is mock.sentinel.new_a
+        assert cache.get('b', lambda: mock.sentinel.new_b) is mock.sentinel.b
+
+        cache.purge()
+        assert len(cache) == 0
+
+    def test_lookups_are_recorded(self, now):
+        on_lookup = mock.Mock()
+        cache = TTLCache(ttl=60, max_age=3600, on_lookup=on_lookup)
+
+        cache.get('a', lambda: mock.sentinel.a)
+        cache.get('a', lambda: mock.sentinel.a)
+        now.return_value += 61
+        cache.get('a', lambda: mock.sentinel.a)
+
+        assert on_lookup.call_args_list == [mock.call('miss'), mock.call('hit'), mock.call('stale')]
+
+
+def test_refreshes_are_run_in_turn_on_one_long_lived_thread():
+    refresher = _Refresher()
+    threads = []
+    done = threading.Event()
+
+    for _ in range(3):
+        refresher.submit(lambda: threads.append(threading.current_thread()))
+    refresher.submit(done.set)
+
+    assert done.wait(5)
+    assert len(set(threads)) == 1
+    assert threads[0] is not threading.current_thread()
+    assert threads[0].name == 'ttl-cache-refresh'
+
+
+class TestSingleFlight:
+
+    @pytest.fixture
+    def blocking_fetch(self):
+        started, release = threading.Event(), threading.Event()
+
+        def fetch():
+            started.set()
+            assert release.wait(5)
+            return mock.sentinel.value
+
+        return fetch, started, release
+
+    def test_concurrent_calls_for_a_key_share_one_call(self, blocking_fetch):
+        fetch, started, release = blocking_fetch
+        single_flight = SingleFlight()
+        other_fetch = mock.Mock()
+        results = []
+
+        leader = threading.Thread(target=lambda: results.append(single_flight.do('a', fetch)))
+        leader.start()
+        assert started.wait(5)
+        followers = [
+            threading.Thread(target=lambda: results.append(single_flight.do('a', other_fetch))) for _ in range(3)
+        ]
+        for follower in followers:
+            follower.start()
+        while single_flight.stats()['coalesced'] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join(5)
+
+        assert other_fetch.called is False
+        assert sorted(results, key=lambda result: result[1]) == [(mock.sentinel.value, False)] + [
+            (mock.sentinel.value, True)
+        ] * 3
+        assert single_flight.stats() == {'calls': 1, 'coalesced': 3, 'in_flight': 0}
+
+    def test_exceptions_are_shared(self):
+        single_flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            assert release.wait(5)
+            raise ValueError('oops')
+
+        def call(fetch):
+            try:
+                single_flight.do('a', fetch)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call, args=(fail,))
+        leader.start()
+        assert started.wait(5)
+        follower = threading.Thread(target=call, args=(mock.Mock(),))
+        follower.start()
+        while single_flight.stats()['coalesced'] < 1:
+            time.sleep(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        assert len(errors) == 2
+        assert errors[0] is errors[1]
+
+    def test_nothing_is_remembered_between_calls(self):
+        single_flight = SingleFlight()
+        fetch = mock.Mock(side_effect=[1, 2])
+
+        assert single_flight.do('a', fetch) == (1, False)
+        assert single_flight.do('a', fetch) == (2, False)
+        assert single_flight.stats() == {'calls': 2, 'coalesced': 0, 'in_flight': 0}
@@ -0,0 +1,73 @@
+import mock
+import pytest
+
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('app.circuit_breaker.time.monotonic') as monotonic:
+        monotonic.return_value = 1000
+        yield monotonic
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_failures_in_a_row(self, monotonic):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_allows_one_trial_call_after_the_reset_timeout(self, monotonic):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+
+        monotonic.return_value = 1029
+        assert not breaker.allow()
+
+        monotonic.return_value = 1030
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_trial_call_opens_the_breaker_again(self, monotonic):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        for _ in range(3):
+            breaker.record_failure()
+
+        monotonic.return_value = 1030
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        monotonic.return_value = 1059
+        assert not breaker.allow()
+        monotonic.return_value = 1060
+        assert breaker.allow()
+
+    def test_on_change(self, monotonic):
+        on_change = mock.Mock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, on_change=on_change)
+
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        monotonic.return_value = 1030
+        breaker.allow()
+        breaker.record_success()
+
+        assert on_change.call_args_list == [mock.call(OPEN), mock.call(HALF_OPEN), mock.call(CLOSED)]
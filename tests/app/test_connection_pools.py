@@ -0,0 +1,119 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import mock
+import pytest
+
+from app.connection_pools import ConnectionPools, keep_alive_socket_options
+from config import Config
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def server():
+    server = Server(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config():
+    return {key: getattr(Config, key) for key in dir(Config) if key.startswith('DM_HTTP_')}
+
+
+@pytest.fixture
+def metrics():
+    with mock.patch('app.connection_pools.HTTP_POOL_CONNECTIONS_OPENED') as connections_opened, \
+            mock.patch('app.connection_pools.HTTP_POOL_CONNECTIONS_IN_USE') as connections_in_use, \
+            mock.patch('app.connection_pools.HTTP_POOL_EXHAUSTED') as pool_exhausted:
+        yield connections_opened, connections_in_use, pool_exhausted
+
+
+class TestConnectionPools:
+
+    def test_adapters_are_shared(self, config):
+        pools = ConnectionPools(config)
+
+        assert pools.adapter() is pools.adapter()
+        assert pools.adapter(retry_statuses=(502,)) is pools.adapter(retry_statuses=(502,))
+        assert pools.adapter(retry_statuses=(502,)) is not pools.adapter()
+        assert pools.adapter(retry_read_timeouts=False) is not pools.adapter()
+
+    def test_adapters_are_configured(self, config):
+        config.update({'DM_HTTP_POOL_MAXSIZE': 4, 'DM_HTTP_POOL_BLOCK': True, 'DM_HTTP_RETRIES': 2})
+
+        adapter = ConnectionPools(config).adapter(retry_read_timeouts=False, retry_statuses=(503,))
+
+        assert adapter._pool_maxsize == 4
+        assert adapter._pool_block is True
+        assert adapter.max_retries.total == 2
+        assert adapter.max_retries.read == 0
+        assert adapter.max_retries.status_forcelist == (503,)
+
+    def test_each_thread_gets_its_own_session_sharing_the_adapters(self, config):
+        pools = ConnectionPools(config)
+        sessions = []
+
+        thread = threading.Thread(target=lambda: sessions.append(pools.session(retry_statuses=(502,))))
+        thread.start()
+        thread.join()
+
+        session = pools.session(retry_statuses=(502,))
+        assert session is pools.session(retry_statuses=(502,))
+        assert session is not sessions[0]
+        assert session.get_adapter('https://example.com') is sessions[0].get_adapter('https://example.com')
+
+    def test_connections_are_kept_alive_and_reused(self, config, server, metrics):
+        connections_opened, connections_in_use, pool_exhausted = metrics
+        pools = ConnectionPools(config)
+
+        for _ in range(3):
+            assert pools.session().get(server).text == 'ok'
+
+        assert connections_opened.labels.call_args_list == [mock.call('127.0.0.1')]
+        assert connections_in_use.labels.return_value.inc.call_count == 3
+        assert connections_in_use.labels.return_value.dec.call_count == 3
+        assert not pool_exhausted.labels.called
+
+    def test_pool_exhaustion_is_counted(self, config, server, metrics):
+        connections_opened, connections_in_use, pool_exhausted = metrics
+        config['DM_HTTP_POOL_MAXSIZE'] = 1
+        pools = ConnectionPools(config)
+
+        first = pools.session().get(server, stream=True)
+        second = pools.session().get(server, stream=True)
+        first.close()
+        second.close()
+
+        assert pool_exhausted.labels.call_args_list == [mock.call('127.0.0.1')]
+        assert connections_opened.labels.call_count == 2
+
+
+@pytest.mark.parametrize('idle, keep_alive', ((0, None), (60, 1)))
+def test_keep_alive_socket_options(idle, keep_alive):
+    options = {(level, name): value for level, name, value in keep_alive_socket_options(idle)}
+
+    assert options.get((socket.SOL_SOCKET, socket.SO_KEEPALIVE)) == keep_alive
+    if idle and hasattr(socket, 'TCP_KEEPIDLE'):
+        assert options[(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE)] == 60
@@ -0,0 +1,59 @@
+import mock
+import pytest
+
+from app.direct_plus_client import PooledDirectPlusClient
+
+
+@pytest.fixture
+def session():
+    connection_pools = mock.Mock()
+    session = connection_pools.session.return_value
+    session.get.return_value.status_code = 200
+    session.request.return_value.status_code = 200
+    session.request.return_value.json.return_value = {'access_token': 'token'}
+    return session
+
+
+@pytest.fixture
+def client(session):
+    connection_pools = mock.Mock()
+    connection_pools.session.return_value = session
+    return PooledDirectPlusClient('username', 'password', connection_pools)
+
+
+class TestPooledDirectPlusClient:
+
+    def test_requests_use_the_shared_connection_pools(self, client, session):
+        assert client._direct_plus_request('data/duns/123456789', payload={'productId': 'cmpelk'}) is (
+            session.get.return_value
+        )
+
+        assert client.connection_pools.session.call_args_list == [mock.call(retry_statuses=(502, 503, 504))] * 2
+        assert session.request.call_args_list == [
+            mock.call(
+                'post', 'https://plus.dnb.com/v2/token',
+                headers={
+                    'Content-Type': 'application/json', 'Accept': 'application/json',
+                    'Authorization': mock.ANY,
+                },
+                json={'grant_type': 'client_credentials'},
+            ),
+        ]
+        assert session.get.call_args_list == [
+            mock.call(
+                'https://plus.dnb.com/v1/data/duns/123456789',
+                headers={
+                    'Content-Type': 'application/json', 'Accept': 'application/json', 'Authorization': 'Bearer token',
+                },
+                params={'productId': 'cmpelk'},
+            ),
+        ]
+
+    def test_expired_access_tokens_are_refreshed(self, client, session):
+        client.access_token = 'expired'
+        expired, ok = mock.Mock(status_code=401), mock.Mock(status_code=200)
+        session.get.side_effect = [expired, ok]
+
+        assert client._direct_plus_request('data/duns/123456789') is ok
+        assert session.request.call_count == 1
+        assert session.get.call_count == 2
@@ -0,0 +1,58 @@
+import threading
+
+import mock
+import pytest
+
+from app.s3_buckets import S3Buckets
+
+
+@pytest.fixture
+def s3():
+    with mock.patch('app.s3_buckets.s3.S3') as s3:
+        s3.side_effect = lambda bucket_name: mock.Mock(bucket_name=bucket_name)
+        yield s3
+
+
+@pytest.fixture
+def s3_request_duration():
+    with mock.patch('app.s3_buckets.S3_REQUEST_DURATION') as s3_request_duration:
+        yield s3_request_duration
+
+
+class TestS3Buckets:
+
+    def test_buckets_are_built_once(self, s3):
+        buckets = S3Buckets()
+
+        assert buckets.get('documents-bucket') is buckets.get('documents-bucket')
+        assert buckets.get('submissions-bucket').bucket_name == 'submissions-bucket'
+        assert s3.call_args_list == [mock.call('documents-bucket'), mock.call('submissions-bucket')]
+
+    def test_each_thread_gets_its_own_bucket(self, s3):
+        buckets = S3Buckets()
+        other_threads_bucket = []
+
+        thread = threading.Thread(target=lambda: other_threads_bucket.append(buckets.get('documents-bucket')))
+        thread.start()
+        thread.join()
+
+        assert buckets.get('documents-bucket') is not other_threads_bucket[0]
+        assert s3.call_count == 2
+
+    def test_calls_are_timed(self, s3, s3_request_duration):
+        bucket = S3Buckets().get('documents-bucket')
+        bucket._bucket.get_signed_url.return_value = mock.sentinel.url
+
+        assert bucket.get_signed_url('g-cloud-12/document.pdf', expires_in=30) is mock.sentinel.url
+        assert bucket._bucket.get_signed_url.call_args_list == [mock.call('g-cloud-12/document.pdf', expires_in=30)]
+        assert s3_request_duration.labels.call_args_list == [mock.call('documents-bucket', 'get_signed_url')]
+        assert s3_request_duration.labels.return_value.observe.call_count == 1
+
+    def test_failed_calls_are_timed(self, s3, s3_request_duration):
+        bucket = S3Buckets().get('documents-bucket')
+        bucket._bucket.save.side_effect = ValueError
+
+        with pytest.raises(ValueError):
+            bucket.save('g-cloud-12/document.pdf', mock.Mock())
+
+        assert s3_request_duration.labels.call_args_list == [mock.call('documents-bucket', 'save')]
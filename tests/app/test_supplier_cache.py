@@ -0,0 +1,106 @@
+import mock
+import pytest
+from redis import RedisError, WatchError
+
+from app.supplier_cache import SupplierCache, cached_supplier_id, written_supplier_ids
+
+
+@pytest.mark.parametrize('url, supplier_id', (
+    ('http://localhost/suppliers/1234', 1234),
+    ('http://localhost/suppliers/1234/frameworks', 1234),
+    ('http://localhost/users?supplier_id=1234', 1234),
+    ('http://localhost/users?supplier_id=1234&page=2', 1234),
+    ('http://localhost/suppliers/1234/frameworks/g-cloud-12', None),
+    ('http://localhost/suppliers/1234/frameworks/interest', None),
+    ('http://localhost/suppliers?name=1234', None),
+    ('http://localhost/users?email_address=me%40example.com', None),
+    ('http://localhost/users?supplier_id=1234&role=supplier', None),
+    ('http://localhost/users?supplier_id=abc', None),
+))
+def test_cached_supplier_id(url, supplier_id):
+    assert cached_supplier_id(url) == supplier_id
+
+
+@pytest.mark.parametrize('url, data, supplier_ids', (
+    ('/suppliers/1234', {'suppliers': {'name': 'New name'}}, [1234]),
+    ('/suppliers/1234/contact-information/1', {'contactInformation': {}}, [1234]),
+    ('/suppliers/1234/frameworks/g-cloud-12', {'frameworkInterest': {}}, [1234]),
+    ('/users', {'users': {'supplierId': 1234, 'role': 'supplier'}}, [1234]),
+    ('/agreements', {'agreement': {'supplierId': 1234, 'frameworkSlug': 'g-cloud-12'}}, [1234]),
+    ('/users/5678', {'users': {'active': False}}, []),
+    ('/draft-services/5678', {'services': {'serviceName': 'New name'}}, []),
+))
+def test_written_supplier_ids(url, data, supplier_ids):
+    assert list(written_supplier_ids(url, data)) == supplier_ids
+
+
+class TestSupplierCache:
+
+    @pytest.fixture
+    def redis_client(self):
+        return mock.MagicMock()
+
+    @pytest.fixture
+    def pipe(self, redis_client):
+        return redis_client.pipeline.return_value.__enter__.return_value
+
+    def test_get(self, redis_client):
+        pipeline = redis_client.pipeline.return_value
+        pipeline.hget.return_value.get.return_value.execute.return_value = [b'{"suppliers": {"id": 1234}}', b'3']
+
+        assert SupplierCache(redis_client, ttl=300).get(1234, 'http://localhost/suppliers/1234') == (
+            {'suppliers': {'id': 1234}}, b'3'
+        )
+        assert pipeline.hget.call_args_list == [mock.call('supplier-cache:1234', 'http://localhost/suppliers/1234')]
+        assert pipeline.hget.return_value.get.call_args_list == [mock.call('supplier-cache:1234:generation')]
+
+    def test_get_miss(self, redis_client):
+        redis_client.pipeline.return_value.hget.return_value.get.return_value.execute.return_value = [None, None]
+
+        assert SupplierCache(redis_client, ttl=300).get(1234, 'http://localhost/suppliers/1234') == (None, None)
+
+    def test_get_ignores_redis_errors(self, redis_client):
+        redis_client.pipeline.return_value.hget.return_value.get.return_value.execute.side_effect = RedisError
+
+        assert SupplierCache(redis_client, ttl=300).get(1234, 'http://localhost/suppliers/1234') == (None, None)
+
+    def test_set(self, redis_client, pipe):
+        pipe.get.return_value = b'3'
+
+        SupplierCache(redis_client, ttl=300).set(1234, 'http://localhost/suppliers/1234', {'suppliers': {}}, b'3')
+
+        assert pipe.watch.call_args_list == [mock.call('supplier-cache:1234:generation')]
+        assert pipe.hset.call_args_list == [
+            mock.call('supplier-cache:1234', 'http://localhost/suppliers/1234', '{"suppliers": {}}')
+        ]
+        assert pipe.expire.call_args_list == [mock.call('supplier-cache:1234', 300)]
+        assert pipe.execute.called
+
+    def test_set_is_skipped_if_the_supplier_has_been_invalidated(self, redis_client, pipe):
+        pipe.get.return_value = b'4'
+
+        SupplierCache(redis_client, ttl=300).set(1234, 'http://localhost/suppliers/1234', {'suppliers': {}}, b'3')
+
+        assert not pipe.hset.called
+        assert not pipe.execute.called
+
+    @pytest.mark.parametrize('error', (WatchError, RedisError))
+    def test_set_ignores_errors(self, redis_client, pipe, error):
+        pipe.get.return_value = None
+        pipe.execute.side_effect = error
+
+        SupplierCache(redis_client, ttl=300).set(1234, 'http://localhost/suppliers/1234', {'suppliers': {}}, None)
+
+    def test_invalidate(self, redis_client):
+        pipeline = redis_client.pipeline.return_value
+
+        SupplierCache(redis_client, ttl=300).invalidate([1234, 1234])
+
+        assert pipeline.delete.call_args_list == [mock.call('supplier-cache:1234')]
+        assert pipeline.incr.call_args_list == [mock.call('supplier-cache:1234:generation')]
+        assert pipeline.execute.call_count == 1
+
+    def test_invalidate_nothing(self, redis_client):
+        SupplierCache(redis_client, ttl=300).invalidate([])
+
+        assert not redis_client.pipeline.called
@@ -0,0 +1,72 @@
+from io import BytesIO
+
+from flask import Flask
+from werkzeug.test import EnvironBuilder
+
+from dmutils.documents import file_is_less_than_5mb, file_is_open_document_format
+
+from app.uploads import HEAD_BYTES, BoundedUploadFile, UploadRequest
+
+PDF_HEAD = b'%PDF-1.4\n' + b'0' * 119
+
+
+def _write_in_chunks(upload_file, data, chunk_size=1000):
+    for start in range(0, len(data), chunk_size):
+        upload_file.write(data[start:start + chunk_size])
+    upload_file.seek(0)
+
+
+class TestBoundedUploadFile:
+
+    def test_small_files_are_kept_whole(self):
+        upload_file = BoundedUploadFile('document.pdf', max_bytes=5000, spool_size=1000)
+        data = PDF_HEAD + b'1' * 2000
+
+        _write_in_chunks(upload_file, data)
+
+        assert upload_file.read() == data
+        assert upload_file.received == len(data)
+        assert upload_file._rolled
+
+    def test_only_the_first_max_bytes_are_kept(self):
+        upload_file = BoundedUploadFile('document.pdf', max_bytes=5000, spool_size=1000)
+        data = PDF_HEAD + b'1' * 10000
+
+        _write_in_chunks(upload_file, data)
+
+        assert upload_file.read() == data[:5000]
+        assert upload_file.received == len(data)
+
+    def test_only_the_head_of_files_in_other_formats_is_kept(self):
+        upload_file = BoundedUploadFile('document.docx', max_bytes=5000, spool_size=1000)
+        data = PDF_HEAD + b'1' * 2000
+
+        _write_in_chunks(upload_file, data, chunk_size=100)
+
+        assert upload_file.read() == data[:2 * 100]
+        assert not file_is_open_document_format(upload_file)
+
+    def test_files_which_are_too_big_fail_validation(self):
+        upload_file = BoundedUploadFile('document.pdf', max_bytes=5400001, spool_size=1000)
+
+        _write_in_chunks(upload_file, PDF_HEAD + b'1' * 6000000, chunk_size=65536)
+
+        assert file_is_open_document_format(upload_file)
+        assert not file_is_less_than_5mb(upload_file)
+        assert upload_file.tell() == 0
+
+
+def test_upload_request_uses_bounded_upload_files():
+    app = Flask(__name__)
+    app.config['DM_UPLOAD_SPOOL_SIZE'] = 1000
+    builder = EnvironBuilder(method='POST', data={
+        'field': 'value',
+        'document': (BytesIO(PDF_HEAD + b'1' * 2000), 'document.pdf'),
+    })
+
+    with app.test_request_context():
+        request = UploadRequest(builder.get_environ())
+
+        assert request.form['field'] == 'value'
+        assert isinstance(request.files['document'].stream, BoundedUploadFile)
+        assert request.files['document'].read(HEAD_BYTES) == PDF_HEAD
@@ -0,0 +1,178 @@
+import mock
+import pytest
+from flask import Flask, session
+from flask_login import LoginManager, login_user, logout_user
+from redis import RedisError
+
+from app.user_loader import SNAPSHOT_SESSION_KEY, CachedUserLoader, init_app, load_user
+
+
+def user_json(user_id=123, active=True):
+    return {
+        'users': {
+            'id': user_id,
+            'name': 'User Name',
+            'emailAddress': 'email@email.com',
+            'locked': False,
+            'active': active,
+            'role': 'supplier',
+            'supplier': {'supplierId': 1234, 'name': 'Supplier Name'},
+        },
+    }
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'not_very_secret'
+    return app
+
+
+@pytest.fixture
+def data_api_client():
+    data_api_client = mock.Mock()
+    data_api_client.get_user.return_value = user_json()
+    return data_api_client
+
+
+@pytest.fixture
+def redis_client():
+    redis_client = mock.Mock()
+    redis_client.get.return_value = None
+    return redis_client
+
+
+@pytest.fixture
+def user_loader(data_api_client, redis_client):
+    return CachedUserLoader(data_api_client, redis_client, ttl=60, maxsize=10, secret_key='not_very_secret')
+
+
+@pytest.fixture(autouse=True)
+def user_loader_lookups():
+    with mock.patch('app.user_loader.USER_LOADER_LOOKUPS') as user_loader_lookups:
+        yield user_loader_lookups
+
+
+def sources(user_loader_lookups):
+    return [call[0][0] for call in user_loader_lookups.labels.call_args_list]
+
+
+class TestCachedUserLoader:
+
+    def test_users_are_remembered_in_the_worker(self, app, user_loader, data_api_client, user_loader_lookups):
+        with app.test_request_context():
+            assert user_loader.load('123').email_address == 'email@email.com'
+        with app.test_request_context():
+            assert user_loader.load('123').supplier_id == 1234
+
+        assert data_api_client.get_user.call_args_list == [mock.call(user_id=123)]
+        assert sources(user_loader_lookups) == ['api', 'worker']
+
+    def test_users_are_remembered_in_the_session(
+        self, app, user_loader, data_api_client, redis_client, user_loader_lookups
+    ):
+        other_worker = CachedUserLoader(data_api_client, redis_client, ttl=60, maxsize=10, secret_key='not_very_secret')
+
+        with app.test_request_context():
+            user_loader.load('123')
+            assert other_worker.load('123').id == 123
+
+        assert data_api_client.get_user.call_args_list == [mock.call(user_id=123)]
+        assert sources(user_loader_lookups) == ['api', 'session']
+
+    def test_snapshots_must_be_signed(self, app, user_loader, data_api_client, redis_client):
+        other_worker = CachedUserLoader(data_api_client, redis_client, ttl=60, maxsize=10, secret_key='different')
+
+        with app.test_request_context():
+            user_loader.load('123')
+            other_worker.load('123')
+
+        assert data_api_client.get_user.call_count == 2
+
+    def test_snapshots_are_for_one_user(self, app, user_loader, data_api_client):
+        with app.test_request_context():
+            user_loader.load('123')
+            user_loader.users.clear()
+            user_loader.load('456')
+
+        assert data_api_client.get_user.call_args_list == [mock.call(user_id=123), mock.call(user_id=456)]
+
+    def test_users_are_loaded_again_after_the_ttl(self, app, user_loader, data_api_client):
+        with app.test_request_context():
+            with mock.patch('itsdangerous.timed.time.time') as time:
+                time.return_value = 1000
+                user_loader.load('123')
+                user_loader.users.clear()
+                time.return_value = 1061
+                user_loader.load('123')
+
+        assert data_api_client.get_user.call_count == 2
+
+    def test_invalidated_users_are_loaded_again(self, app, user_loader, data_api_client, redis_client):
+        with app.test_request_context():
+            user_loader.load('123')
+
+            user_loader.invalidate(123)
+            assert redis_client.incr.call_args_list == [mock.call('user-loader:123:version')]
+            redis_client.get.return_value = b'1'
+            data_api_client.get_user.return_value = user_json(active=False)
+
+            assert user_loader.load('123') is None
+
+        assert data_api_client.get_user.call_count == 2
+
+    def test_users_invalidated_by_another_worker_are_loaded_again(
+        self, app, user_loader, data_api_client, redis_client
+    ):
+        with app.test_request_context():
+            user_loader.load('123')
+            redis_client.get.return_value = b'1'
+            user_loader.load('123')
+
+        assert data_api_client.get_user.call_count == 2
+
+    def test_inactive_users_are_not_remembered(self, app, user_loader, data_api_client):
+        data_api_client.get_user.return_value = user_json(active=False)
+
+        with app.test_request_context():
+            assert user_loader.load('123') is None
+            assert user_loader.load('123') is None
+            assert SNAPSHOT_SESSION_KEY not in session
+
+        assert data_api_client.get_user.call_count == 2
+
+    def test_users_are_not_remembered_if_redis_fails(self, app, user_loader, data_api_client, redis_client):
+        redis_client.get.side_effect = RedisError
+
+        with app.test_request_context():
+            assert user_loader.load('123').id == 123
+            assert user_loader.load('123').id == 123
+
+        assert data_api_client.get_user.call_count == 2
+
+
+def test_logging_out_forgets_the_user(app, data_api_client, redis_client):
+    app.config.update({'DM_USER_CACHE_TTL': 60, 'DM_USER_CACHE_SIZE': 10, 'SESSION_REDIS': redis_client})
+    init_app(app, data_api_client)
+    LoginManager(app)
+
+    with app.test_request_context():
+        login_user(load_user(data_api_client, '123'))
+        assert SNAPSHOT_SESSION_KEY in session
+
+        logout_user()
+        assert SNAPSHOT_SESSION_KEY not in session
+
+    assert redis_client.incr.call_args_list == [mock.call('user-loader:123:version')]
+    assert app.extensions['user_loader'].users.get(123) is None
+
+
+def test_load_user_without_the_cache(app, data_api_client):
+    app.config.update({'DM_USER_CACHE_TTL': 0})
+    init_app(app, data_api_client)
+
+    with app.test_request_context():
+        assert load_user(data_api_client, '123').id == 123
+        assert load_user(data_api_client, '123').id == 123
+
+    assert data_api_client.get_user.call_count == 2